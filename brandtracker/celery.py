@@ -7,6 +7,26 @@ try:
     app = Celery('brandtracker')
     app.config_from_object('django.conf:settings', namespace='CELERY')
     app.autodiscover_tasks()
+
+    from celery.signals import worker_init, worker_process_init
+
+    def _warmup_enabled():
+        return os.environ.get('NLP_WARMUP', 'true').lower() == 'true'
+
+    @worker_init.connect
+    def load_models_in_parent(**kwargs):
+        # Loaded before the pool forks so prefork children share the weights copy-on-write;
+        # nothing to share when the models live in an inference server
+        if _warmup_enabled() and not os.environ.get('NLP_INFERENCE_ADDRESS'):
+            from tracker.nlp import warmup
+            warmup(run_inference=False)
+
+    @worker_process_init.connect
+    def warmup_child(**kwargs):
+        # Runs a dummy batch, or only pings the inference server if there is one
+        if _warmup_enabled():
+            from tracker.nlp import warmup
+            warmup()
 except ImportError:
     # Celery not installed, create a dummy app
     app = None
@@ -88,6 +88,13 @@ CHANNEL_LAYERS = {
     }
 }
 
+# Cache (dashboard stats, spike counters) - per-process memory unless Redis is up
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 # Try to use Redis if available
 try:
     import redis
@@ -104,6 +111,12 @@ try:
                 'CONFIG': { 'hosts': [(redis_host, 6379)] },
             }
         }
+        CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                'LOCATION': os.environ.get('CACHE_URL', f'redis://{redis_host}:6379/1'),
+            }
+        }
     except (RedisConnectionError, redis.ConnectionError, Exception) as e:
         # Redis not available, use in-memory (already set above)
         import logging
@@ -145,6 +158,150 @@ except ImportError:
     logger = logging.getLogger(__name__)
     logger.warning("Redis package not installed. Celery tasks will not work.")
 
+# Micro-batching of mention analysis: a batch is flushed when it reaches
+# MENTION_BATCH_SIZE mentions or its oldest mention has waited MENTION_BATCH_TIMEOUT seconds
+MENTION_BATCH_SIZE = int(os.environ.get('MENTION_BATCH_SIZE', '32'))
+MENTION_BATCH_TIMEOUT = float(os.environ.get('MENTION_BATCH_TIMEOUT', '2.0'))
+
+# Dashboard stats cache (tracker.stats): values live STATS_CACHE_TTL seconds and
+# processed mentions invalidate them at most once per STATS_MIN_REFRESH seconds
+STATS_CACHE_TTL = int(os.environ.get('STATS_CACHE_TTL', '15'))
+STATS_MIN_REFRESH = int(os.environ.get('STATS_MIN_REFRESH', '2'))
+
+# NLP result cache (tracker.analysis_cache): an in-process LRU of
+# ANALYSIS_CACHE_SIZE results, plus a shared tier in CACHES[ANALYSIS_CACHE_ALIAS]
+# (on by default when the cache is Redis; '' disables it)
+ANALYSIS_CACHE_SIZE = int(os.environ.get('ANALYSIS_CACHE_SIZE', '10000'))
+ANALYSIS_CACHE_ALIAS = os.environ.get(
+    'ANALYSIS_CACHE_ALIAS', 'default' if 'redis' in CACHES['default']['BACKEND'].lower() else ''
+)
+ANALYSIS_CACHE_TTL = int(os.environ.get('ANALYSIS_CACHE_TTL', str(7 * 24 * 3600)))
+
+# Story clustering (tracker.clusters): near-duplicate mentions share a cluster_id.
+# CLUSTER_BACKEND 'memory' indexes per process, 'cache' shares the LSH index through
+# CACHES (the default when the cache is Redis, so a story reworded across feeds
+# handled by different workers still gets one cluster_id), 'off' disables
+# clustering. Stories are matched for CLUSTER_WINDOW_HOURS.
+CLUSTER_BACKEND = os.environ.get(
+    'CLUSTER_BACKEND', 'cache' if 'redis' in CACHES['default']['BACKEND'].lower() else 'memory'
+)
+CLUSTER_WINDOW_HOURS = int(os.environ.get('CLUSTER_WINDOW_HOURS', '72'))
+CLUSTER_THRESHOLD = float(os.environ.get('CLUSTER_THRESHOLD', '0.5'))
+CLUSTER_NUM_PERM = int(os.environ.get('CLUSTER_NUM_PERM', '64'))
+CLUSTER_BANDS = int(os.environ.get('CLUSTER_BANDS', '16'))
+# Copy the analysis of the story's first mention instead of running the models again
+CLUSTER_REUSE_ANALYSIS = os.environ.get('CLUSTER_REUSE_ANALYSIS', 'false').lower() == 'true'
+# 'mentions' or 'stories': what the dashboard breakdowns and spike thresholds count
+STATS_COUNT = os.environ.get('STATS_COUNT', 'mentions')
+SPIKE_COUNT = os.environ.get('SPIKE_COUNT', 'mentions')
+
+# Similarity search (tracker.vector_index): exact NumPy search, or a faiss HNSW index
+# ('auto' switches to faiss, when installed, from VECTOR_INDEX_FAISS_MIN embeddings).
+# Each process picks up new and re-analyzed embeddings every VECTOR_INDEX_REFRESH
+# seconds, re-reading the last VECTOR_INDEX_SYNC_LAG seconds for late commits. An
+# HNSW graph can't replace vectors: it is rebuilt at most every VECTOR_INDEX_REBUILD
+# seconds once some have changed (0 = never)
+VECTOR_INDEX_BACKEND = os.environ.get('VECTOR_INDEX_BACKEND', 'auto')
+VECTOR_INDEX_FAISS_MIN = int(os.environ.get('VECTOR_INDEX_FAISS_MIN', '200000'))
+VECTOR_INDEX_REFRESH = float(os.environ.get('VECTOR_INDEX_REFRESH', '5'))
+VECTOR_INDEX_SYNC_LAG = float(os.environ.get('VECTOR_INDEX_SYNC_LAG', '60'))
+VECTOR_INDEX_REBUILD = float(os.environ.get('VECTOR_INDEX_REBUILD', '3600'))
+VECTOR_INDEX_HNSW_M = int(os.environ.get('VECTOR_INDEX_HNSW_M', '32'))
+VECTOR_INDEX_EF_SEARCH = int(os.environ.get('VECTOR_INDEX_EF_SEARCH', '64'))
+
+# Live stream (tracker.consumers): processed mentions are published once per batch
+# and each WebSocket client gets one frame per STREAM_FLUSH_MS with at most
+# STREAM_MAX_PENDING mentions buffered (older ones are dropped and counted)
+STREAM_MENTIONS = os.environ.get('STREAM_MENTIONS', 'true').lower() == 'true'
+STREAM_FLUSH_MS = int(os.environ.get('STREAM_FLUSH_MS', '250'))
+STREAM_MAX_PENDING = int(os.environ.get('STREAM_MAX_PENDING', '500'))
+
+# Live dashboard (ws/dashboard/): a snapshot on connect, then the increments caused
+# by ingested and analyzed mentions and new alerts, merged per DASHBOARD_FLUSH_MS.
+# Every DASHBOARD_RESYNC seconds a fresh snapshot corrects the rolling 24h/7d windows
+DASHBOARD_PUSH = os.environ.get('DASHBOARD_PUSH', 'true').lower() == 'true'
+DASHBOARD_FLUSH_MS = int(os.environ.get('DASHBOARD_FLUSH_MS', '1000'))
+DASHBOARD_RESYNC = int(os.environ.get('DASHBOARD_RESYNC', '300'))
+
+# Deduplication of new mentions (tracker.ingest): besides (source, external_id), the
+# same text from the same source is a duplicate within INGEST_DEDUP_HOURS of it
+INGEST_DEDUP_HOURS = float(os.environ.get('INGEST_DEDUP_HOURS', '24'))
+
+# Bulk ingest API (POST /api/ingest/): callers authenticate with one of the
+# comma-separated INGEST_TOKENS; the endpoint refuses everything while none are set.
+# Records are inserted INGEST_BATCH_SIZE at a time, with COPY on PostgreSQL
+INGEST_TOKENS = [t.strip() for t in os.environ.get('INGEST_TOKENS', '').split(',') if t.strip()]
+INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE', '1000'))
+INGEST_MAX_RECORDS = int(os.environ.get('INGEST_MAX_RECORDS', '100000'))
+INGEST_USE_COPY = os.environ.get('INGEST_USE_COPY', 'true').lower() == 'true'
+
+# Exports (GET /api/export/<mentions|alerts>/, manage.py export): rows fetched per
+# cursor round trip, and rows per Parquet row group (needs pyarrow)
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', '2000'))
+EXPORT_PARQUET_ROW_GROUP = int(os.environ.get('EXPORT_PARQUET_ROW_GROUP', '50000'))
+
+# Retention (tracker.retention): processed mentions older than RETENTION_DAYS move to
+# the archive table (monthly partitions on PostgreSQL), which the API still reads;
+# archive months older than RETENTION_COLD_DAYS are written to compressed files in
+# RETENTION_ARCHIVE_DIR and dropped. 0 disables either step
+RETENTION_DAYS = int(os.environ.get('RETENTION_DAYS', '0'))
+RETENTION_COLD_DAYS = int(os.environ.get('RETENTION_COLD_DAYS', '0'))
+RETENTION_ARCHIVE_DIR = os.environ.get('RETENTION_ARCHIVE_DIR', str(BASE_DIR / 'archive'))
+RETENTION_ARCHIVE_FORMAT = os.environ.get('RETENTION_ARCHIVE_FORMAT', 'ndjson')
+RETENTION_BATCH_SIZE = int(os.environ.get('RETENTION_BATCH_SIZE', '1000'))
+RETENTION_INTERVAL = float(os.environ.get('RETENTION_INTERVAL', str(24 * 3600)))
+
+# Negative spike alerts (tracker.spikes). Thresholds are keyed by scope: 'all',
+# 'source:<name>', 'topic:<label>', or 'source:*'/'topic:*' for every source/topic.
+# SPIKE_BACKEND 'memory' counts per process; 'cache' shares counts through CACHES
+# (the default when the cache is Redis, so every worker sees the whole burst).
+SPIKE_BACKEND = os.environ.get(
+    'SPIKE_BACKEND', 'cache' if 'redis' in CACHES['default']['BACKEND'].lower() else 'memory'
+)
+SPIKE_WINDOW_MINUTES = int(os.environ.get('SPIKE_WINDOW_MINUTES', '10'))
+SPIKE_COOLDOWN_MINUTES = int(os.environ.get('SPIKE_COOLDOWN_MINUTES', '30'))
+SPIKE_THRESHOLDS = {
+    'all': int(os.environ.get('SPIKE_THRESHOLD', '8')),
+}
+
+# Feed polling (tracker.poller): connection limits, timeouts and per-feed scheduling
+FEED_POLL_CONCURRENCY = int(os.environ.get('FEED_POLL_CONCURRENCY', '20'))
+FEED_POLL_PER_HOST = int(os.environ.get('FEED_POLL_PER_HOST', '2'))
+FEED_POLL_TIMEOUT = float(os.environ.get('FEED_POLL_TIMEOUT', '20'))
+FEED_PARSE_WORKERS = int(os.environ.get('FEED_PARSE_WORKERS', '4'))
+FEED_DEFAULT_INTERVAL = int(os.environ.get('FEED_DEFAULT_INTERVAL', '300'))
+FEED_POLL_JITTER = float(os.environ.get('FEED_POLL_JITTER', '0.1'))
+# Items read per fetch; parsing stops earlier at the newest item already seen
+FEED_MAX_ITEMS = int(os.environ.get('FEED_MAX_ITEMS', '30'))
+FEED_MAX_BACKOFF = int(os.environ.get('FEED_MAX_BACKOFF', str(6 * 3600)))
+
+# Topic model refits (tracker.topics): BERTopic is refitted every TOPIC_REFIT_INTERVAL
+# seconds on the stored embeddings of the last TOPIC_REFIT_DAYS days; versions are
+# kept in TOPIC_MODEL_DIR and processes switch to a new one within TOPIC_CHECK_INTERVAL
+TOPIC_MODEL_DIR = os.environ.get('TOPIC_MODEL_DIR', str(BASE_DIR / 'topic_models'))
+TOPIC_REFIT_INTERVAL = float(os.environ.get('TOPIC_REFIT_INTERVAL', str(6 * 3600)))
+TOPIC_REFIT_DAYS = int(os.environ.get('TOPIC_REFIT_DAYS', '7'))
+TOPIC_REFIT_MAX_DOCS = int(os.environ.get('TOPIC_REFIT_MAX_DOCS', '20000'))
+TOPIC_MIN_DOCS = int(os.environ.get('TOPIC_MIN_DOCS', '200'))
+TOPIC_KEEP_VERSIONS = int(os.environ.get('TOPIC_KEEP_VERSIONS', '3'))
+TOPIC_CHECK_INTERVAL = float(os.environ.get('TOPIC_CHECK_INTERVAL', '30'))
+
+# Celery beat schedule: `celery -A brandtracker beat`
+CELERY_BEAT_SCHEDULE = {
+    'poll-feeds': {
+        'task': 'tracker.tasks.poll_feeds',
+        'schedule': float(os.environ.get('FEED_POLL_TICK', '30')),
+    },
+    'refit-topics': {
+        'task': 'tracker.tasks.refit_topics',
+        'schedule': TOPIC_REFIT_INTERVAL,
+    },
+    'apply-retention': {
+        'task': 'tracker.tasks.apply_retention',
+        'schedule': RETENTION_INTERVAL,
+    },
+}
+
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'tracker' / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
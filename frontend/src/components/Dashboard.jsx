@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react'
 import useSWR from 'swr'
-import { API_BASE } from '../config'
+import { API_BASE, WS_BASE } from '../config'
 
 const fetcher = async (url) => {
   try {
@@ -15,11 +15,86 @@ const fetcher = async (url) => {
   }
 }
 
+// Add the increments of a pushed delta (see tracker.stats.dashboard_delta) to the stats
+const applyDelta = (stats, delta) => {
+  const add = (counts, changes) => {
+    const next = { ...counts }
+    Object.entries(changes || {}).forEach(([key, n]) => { next[key] = (next[key] || 0) + n })
+    return next
+  }
+  const addToList = (list, field, changes, limit) => {
+    const next = list.map(item => ({ ...item }))
+    Object.entries(changes || {}).forEach(([key, n]) => {
+      const item = next.find(i => i[field] === key)
+      if (item) item.count += n
+      else next.push({ [field]: key, count: n })
+    })
+    next.sort((a, b) => b.count - a.count)
+    return limit ? next.slice(0, limit) : next
+  }
+  let hourly = stats.hourly_mentions.map(h => ({ ...h }))
+  Object.entries(delta.hourly || {}).forEach(([time, n]) => {
+    let bucket = hourly.find(h => h.time === time)
+    if (!bucket) {
+      // A new hour started: append it and let the oldest one go
+      const hour = new Date(time)
+      if (hourly.length && hour < new Date(hourly[hourly.length - 1].time)) return
+      bucket = { hour: hour.getUTCHours(), time, count: 0 }
+      hourly = [...hourly.slice(1), bucket]
+    }
+    bucket.count += n
+  })
+  return {
+    ...stats,
+    mentions: add(stats.mentions, delta.mentions),
+    stories: add(stats.stories, delta.stories),
+    sentiment: add(stats.sentiment, delta.sentiment),
+    alerts: add(stats.alerts, delta.alerts),
+    topics: addToList(stats.topics, 'topic', delta.topics, 10),
+    sources: addToList(stats.sources, 'source', delta.sources),
+    hourly_mentions: hourly,
+  }
+}
+
 export default function Dashboard() {
+  const [connected, setConnected] = useState(false)
+  // Polling is only the fallback while the live connection is down
   const { data: stats, error, mutate } = useSWR(`${API_BASE}/dashboard-stats/`, fetcher, {
-    refreshInterval: 30000
+    refreshInterval: connected ? 0 : 30000
   })
 
+  useEffect(() => {
+    let ws
+    let retry
+    let closed = false
+    const connect = () => {
+      ws = new WebSocket(`${WS_BASE}/dashboard/`)
+      ws.onopen = () => setConnected(true)
+      ws.onmessage = (e) => {
+        try {
+          const msg = JSON.parse(e.data)
+          if (msg.type === 'snapshot') {
+            mutate(msg.data, false)
+          } else if (msg.type === 'delta') {
+            mutate(current => current && applyDelta(current, msg.data), false)
+          }
+        } catch (err) {
+          console.error('Error parsing dashboard update:', err)
+        }
+      }
+      ws.onclose = () => {
+        setConnected(false)
+        if (!closed) retry = setTimeout(connect, 5000)
+      }
+    }
+    connect()
+    return () => {
+      closed = true
+      clearTimeout(retry)
+      ws.close()
+    }
+  }, [mutate])
+
   if (error) return <div className="text-red-500">Error loading dashboard: {error.message}</div>
   if (!stats) return <div className="text-gray-500">Loading dashboard...</div>
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Mention, Alert
+from .models import Mention, Alert, MentionEmbedding, Feed, MentionRollup
 
 @admin.register(Mention)
 class MentionAdmin(admin.ModelAdmin):
@@ -9,3 +9,18 @@ class MentionAdmin(admin.ModelAdmin):
 @admin.register(Alert)
 class AlertAdmin(admin.ModelAdmin):
     list_display = ('id','alert_type','mention','created_at','resolved')
+
+@admin.register(MentionEmbedding)
+class MentionEmbeddingAdmin(admin.ModelAdmin):
+    list_display = ('mention', 'model_name', 'dim')
+    exclude = ('vector',)
+
+@admin.register(Feed)
+class FeedAdmin(admin.ModelAdmin):
+    list_display = ('url', 'last_fetched_at', 'last_status', 'last_fetch_duration', 'fetch_count', 'not_modified_count', 'error_count')
+    search_fields = ('url',)
+
+@admin.register(MentionRollup)
+class MentionRollupAdmin(admin.ModelAdmin):
+    list_display = ('hour', 'source', 'sentiment', 'topic', 'count', 'story_count')
+    list_filter = ('source', 'sentiment')
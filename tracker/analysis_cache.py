@@ -0,0 +1,133 @@
+# tracker/analysis_cache.py - content-addressed cache for NLP results
+#
+# Syndicated items reach us from several feeds and again on re-fetches.
+# Results are keyed by the normalized text fingerprint plus the versions of
+# every model involved, so copies skip inference and a model change starts a
+# fresh key space instead of serving stale results.
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .utils import text_fingerprint
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = 'tracker:analysis-cache:stats:'
+COUNTERS = ('hits_local', 'hits_shared', 'misses')
+
+class AnalysisCache:
+    """In-process LRU in front of an optional shared tier in Django's cache"""
+
+    def __init__(self, size=10000, shared_alias=None, ttl=7 * 24 * 3600):
+        self.size = size
+        self.ttl = ttl
+        self.shared = caches[shared_alias] if shared_alias else None
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+    def key(self, text, version):
+        digest = hashlib.sha1(f'{version}|{text_fingerprint(text)}'.encode()).hexdigest()
+        return f'tracker:analysis:{digest}'
+
+    def get_many(self, keys):
+        """{key: result} for the keys found; misses are simply absent"""
+        found = {}
+        with self._lock:
+            for key in keys:
+                result = self._lru.get(key)
+                if result is not None:
+                    self._lru.move_to_end(key)
+                    found[key] = result
+        local = len(found)
+        missing = [k for k in keys if k not in found]
+        if missing and self.shared is not None:
+            try:
+                shared = self.shared.get_many(missing)
+            except Exception as e:
+                logger.warning(f"Shared analysis cache unavailable: {e}")
+                shared = {}
+            found.update(shared)
+            self._remember(shared)
+        self._count(hits_local=local, hits_shared=len(found) - local, misses=len(keys) - len(found))
+        return found
+
+    def set_many(self, results):
+        self._remember(results)
+        if self.shared is not None and results:
+            try:
+                self.shared.set_many(results, timeout=self.ttl)
+            except Exception as e:
+                logger.warning(f"Shared analysis cache unavailable: {e}")
+
+    def _remember(self, results):
+        if not self.size:
+            return
+        with self._lock:
+            for key, result in results.items():
+                self._lru[key] = result
+                self._lru.move_to_end(key)
+            while len(self._lru) > self.size:
+                self._lru.popitem(last=False)
+
+    def _count(self, **counts):
+        with self._lock:
+            for name, n in counts.items():
+                self.counters[name] += n
+        if self.shared is None:
+            return
+        # Cluster-wide totals next to the shared results, one incr per counter per call
+        for name, n in counts.items():
+            if not n:
+                continue
+            key = STATS_KEY + name
+            try:
+                self.shared.add(key, 0, timeout=None)
+                self.shared.incr(key, n)
+            except Exception:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self):
+        with self._lock:
+            process = dict(self.counters, entries=len(self._lru), size=self.size)
+        _add_hit_rate(process)
+        data = {'process': process, 'shared': None}
+        if self.shared is not None:
+            try:
+                values = self.shared.get_many([STATS_KEY + n for n in COUNTERS])
+                shared = {n: values.get(STATS_KEY + n, 0) for n in COUNTERS}
+                _add_hit_rate(shared)
+                data['shared'] = shared
+            except Exception as e:
+                logger.warning(f"Shared analysis cache unavailable: {e}")
+        return data
+
+def _add_hit_rate(counters):
+    lookups = sum(counters[n] for n in COUNTERS)
+    hits = counters['hits_local'] + counters['hits_shared']
+    counters['hit_rate'] = round(hits / lookups, 4) if lookups else None
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_analysis_cache():
+    """The process-wide cache, or None when ANALYSIS_CACHE_SIZE is 0 and there is no shared tier"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                size = getattr(settings, 'ANALYSIS_CACHE_SIZE', 10000)
+                alias = getattr(settings, 'ANALYSIS_CACHE_ALIAS', None) or None
+                if not size and not alias:
+                    return None
+                _cache = AnalysisCache(size=size, shared_alias=alias,
+                                       ttl=getattr(settings, 'ANALYSIS_CACHE_TTL', 7 * 24 * 3600))
+    return _cache
@@ -0,0 +1,220 @@
+# tracker/bulk_ingest.py - streaming bulk ingest of mentions from non-RSS sources
+#
+# The request body is NDJSON (one JSON object per line) or a JSON array of
+# objects, optionally gzip-compressed. It is decoded incrementally and
+# inserted in batches of INGEST_BATCH_SIZE, so memory stays flat however
+# large the body is.
+import codecs
+import gzip
+import hmac
+import itertools
+import json
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .ingest import build_mention
+from .models import Mention
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# Largest single record (NDJSON line or array item) buffered while waiting for its end
+MAX_ITEM_SIZE = 1024 * 1024
+# Errors reported back per request; the rest are only counted
+MAX_ERRORS = 20
+
+_SOURCE_LENGTH = Mention._meta.get_field('source').max_length
+_LANGUAGE_LENGTH = Mention._meta.get_field('language').max_length
+
+class IngestError(Exception):
+    """The body as a whole can't be ingested (bad framing, too many records)"""
+
+    def __init__(self, message, too_large=False):
+        super().__init__(message)
+        self.too_large = too_large
+        # Counts up to the failure, set by ingest_stream
+        self.summary = {}
+
+def valid_token(token):
+    """True if token is one of INGEST_TOKENS; ingest is closed while none are configured"""
+    if not token:
+        return False
+    return any(hmac.compare_digest(token.encode(), t.encode())
+               for t in getattr(settings, 'INGEST_TOKENS', []))
+
+def _chunks(stream, compressed=False):
+    if compressed:
+        stream = gzip.GzipFile(fileobj=stream)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    while True:
+        data = stream.read(CHUNK_SIZE)
+        if not data:
+            break
+        text = decoder.decode(data)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+def _ndjson(first, chunks):
+    buf = ''
+    number = 0
+    for chunk in itertools.chain([first], chunks):
+        buf += chunk
+        *lines, buf = buf.split('\n')
+        if len(buf) > MAX_ITEM_SIZE:
+            raise IngestError(f'line {number + len(lines) + 1} is longer than {MAX_ITEM_SIZE} characters',
+                              too_large=True)
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line
+    number += 1
+    if buf.strip():
+        yield number, buf
+
+def _json_array(first, chunks):
+    decoder = json.JSONDecoder()
+    buf = first
+    pos = buf.index('[') + 1
+    number = 0
+    expect_value = True
+    for chunk in itertools.chain([None], chunks):
+        if chunk is not None:
+            buf = buf[pos:] + chunk
+            pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n':
+                pos += 1
+            if pos == len(buf):
+                break
+            if buf[pos] == ']' and (not expect_value or number == 0):
+                return
+            if not expect_value:
+                if buf[pos] != ',':
+                    raise IngestError(f'expected "," or "]" after item {number}')
+                pos += 1
+                expect_value = True
+                continue
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                # Incomplete item: read more, unless it can't be one any more
+                if len(buf) - pos > MAX_ITEM_SIZE:
+                    raise IngestError(f'invalid or oversized JSON at item {number + 1}')
+                break
+            number += 1
+            yield number, value
+            pos = end
+            expect_value = False
+    if buf[pos:].strip():
+        raise IngestError(f'invalid JSON at item {number + 1}')
+    raise IngestError('unterminated JSON array')
+
+def iter_records(stream, compressed=False):
+    """(item number, parsed object or ValueError) for each record of the body"""
+    chunks = _chunks(stream, compressed)
+    first = ''
+    for chunk in chunks:
+        first += chunk
+        if first.strip():
+            break
+    stripped = first.lstrip()
+    if not stripped:
+        return
+    if stripped[0] == '[':
+        for number, value in _json_array(first, chunks):
+            yield number, value
+        return
+    for number, line in _ndjson(first, chunks):
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f'invalid JSON: {e}')
+
+def _parse_time(value, now):
+    if value in (None, ''):
+        return now
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            return datetime.fromtimestamp(value, tz=dt_timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            raise ValueError(f'created_at {value!r} is out of range')
+    if isinstance(value, str):
+        parsed = parse_datetime(value)
+        if parsed is not None:
+            return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed, dt_timezone.utc)
+    raise ValueError(f'created_at must be ISO 8601 or a Unix timestamp, got {value!r}')
+
+def build_candidate(record, default_source, now):
+    """Unsaved Mention for one record; ValueError if it is unusable"""
+    if not isinstance(record, dict):
+        raise ValueError('expected a JSON object')
+    text = record.get('text')
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError('text is required')
+    source = str(record.get('source') or default_source)
+    if len(source) > _SOURCE_LENGTH:
+        raise ValueError(f'source is longer than {_SOURCE_LENGTH} characters')
+    external_id = record.get('external_id')
+    external_id = str(external_id).strip()[:255] if external_id not in (None, '') else None
+    language = str(record.get('language') or 'en')[:_LANGUAGE_LENGTH]
+    return build_mention(
+        text.strip(), _parse_time(record.get('created_at'), now), source=source,
+        external_id=external_id, author=str(record.get('author') or '')[:255], language=language,
+    )
+
+def ingest_stream(stream, default_source='api', compressed=False):
+    """Parse, deduplicate and insert the records of a request body, queueing new ones for analysis.
+
+    Returns counts of received, created, duplicate and invalid records plus
+    the first MAX_ERRORS errors. Batches already inserted stay inserted if a
+    later part of the body turns out to be malformed (IngestError).
+    """
+    from .tasks import ingest_mentions
+    batch_size = getattr(settings, 'INGEST_BATCH_SIZE', 1000)
+    max_records = getattr(settings, 'INGEST_MAX_RECORDS', 100000)
+    use_copy = getattr(settings, 'INGEST_USE_COPY', True)
+    summary = {'received': 0, 'created': 0, 'duplicates': 0, 'invalid': 0, 'errors': []}
+    batch = []
+
+    def flush():
+        # A record's own external_id decides; only records without one are matched by text
+        created = len(ingest_mentions(batch, use_copy=use_copy, ids_only=True))
+        summary['created'] += created
+        summary['duplicates'] += len(batch) - created
+        batch.clear()
+
+    now = timezone.now()
+    try:
+        for number, record in iter_records(stream, compressed):
+            if summary['received'] >= max_records:
+                raise IngestError(f'more than {max_records} records in one request', too_large=True)
+            summary['received'] += 1
+            try:
+                if isinstance(record, ValueError):
+                    raise record
+                batch.append(build_candidate(record, default_source, now))
+            except ValueError as e:
+                summary['invalid'] += 1
+                if len(summary['errors']) < MAX_ERRORS:
+                    summary['errors'].append({'item': number, 'error': str(e)})
+                continue
+            if len(batch) >= batch_size:
+                flush()
+    except IngestError as e:
+        # Records before the failure are still stored
+        if batch:
+            flush()
+        e.summary = summary
+        raise
+    if batch:
+        flush()
+    logger.info(f"Bulk ingest: {summary['created']} new of {summary['received']} records "
+                f"({summary['duplicates']} duplicates, {summary['invalid']} invalid)")
+    return summary
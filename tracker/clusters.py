@@ -0,0 +1,200 @@
+# tracker/clusters.py - near-duplicate story clustering with MinHash/LSH
+#
+# Each mention's character shingles are reduced to a MinHash signature, which is
+# cut into bands. Mentions that share a band with a recent story are
+# candidates; the best candidate whose estimated Jaccard similarity reaches
+# the threshold gives the mention its cluster, otherwise it starts a new
+# story. A cluster id is the id of the mention that started the story.
+import hashlib
+import logging
+import threading
+import time
+import zlib
+from collections import Counter
+
+from django.conf import settings
+
+from .utils import normalize_text
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    _numpy_available = True
+except ImportError:
+    _numpy_available = False
+
+_MAX_HASH = (1 << 32) - 1
+
+def is_story(mention):
+    """True for mentions that started their cluster (or were never clustered)"""
+    return mention.cluster_id is None or mention.cluster_id == mention.id
+
+class MinHasher:
+    """MinHash signatures over character n-gram shingles, stable across processes.
+
+    Character shingles of the normalized text survive the small rewordings of
+    syndicated copies ("10,000" vs "10000", "in" vs "across") far better than
+    word n-grams, which one changed word breaks n times.
+    """
+
+    def __init__(self, num_perm=64, shingle_size=5, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # Deterministic permutation parameters so signatures can be shared
+        params = hashlib.shake_256(f'minhash-{seed}'.encode()).digest(num_perm * 8)
+        # Odd multipliers and offsets below 2^32, so products fit in uint64 for numpy
+        self.a = [int.from_bytes(params[i * 8:i * 8 + 4], 'little') | 1 for i in range(num_perm)]
+        self.b = [int.from_bytes(params[i * 8 + 4:i * 8 + 8], 'little') for i in range(num_perm)]
+        if _numpy_available:
+            self._a = np.array(self.a, dtype=np.uint64)
+            self._b = np.array(self.b, dtype=np.uint64)
+
+    def shingles(self, text):
+        text = normalize_text(text)
+        n = self.shingle_size
+        if len(text) <= n:
+            return {text} if text else set()
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def signature(self, text):
+        """Tuple of num_perm ints, or None for texts without words"""
+        hashes = [zlib.crc32(s.encode()) for s in self.shingles(text)]
+        if not hashes:
+            return None
+        if _numpy_available:
+            x = np.array(hashes, dtype=np.uint64)[:, None]
+            # (a * x + b) mod 2^32: wraps in uint64, still a universal hash family
+            return tuple(int(v) for v in ((self._a * x + self._b) & _MAX_HASH).min(axis=0))
+        return tuple(min((a * x + b) & _MAX_HASH for x in hashes) for a, b in zip(self.a, self.b))
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+class MemoryIndex:
+    """LSH buckets and story signatures local to this process, expiring after ttl seconds"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._buckets = {}
+        self._signatures = {}
+        self._lock = threading.Lock()
+        self._pruned_at = time.monotonic()
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        with self._lock:
+            found = {}
+            for key in keys:
+                entry = self._buckets.get(key) or self._signatures.get(key)
+                if entry is not None and entry[1] > now:
+                    found[key] = entry[0]
+            return found
+
+    def set_many(self, buckets, signatures):
+        now = time.monotonic()
+        expires = now + self.ttl
+        with self._lock:
+            for key, value in buckets.items():
+                entry = self._buckets.get(key)
+                # A bucket keeps pointing at the story that claimed it first
+                if entry is None or entry[1] <= now:
+                    self._buckets[key] = (value, expires)
+            for key, value in signatures.items():
+                self._signatures[key] = (value, expires)
+            if now - self._pruned_at > 60:
+                self._prune(now)
+
+    def _prune(self, now):
+        for store in (self._buckets, self._signatures):
+            for key in [k for k, (_, exp) in store.items() if exp <= now]:
+                del store[key]
+        self._pruned_at = now
+
+class CacheIndex:
+    """LSH buckets and story signatures in Django's cache, shared between workers with Redis"""
+
+    def __init__(self, ttl, alias='default'):
+        from django.core.cache import caches
+        self.ttl = ttl
+        self.cache = caches[alias]
+
+    def get_many(self, keys):
+        return self.cache.get_many(keys)
+
+    def set_many(self, buckets, signatures):
+        for key, value in buckets.items():
+            self.cache.add(key, value, timeout=self.ttl)
+        if signatures:
+            self.cache.set_many(signatures, timeout=self.ttl)
+
+class StoryClusterer:
+    """Assigns mentions to story clusters in time independent of the number of stories"""
+
+    def __init__(self, index, hasher=None, bands=16, threshold=0.5):
+        self.index = index
+        self.hasher = hasher or MinHasher()
+        if self.hasher.num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.bands = bands
+        self.rows = self.hasher.num_perm // bands
+        self.threshold = threshold
+
+    def _band_keys(self, signature):
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(repr(chunk).encode(), digest_size=8).hexdigest()
+            keys.append(f'lsh:{band}:{digest}')
+        return keys
+
+    def assign(self, mention_id, text):
+        """Cluster id for a new mention: an existing story's id, or its own id"""
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return mention_id
+        keys = self._band_keys(signature)
+        candidates = Counter(self.index.get_many(keys).values())
+        cluster_id = mention_id
+        if candidates:
+            sig_keys = {f'lsh-story:{c}': c for c, _ in candidates.most_common(5)}
+            stored = self.index.get_many(list(sig_keys))
+            best = 0.0
+            for key, story_sig in stored.items():
+                score = similarity(signature, story_sig)
+                if score >= self.threshold and score > best:
+                    best = score
+                    cluster_id = sig_keys[key]
+        signatures = {}
+        if cluster_id == mention_id:
+            signatures[f'lsh-story:{mention_id}'] = signature
+        # Members also fill empty buckets, so later rewordings of them still match the story
+        self.index.set_many({k: cluster_id for k in keys}, signatures)
+        return cluster_id
+
+    def assign_many(self, items):
+        """[(mention_id, text)] in arrival order -> {mention_id: cluster_id}"""
+        return {mention_id: self.assign(mention_id, text) for mention_id, text in items}
+
+_clusterer = None
+_clusterer_lock = threading.Lock()
+
+def get_clusterer():
+    """The configured StoryClusterer, or None when CLUSTER_BACKEND is 'off'"""
+    global _clusterer
+    backend = getattr(settings, 'CLUSTER_BACKEND', 'memory')
+    if backend == 'off':
+        return None
+    if _clusterer is None:
+        with _clusterer_lock:
+            if _clusterer is None:
+                ttl = getattr(settings, 'CLUSTER_WINDOW_HOURS', 72) * 3600
+                index = CacheIndex(ttl) if backend == 'cache' else MemoryIndex(ttl)
+                _clusterer = StoryClusterer(
+                    index,
+                    hasher=MinHasher(num_perm=getattr(settings, 'CLUSTER_NUM_PERM', 64)),
+                    bands=getattr(settings, 'CLUSTER_BANDS', 16),
+                    threshold=getattr(settings, 'CLUSTER_THRESHOLD', 0.5),
+                )
+    return _clusterer
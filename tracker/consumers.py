@@ -1,12 +1,181 @@
+import asyncio
+from collections import Counter, deque
+
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+
+# Subscription filters a client may set, matched against the mention fields
+FILTER_FIELDS = ('source', 'sentiment', 'topic')
 
 class TrackerConsumer(AsyncJsonWebsocketConsumer):
+    """Live alerts and, after a subscribe message, a filtered stream of processed mentions.
+
+    Clients that never subscribe get each alert as a bare JSON object, as
+    before. A client that sends
+
+        {"action": "subscribe", "mentions": true, "alerts": true,
+         "filters": {"source": ["rss"], "sentiment": ["negative"], "topic": []}}
+
+    instead receives frames of the form {"type": "batch", "mentions": [...],
+    "alerts": [...], "dropped": {...}} at most every STREAM_FLUSH_MS. Each
+    client buffers at most STREAM_MAX_PENDING mentions; if it reads too
+    slowly the oldest are dropped and reported as counts per sentiment.
+    """
+
     async def connect(self):
+        self.subscribed = False
+        self.want_mentions = False
+        self.want_alerts = True
+        self.filters = {}
+        self.flush_interval = getattr(settings, 'STREAM_FLUSH_MS', 250) / 1000
+        self.mentions = deque(maxlen=getattr(settings, 'STREAM_MAX_PENDING', 500))
+        self.alerts = []
+        self.dropped = Counter()
+        self.flush_task = None
         await self.channel_layer.group_add('mentions', self.channel_name)
         await self.accept()
 
     async def disconnect(self, close_code):
         await self.channel_layer.group_discard('mentions', self.channel_name)
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+
+    async def receive_json(self, content, **kwargs):
+        action = content.get('action')
+        if action == 'subscribe':
+            self.subscribed = True
+            self.want_mentions = bool(content.get('mentions', True))
+            self.want_alerts = bool(content.get('alerts', True))
+            filters = content.get('filters') or {}
+            self.filters = {
+                field: {str(v) for v in filters[field]}
+                for field in FILTER_FIELDS if filters.get(field)
+            }
+            await self.send_json({'type': 'subscribed', 'mentions': self.want_mentions,
+                                  'alerts': self.want_alerts,
+                                  'filters': {k: sorted(v) for k, v in self.filters.items()}})
+        elif action == 'unsubscribe':
+            self.subscribed = False
+            self.want_mentions = False
+            self.want_alerts = True
+            self.mentions.clear()
+
+    def _matches(self, item):
+        return all(str(item.get(field)) in values for field, values in self.filters.items())
+
+    async def mention_batch(self, event):
+        if not self.want_mentions:
+            return
+        matched = False
+        for item in event['data']:
+            if not self._matches(item):
+                continue
+            if len(self.mentions) == self.mentions.maxlen:
+                # Full: the oldest pending mention gives way and is only counted
+                self.dropped[self.mentions[0].get('sentiment') or 'unknown'] += 1
+            self.mentions.append(item)
+            matched = True
+        if matched:
+            self._schedule_flush()
+
+    async def mention_alerts(self, event):
+        for alert in event['data']:
+            await self._alert(alert)
 
     async def mention_alert(self, event):
-        await self.send_json(event['data'])
+        await self._alert(event['data'])
+
+    async def _alert(self, alert):
+        if not self.subscribed:
+            await self.send_json(alert)
+        elif self.want_alerts:
+            self.alerts.append(alert)
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self):
+        # Everything arriving during the interval goes out in one frame
+        await asyncio.sleep(self.flush_interval)
+        while self.mentions or self.alerts or self.dropped:
+            frame = {'type': 'batch', 'mentions': list(self.mentions), 'alerts': self.alerts}
+            if self.dropped:
+                frame['dropped'] = dict(self.dropped)
+            self.mentions.clear()
+            self.alerts = []
+            self.dropped = Counter()
+            # A slow client holds up only its own flush; new items keep buffering meanwhile
+            await self.send_json(frame)
+            if self.mentions or self.alerts:
+                await asyncio.sleep(self.flush_interval)
+
+def merge_delta(into, delta):
+    """Add the increments of one dashboard delta to another, in place"""
+    for section, counters in delta.items():
+        merged = into.setdefault(section, {})
+        for key, n in counters.items():
+            merged[key] = merged.get(key, 0) + n
+    return into
+
+class DashboardConsumer(AsyncJsonWebsocketConsumer):
+    """Dashboard numbers pushed as they change, replacing polling of DashboardStats.
+
+    On connect the client gets {"type": "snapshot", "data": <dashboard stats>},
+    afterwards {"type": "delta", "data": {...}} frames with the increments to
+    add (see tracker.stats.dashboard_delta), merged over DASHBOARD_FLUSH_MS.
+    A new snapshot every DASHBOARD_RESYNC seconds moves the rolling windows
+    on and repairs anything a delta missed.
+    """
+
+    group = 'dashboard'
+
+    async def connect(self):
+        self.flush_interval = getattr(settings, 'DASHBOARD_FLUSH_MS', 1000) / 1000
+        self.pending = {}
+        self.flush_task = None
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        await self.accept()
+        # Joined first: deltas arriving while the snapshot is fetched are held
+        # back and sent after it. The snapshot may be up to STATS_CACHE_TTL old, so
+        # an increment can be counted twice or missed until the next resync
+        await self._send_snapshot()
+        self.resync_task = asyncio.ensure_future(self._resync())
+
+    async def disconnect(self, close_code):
+        await self.channel_layer.group_discard(self.group, self.channel_name)
+        for task in (self.flush_task, getattr(self, 'resync_task', None)):
+            if task is not None:
+                task.cancel()
+
+    async def receive_json(self, content, **kwargs):
+        if content.get('action') == 'snapshot':
+            await self._send_snapshot()
+
+    async def _send_snapshot(self):
+        # The shared cache: a wave of reconnects costs one computation, not one each
+        from .stats import get_dashboard_stats
+        data = await database_sync_to_async(get_dashboard_stats)()
+        await self.send_json({'type': 'snapshot', 'data': data})
+
+    async def _resync(self):
+        interval = getattr(settings, 'DASHBOARD_RESYNC', 300)
+        if not interval:
+            return
+        while True:
+            await asyncio.sleep(interval)
+            self.pending = {}
+            await self._send_snapshot()
+
+    async def dashboard_delta(self, event):
+        merge_delta(self.pending, event['data'])
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        if self.pending:
+            delta, self.pending = self.pending, {}
+            await self.send_json({'type': 'delta', 'data': delta})
@@ -0,0 +1,80 @@
+# tracker/embeddings.py - persisted sentence embeddings (raw little-endian float32)
+import logging
+
+from django.utils import timezone
+
+from .models import MentionEmbedding
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    _numpy_available = True
+except ImportError:
+    _numpy_available = False
+
+DTYPE = '<f4'
+ITEMSIZE = 4
+
+def to_bytes(vector):
+    """Serialize a vector as raw little-endian float32 bytes"""
+    return np.asarray(vector, dtype=DTYPE).tobytes()
+
+def from_bytes(data):
+    """Zero-copy float32 view over stored embedding bytes"""
+    return np.frombuffer(data, dtype=DTYPE)
+
+def save_embeddings(pairs, model_name):
+    """Upsert (mention_id, emb_bytes) pairs; rows without an embedding are skipped"""
+    now = timezone.now()
+    rows = [
+        MentionEmbedding(mention_id=mention_id, model_name=model_name,
+                         dim=len(emb_bytes) // ITEMSIZE, vector=emb_bytes, updated_at=now)
+        for mention_id, emb_bytes in pairs if emb_bytes
+    ]
+    if rows:
+        MentionEmbedding.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['mention'],
+            update_fields=['model_name', 'dim', 'vector', 'updated_at'],
+        )
+        # Searchable in this process right away; other processes catch up on their next sync
+        from .vector_index import index_embeddings
+        index_embeddings([(r.mention_id, r.vector) for r in rows], model_name)
+    return len(rows)
+
+def load_matrix(mentions, model_name=None, chunk_size=2000):
+    """Load the stored embeddings of a Mention queryset into one (n, dim) float32 matrix.
+
+    Each row's bytes are written straight into a single preallocated buffer and
+    the matrix is a view over it, so no per-row arrays are built or stacked.
+    Returns (mention_ids, matrix); mentions without an embedding are left out.
+    """
+    if not _numpy_available:
+        raise RuntimeError('numpy is required to load embeddings')
+    if model_name is None:
+        from .nlp import EMBED_MODEL_NAME
+        model_name = EMBED_MODEL_NAME
+
+    qs = MentionEmbedding.objects.filter(
+        mention_id__in=mentions.values('id'), model_name=model_name
+    ).order_by('mention_id')
+    first = qs.values_list('dim', flat=True).first()
+    if first is None:
+        return [], np.empty((0, 0), dtype=DTYPE)
+    dim = first
+    row_bytes = dim * ITEMSIZE
+    n = qs.filter(dim=dim).count()
+
+    buf = bytearray(n * row_bytes)
+    view = memoryview(buf)
+    ids = []
+    rows = qs.filter(dim=dim).values_list('mention_id', 'vector')[:n]
+    for i, (mention_id, vector) in enumerate(rows.iterator(chunk_size=chunk_size)):
+        view[i * row_bytes:(i + 1) * row_bytes] = vector
+        ids.append(mention_id)
+    if len(ids) < n:
+        # Rows deleted between count and read
+        buf = buf[:len(ids) * row_bytes]
+    return ids, np.frombuffer(buf, dtype=DTYPE).reshape(len(ids), dim)
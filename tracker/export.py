@@ -0,0 +1,217 @@
+# tracker/export.py - streaming export of mentions and alerts as NDJSON, CSV or Parquet
+#
+# Rows are read with QuerySet.iterator(), i.e. a server-side cursor on
+# PostgreSQL and chunked fetches elsewhere, and encoded into byte chunks as
+# they arrive, so an export runs in constant memory whatever its size.
+import csv
+import io
+from datetime import datetime, time as dt_time, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Mention, Alert, MentionArchive
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    _pyarrow_available = True
+except ImportError:
+    _pyarrow_available = False
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Exportable tables and the query parameters that filter them
+EXPORTS = {
+    'mentions': (Mention, ('source', 'sentiment', 'topic', 'processed', 'cluster_id')),
+    'alerts': (Alert, ('alert_type', 'resolved', 'mention_id')),
+    # Mentions moved out of the hot table by tracker.retention
+    'archived-mentions': (MentionArchive, ('source', 'sentiment', 'topic', 'processed', 'cluster_id')),
+}
+
+# Bytes collected before a chunk is handed to the response or file
+BUFFER_SIZE = 64 * 1024
+
+def columns(model):
+    """Exportable column names of a model, foreign keys as <name>_id"""
+    return [f.attname for f in model._meta.concrete_fields]
+
+def parse_time(value, end=False):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'invalid date or time: {value!r}')
+        # A bare date as the upper bound includes that whole day
+        parsed = datetime.combine(day, dt_time.max if end else dt_time.min)
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed, dt_timezone.utc)
+
+def _parse_value(field, value):
+    if isinstance(field, models.BooleanField):
+        if value.lower() not in ('true', 'false', '1', '0'):
+            raise ValueError(f'{field.attname} must be true or false')
+        return value.lower() in ('true', '1')
+    return field.to_python(value)
+
+def build_queryset(kind, params):
+    """(queryset of value tuples, column names) for an export; ValueError on bad parameters.
+
+    params is a dict-like with optional 'fields' (comma separated), 'since',
+    'until' (ISO dates or times, on created_at) and the table's filters.
+    """
+    if kind not in EXPORTS:
+        raise ValueError(f'unknown export {kind!r}, expected one of {", ".join(EXPORTS)}')
+    model, filters = EXPORTS[kind]
+    available = columns(model)
+    fields = [f.strip() for f in (params.get('fields') or '').split(',') if f.strip()] or available
+    unknown = [f for f in fields if f not in available]
+    if unknown:
+        raise ValueError(f'unknown fields: {", ".join(unknown)}')
+
+    by_attname = {f.attname: f for f in model._meta.concrete_fields}
+    qs = model.objects.all()
+    if params.get('since'):
+        qs = qs.filter(created_at__gte=parse_time(params['since']))
+    if params.get('until'):
+        qs = qs.filter(created_at__lte=parse_time(params['until'], end=True))
+    for name in filters:
+        value = params.get(name)
+        if value not in (None, ''):
+            try:
+                qs = qs.filter(**{name: _parse_value(by_attname[name], value)})
+            except Exception as e:
+                raise ValueError(f'invalid {name}: {e}')
+    # Primary key order: a plain index scan, and a stable order for resumed exports
+    return qs.order_by('pk').values_list(*fields), fields
+
+def _rows(qs):
+    return qs.iterator(chunk_size=getattr(settings, 'EXPORT_CHUNK_SIZE', 2000))
+
+def ndjson_chunks(qs, fields):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    buf = []
+    size = 0
+    for row in _rows(qs):
+        line = encoder.encode(dict(zip(fields, row))) + '\n'
+        buf.append(line)
+        size += len(line)
+        if size >= BUFFER_SIZE:
+            yield ''.join(buf).encode()
+            buf, size = [], 0
+    if buf:
+        yield ''.join(buf).encode()
+
+def csv_chunks(qs, fields):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(fields)
+    for row in _rows(qs):
+        writer.writerow([v.isoformat() if isinstance(v, datetime) else v for v in row])
+        if out.tell() >= BUFFER_SIZE:
+            yield out.getvalue().encode()
+            out.seek(0)
+            out.truncate()
+    if out.tell():
+        yield out.getvalue().encode()
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands what was written so far to the caller"""
+
+    def __init__(self):
+        self._parts = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self):
+        data, self._parts = b''.join(self._parts), []
+        return data
+
+def _arrow_type(field):
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, (models.IntegerField, models.AutoField, models.ForeignKey)):
+        return pa.int64()
+    return pa.string()
+
+def parquet_chunks(qs, fields):
+    """One Parquet row group per EXPORT_PARQUET_ROW_GROUP rows, each sent as soon as it is written"""
+    if not _pyarrow_available:
+        raise RuntimeError('pyarrow is required for Parquet exports')
+    by_attname = {f.attname: f for f in qs.model._meta.concrete_fields}
+    schema = pa.schema([(name, _arrow_type(by_attname[name])) for name in fields])
+    group_size = getattr(settings, 'EXPORT_PARQUET_ROW_GROUP', 50000)
+    sink = _Sink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    group = [[] for _ in fields]
+
+    def write_group():
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(values, type=schema.field(i).type) for i, values in enumerate(group)],
+            schema=schema,
+        ), row_group_size=group_size)
+        for values in group:
+            values.clear()
+
+    for row in _rows(qs):
+        for values, value in zip(group, row):
+            values.append(value)
+        if len(group[0]) >= group_size:
+            write_group()
+            yield sink.drain()
+    if group[0]:
+        write_group()
+    writer.close()
+    yield sink.drain()
+
+ENCODERS = {'ndjson': ndjson_chunks, 'csv': csv_chunks, 'parquet': parquet_chunks}
+
+def export_chunks(qs, fields, fmt):
+    """Iterator of byte chunks of the export in the given format"""
+    if fmt not in ENCODERS:
+        raise ValueError(f'unknown format {fmt!r}, expected one of {", ".join(ENCODERS)}')
+    if fmt == 'parquet' and not _pyarrow_available:
+        raise RuntimeError('pyarrow is required for Parquet exports')
+    return ENCODERS[fmt](qs, fields)
+
+async def _async_chunks(chunks):
+    # Under ASGI a synchronous iterator would be collected into a list before
+    # sending; pull one chunk at a time in the sync thread that owns the cursor
+    from asgiref.sync import sync_to_async
+    pull = sync_to_async(next, thread_sensitive=True)
+    chunks = iter(chunks)
+    while True:
+        chunk = await pull(chunks, None)
+        if chunk is None:
+            break
+        yield chunk
+
+def streaming_response(request, chunks, fmt, filename):
+    """StreamingHttpResponse for export_chunks(), iterated the way the server needs"""
+    from django.core.handlers.asgi import ASGIRequest
+    from django.http import StreamingHttpResponse
+    if isinstance(request, ASGIRequest):
+        chunks = _async_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
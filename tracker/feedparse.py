@@ -0,0 +1,144 @@
+# tracker/feedparse.py - incremental RSS/Atom parsing with lxml's pull parser
+import logging
+from collections import namedtuple
+from datetime import timezone as dt_timezone
+from email.utils import parsedate_to_datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+FeedItem = namedtuple('FeedItem', 'guid link title description published')
+
+# Local names of the elements that carry each field, in order of preference
+_ITEM_TAGS = {'item', 'entry'}
+_GUID_TAGS = ('guid', 'id')
+_TITLE_TAGS = ('title',)
+_DESCRIPTION_TAGS = ('description', 'summary', 'content', 'encoded')
+_DATE_TAGS = ('pubDate', 'published', 'updated', 'date', 'issued', 'modified')
+
+def parse_feed_date(value):
+    """Parse RFC-822 (RSS pubDate) or ISO-8601 (Atom, dc:date) into an aware datetime"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    dt = None
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        pass
+    if dt is None:
+        try:
+            dt = parse_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if dt is not None and timezone.is_naive(dt):
+        dt = dt.replace(tzinfo=dt_timezone.utc)
+    return dt
+
+def _localname(tag):
+    if not isinstance(tag, str):
+        return None
+    return tag.rsplit('}', 1)[-1]
+
+def _text(el):
+    return ''.join(el.itertext()).strip()
+
+def _atom_link(el):
+    # Atom links carry the URL in href; prefer rel="alternate" (the default)
+    if el.get('rel', 'alternate') == 'alternate':
+        return el.get('href')
+    return None
+
+def _to_item(elem):
+    fields = {}
+    link = None
+    for child in elem:
+        name = _localname(child.tag)
+        if name is None or name in fields:
+            continue
+        if name == 'link':
+            if link is None:
+                link = _atom_link(child) if child.get('href') else (_text(child) or None)
+            continue
+        fields[name] = child
+
+    def first(names):
+        return next((_text(fields[n]) for n in names if n in fields), '')
+
+    guid = first(_GUID_TAGS) or None
+    return FeedItem(
+        guid=guid,
+        link=link,
+        title=first(_TITLE_TAGS),
+        description=first(_DESCRIPTION_TAGS),
+        published=parse_feed_date(first(_DATE_TAGS)),
+    )
+
+class FeedStreamParser:
+    """Pull parser that turns RSS <item>/Atom <entry> elements into FeedItems as
+    bytes arrive, discarding each element once read so memory stays flat.
+
+    Parsing stops after ``limit`` items or at the first item whose guid (or
+    link) equals ``stop_at``, typically the newest item of the previous fetch.
+    """
+
+    def __init__(self, limit=30, stop_at=None):
+        self.limit = limit
+        self.stop_at = stop_at or None
+        self.count = 0
+        self.done = False
+        self._parser = etree.XMLPullParser(
+            events=('end',), recover=True, resolve_entities=False, no_network=True
+        )
+
+    def feed(self, chunk):
+        """Feed raw bytes and return the items completed by them"""
+        if self.done:
+            return []
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self):
+        if self.done:
+            return []
+        try:
+            self._parser.close()
+        except etree.XMLSyntaxError as e:
+            logger.warning(f"Feed XML ended with errors: {e}")
+        items = self._drain()
+        self.done = True
+        return items
+
+    def _drain(self):
+        items = []
+        for _, elem in self._parser.read_events():
+            if self.done or _localname(elem.tag) not in _ITEM_TAGS:
+                continue
+            item = _to_item(elem)
+            # Drop the finished element and everything before it
+            elem.clear()
+            parent = elem.getparent()
+            if parent is not None:
+                while elem.getprevious() is not None:
+                    del parent[0]
+            if self.stop_at and self.stop_at in (item.guid, item.link):
+                self.done = True
+                break
+            items.append(item)
+            self.count += 1
+            if self.limit and self.count >= self.limit:
+                self.done = True
+                break
+        return items
+
+def iter_feed_items(chunks, limit=30, stop_at=None):
+    """Yield FeedItems from an iterable of byte chunks, reading no further than needed"""
+    parser = FeedStreamParser(limit=limit, stop_at=stop_at)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+    yield from parser.close()
@@ -0,0 +1,122 @@
+# tracker/feeds.py - per-feed HTTP state for conditional polling
+import logging
+import random
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Feed
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0'
+
+_session = None
+
+def get_session():
+    """Process-wide requests session so repeated fetches reuse keep-alive connections"""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32)
+        _session.mount('http://', adapter)
+        _session.mount('https://', adapter)
+    return _session
+
+def get_feed(url):
+    feed, _ = Feed.objects.get_or_create(url=url)
+    return feed
+
+def request_headers(feed):
+    """Request headers with the validators from the previous successful fetch"""
+    headers = {'User-Agent': USER_AGENT}
+    if feed.etag:
+        headers['If-None-Match'] = feed.etag
+    if feed.last_modified:
+        headers['If-Modified-Since'] = feed.last_modified
+    return headers
+
+def _update(feed, **fields):
+    # Counters go through F() so concurrent fetches of one feed don't lose increments
+    Feed.objects.filter(pk=feed.pk).update(**fields)
+    feed.refresh_from_db()
+
+def _validators(headers):
+    return {
+        'etag': headers.get('ETag', '')[:255],
+        'last_modified': headers.get('Last-Modified', '')[:100],
+    }
+
+def record_not_modified(feed, status, duration, headers=None):
+    """304, or a 200 with nothing new in it; a 200 still refreshes the validators"""
+    _update(
+        feed,
+        **(_validators(headers) if headers is not None else {}),
+        last_fetched_at=timezone.now(),
+        last_fetch_duration=duration,
+        last_status=status,
+        fetch_count=F('fetch_count') + 1,
+        not_modified_count=F('not_modified_count') + 1,
+        consecutive_errors=0,
+    )
+
+def record_success(feed, status, headers, content_hash, duration, last_item_id=''):
+    """Store the validators, body hash and newest item id once the body has been ingested"""
+    _update(
+        feed,
+        **_validators(headers),
+        content_hash=content_hash,
+        last_item_id=last_item_id[:255],
+        last_fetched_at=timezone.now(),
+        last_fetch_duration=duration,
+        last_status=status,
+        fetch_count=F('fetch_count') + 1,
+        consecutive_errors=0,
+        last_error='',
+    )
+
+def record_error(feed, error, duration, status=None):
+    _update(
+        feed,
+        last_fetched_at=timezone.now(),
+        last_fetch_duration=duration,
+        last_status=status,
+        fetch_count=F('fetch_count') + 1,
+        error_count=F('error_count') + 1,
+        consecutive_errors=F('consecutive_errors') + 1,
+        last_error=str(error)[:2000],
+    )
+
+def due_feeds(now=None):
+    now = now or timezone.now()
+    return Feed.objects.filter(active=True).filter(
+        Q(next_poll_at__isnull=True) | Q(next_poll_at__lte=now)
+    ).order_by('next_poll_at')
+
+def claim_due_feeds(lease_seconds=None):
+    """Return the due feeds and push their next_poll_at out by a lease so an
+    overlapping poller run doesn't fetch them a second time"""
+    lease_seconds = lease_seconds or 2 * getattr(settings, 'FEED_POLL_TIMEOUT', 20) + 60
+    now = timezone.now()
+    claimed = list(due_feeds(now))
+    if claimed:
+        Feed.objects.filter(pk__in=[f.pk for f in claimed]).update(
+            next_poll_at=now + timedelta(seconds=lease_seconds)
+        )
+    return claimed
+
+def schedule_next_poll(feed):
+    """Set next_poll_at from the feed interval with jitter, backing off after errors"""
+    interval = feed.poll_interval or getattr(settings, 'FEED_DEFAULT_INTERVAL', 300)
+    if feed.consecutive_errors:
+        max_backoff = getattr(settings, 'FEED_MAX_BACKOFF', 6 * 3600)
+        interval = min(interval * 2 ** min(feed.consecutive_errors, 10), max_backoff)
+    jitter = getattr(settings, 'FEED_POLL_JITTER', 0.1)
+    delay = interval * random.uniform(1 - jitter, 1 + jitter)
+    next_poll_at = timezone.now() + timedelta(seconds=delay)
+    Feed.objects.filter(pk=feed.pk).update(next_poll_at=next_poll_at)
+    feed.next_poll_at = next_poll_at
+    return next_poll_at
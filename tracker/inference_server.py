@@ -0,0 +1,266 @@
+# tracker/inference_server.py - one long-lived process holding the NLP models
+#
+# Workers send texts over a Unix socket (or localhost TCP) instead of loading
+# their own copies of the models. Requests from all connections go through
+# one queue and are merged into dynamic batches before inference.
+import asyncio
+import base64
+import ipaddress
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct('!I')
+MAX_MESSAGE = 64 * 1024 * 1024
+
+def parse_address(address):
+    """'/path/to.sock' or 'unix:/path' for a Unix socket, 'host:port' for TCP"""
+    if address.startswith('unix:'):
+        return 'unix', address[5:]
+    if address.startswith('/'):
+        return 'unix', address
+    host, _, port = address.rpartition(':')
+    return 'tcp', (host or '127.0.0.1', int(port))
+
+def is_loopback(host):
+    """True if every address the host name resolves to is a loopback address"""
+    try:
+        infos = socket.getaddrinfo(host, None)
+    except socket.gaierror:
+        return False
+    return all(ipaddress.ip_address(info[4][0].split('%')[0]).is_loopback for info in infos)
+
+def encode_results(results):
+    return [
+        [sentiment, score, topic, base64.b64encode(emb).decode() if emb else None]
+        for sentiment, score, topic, emb in results
+    ]
+
+def decode_results(rows):
+    return [
+        (sentiment, score, topic, base64.b64decode(emb) if emb else None)
+        for sentiment, score, topic, emb in rows
+    ]
+
+class InferenceServer:
+    """asyncio server that batches requests across connections.
+
+    The protocol has no authentication: TCP addresses other than loopback are
+    refused unless allow_remote is set (for a host reachable only by workers).
+    """
+
+    def __init__(self, address, max_batch=64, max_wait_ms=10, allow_remote=False):
+        self.address = address
+        self.allow_remote = allow_remote
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = None
+        # Models are not thread-safe for concurrent calls: one inference thread
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+        self.stats = {'requests': 0, 'texts': 0, 'batches': 0}
+
+    async def serve_forever(self):
+        self.queue = asyncio.Queue()
+        kind, target = parse_address(self.address)
+        if kind == 'unix':
+            if os.path.exists(target):
+                os.unlink(target)
+            server = await asyncio.start_unix_server(self._handle, path=target)
+        else:
+            if not self.allow_remote and not is_loopback(target[0]):
+                raise ValueError(f'refusing to listen on non-loopback address {target[0]} '
+                                 'without allow_remote')
+            server = await asyncio.start_server(self._handle, host=target[0], port=target[1])
+        batcher = asyncio.create_task(self._batch_loop())
+        logger.info(f"Inference server listening on {self.address}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            if kind == 'unix' and os.path.exists(target):
+                os.unlink(target)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    return
+                (size,) = _HEADER.unpack(header)
+                if size > MAX_MESSAGE:
+                    return
+                request = json.loads(await reader.readexactly(size))
+                if request.get('ping'):
+                    # Readiness check from a worker, answered without touching the models
+                    payload = json.dumps({'pong': True, 'stats': self.stats}).encode()
+                    writer.write(_HEADER.pack(len(payload)) + payload)
+                    await writer.drain()
+                    continue
+                try:
+                    results = await self.submit(request.get('texts', []), request.get('use_topic', True))
+                    response = {'results': encode_results(results)}
+                except Exception as e:
+                    logger.error(f"Inference failed: {e}", exc_info=True)
+                    response = {'error': str(e)}
+                payload = json.dumps(response).encode()
+                writer.write(_HEADER.pack(len(payload)) + payload)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            # Truncated or malformed message: drop the connection
+            logger.debug(f"Inference connection closed: {e}")
+        finally:
+            writer.close()
+
+    async def submit(self, texts, use_topic=True):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((list(texts), bool(use_topic), future))
+        self.stats['requests'] += 1
+        return await future
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+            # Keep collecting until the batch is full or the oldest request waited max_wait
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+            for use_topic in (True, False):
+                group = [p for p in pending if p[1] is use_topic]
+                if group:
+                    await self._run(group, use_topic)
+
+    async def _run(self, group, use_topic):
+        texts = [t for item in group for t in item[0]]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, _analyze, texts, use_topic
+            )
+        except Exception as e:
+            for _, _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.stats['batches'] += 1
+        self.stats['texts'] += len(texts)
+        offset = 0
+        for item_texts, _, future in group:
+            if not future.done():
+                future.set_result(results[offset:offset + len(item_texts)])
+            offset += len(item_texts)
+
+def _analyze(texts, use_topic):
+    from .nlp import _refresh_topic_model, analyze_texts_local
+    if use_topic:
+        # Workers don't load topic models themselves, the server follows refits
+        _refresh_topic_model()
+    return analyze_texts_local(texts, use_topic)
+
+class InferenceClient:
+    """Blocking client with one persistent connection per thread"""
+
+    def __init__(self, address, timeout=30.0):
+        self.address = address
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        kind, target = parse_address(self.address)
+        family = socket.AF_UNIX if kind == 'unix' else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(target)
+        return sock
+
+    def _recv_exactly(self, sock, size):
+        chunks = []
+        while size:
+            chunk = sock.recv(min(size, 1 << 20))
+            if not chunk:
+                raise ConnectionError('inference server closed the connection')
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+
+    def close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _request(self, request):
+        payload = json.dumps(request).encode()
+        for attempt in (1, 2):
+            sock = getattr(self._local, 'sock', None)
+            try:
+                if sock is None:
+                    sock = self._local.sock = self._connect()
+                sock.sendall(_HEADER.pack(len(payload)) + payload)
+                (size,) = _HEADER.unpack(self._recv_exactly(sock, _HEADER.size))
+                return json.loads(self._recv_exactly(sock, size))
+            except (OSError, ConnectionError):
+                self.close()
+                # A kept-alive connection may have gone away; retry once on a fresh one
+                if attempt == 2:
+                    raise
+
+    def analyze(self, texts, use_topic=True):
+        response = self._request({'texts': list(texts), 'use_topic': use_topic})
+        if 'error' in response:
+            raise RuntimeError(f"inference server error: {response['error']}")
+        return decode_results(response['results'])
+
+    def ping(self):
+        """The server's counters; raises if it can't be reached"""
+        return self._request({'ping': True})['stats']
+
+_client = None
+_down_until = 0.0
+
+def _get_client(address):
+    global _client
+    if _client is None or _client.address != address:
+        _client = InferenceClient(address, timeout=float(os.environ.get('NLP_INFERENCE_TIMEOUT', '30')))
+    return _client
+
+def ping(address):
+    """Server counters if it answers, None if it can't be reached"""
+    try:
+        return _get_client(address).ping()
+    except (OSError, ConnectionError, ValueError, KeyError) as e:
+        logger.warning(f"Inference server {address} not reachable: {e}")
+        return None
+
+def remote_analyze(address, texts, use_topic=True):
+    """Analyze through the server; None if it is unreachable so callers fall back.
+
+    After a failure the server is skipped for NLP_INFERENCE_RETRY seconds so
+    a dead server doesn't add a connect timeout to every batch.
+    """
+    global _down_until
+    if time.monotonic() < _down_until:
+        return None
+    try:
+        return _get_client(address).analyze(texts, use_topic)
+    except (OSError, ConnectionError, RuntimeError, ValueError) as e:
+        _down_until = time.monotonic() + float(os.environ.get('NLP_INFERENCE_RETRY', '30'))
+        logger.warning(f"Inference server {address} unavailable, using in-process models: {e}")
+        return None
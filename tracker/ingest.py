@@ -0,0 +1,183 @@
+# tracker/ingest.py - deduplicated bulk insertion of new mentions
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .clusters import get_clusterer
+from .models import Mention
+from .utils import text_fingerprint
+
+logger = logging.getLogger(__name__)
+
+def build_mention(text, created_at, source='rss', external_id=None, **fields):
+    """Unsaved Mention with its content fingerprint filled in"""
+    return Mention(
+        source=source,
+        external_id=external_id or None,
+        text=text,
+        created_at=created_at,
+        content_hash=text_fingerprint(text),
+        **fields,
+    )
+
+def insert_new_mentions(candidates, batch_size=500, use_copy=False, ids_only=False):
+    """Insert the candidates that are not already stored and return the new ids.
+
+    A candidate is a duplicate when its (source, external_id) is already
+    stored, or when the same source already has the same text (content hash)
+    within INGEST_DEDUP_HOURS of it, in the table or earlier in the batch.
+    With ids_only, candidates that carry an external_id are matched on
+    (source, external_id) alone: the caller's ids are authoritative.
+    Existing rows are found with one indexed query for the whole batch
+    instead of one lookup per item. With use_copy the rows are loaded with
+    COPY on PostgreSQL. The ids are the ones the insert returned, so a row
+    another fetch inserted at the same time is never reported twice.
+    """
+    candidates = list(candidates)
+    if not candidates:
+        return []
+    window = timedelta(hours=getattr(settings, 'INGEST_DEDUP_HOURS', 24))
+
+    by_source = defaultdict(list)
+    for m in candidates:
+        by_source[m.source].append(m)
+    query = Q()
+    for source, group in by_source.items():
+        external_ids = {m.external_id for m in group if m.external_id}
+        if external_ids:
+            query |= Q(source=source, external_id__in=external_ids)
+        by_text = [m for m in group if not (ids_only and m.external_id)]
+        if by_text:
+            times = [m.created_at for m in by_text]
+            query |= Q(source=source, content_hash__in={m.content_hash for m in by_text},
+                       created_at__gte=min(times) - window, created_at__lte=max(times) + window)
+    seen_keys = set()
+    seen_hashes = defaultdict(list)
+    for source, external_id, content_hash, created_at in Mention.objects.filter(query).values_list(
+        'source', 'external_id', 'content_hash', 'created_at'
+    ):
+        seen_keys.add((source, external_id))
+        seen_hashes[(source, content_hash)].append(created_at)
+
+    new = []
+    for m in candidates:
+        key = (m.source, m.external_id)
+        if m.external_id and key in seen_keys:
+            continue
+        times = seen_hashes[(m.source, m.content_hash)]
+        by_text = not (ids_only and m.external_id)
+        if by_text and any(abs(t - m.created_at) < window for t in times):
+            continue
+        if m.external_id:
+            seen_keys.add(key)
+        times.append(m.created_at)
+        new.append(m)
+    if not new:
+        return []
+    if use_copy and connection.vendor == 'postgresql':
+        rows = copy_mentions(new)
+    else:
+        rows = []
+        for i in range(0, len(new), batch_size):
+            rows.extend(insert_mentions(new[i:i + batch_size]))
+    rows.sort()
+    assign_clusters(rows, {m.content_hash: m.text for m in new})
+    return [mention_id for mention_id, _ in rows]
+
+# Columns a new, unanalyzed mention is inserted with by insert_mentions() and copy_mentions()
+COPY_FIELDS = ['source', 'external_id', 'author', 'text', 'created_at', 'fetched_at',
+               'language', 'processed', 'content_hash']
+
+def insert_mentions(mentions):
+    """INSERT ... ON CONFLICT DO NOTHING RETURNING; (id, content_hash) of the rows inserted.
+
+    Rows that hit the unique (source, external_id) constraint because another
+    fetch inserted them concurrently are skipped, as with
+    bulk_create(ignore_conflicts=True), but unlike it the new ids come back.
+    """
+    quote = connection.ops.quote_name
+    meta = Mention._meta
+    fields = [meta.get_field(f) for f in COPY_FIELDS]
+    columns = ', '.join(quote(f.column) for f in fields)
+    row = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    params = []
+    for m in mentions:
+        params.extend(f.get_db_prep_save(f.pre_save(m, True), connection) for f in fields)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(meta.db_table)} ({columns}) VALUES {", ".join([row] * len(mentions))} '
+            f'ON CONFLICT DO NOTHING RETURNING {quote(meta.pk.column)}, {quote(meta.get_field("content_hash").column)}',
+            params,
+        )
+        return [tuple(r) for r in cursor.fetchall()]
+
+def _copy_value(value):
+    # PostgreSQL COPY text format: \N is NULL; backslash, tab and newlines are escaped
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+def copy_mentions(mentions):
+    """Load new mentions with COPY (PostgreSQL only); (id, content_hash) of the rows inserted.
+
+    COPY cannot skip conflicting rows, so it fills a temporary table and one
+    INSERT ... ON CONFLICT DO NOTHING RETURNING moves the rows over, which
+    covers rows inserted concurrently like insert_mentions() does.
+    """
+    quote = connection.ops.quote_name
+    meta = Mention._meta
+    columns = ', '.join(quote(meta.get_field(f).column) for f in COPY_FIELDS)
+    now = timezone.now()
+    data = []
+    for m in mentions:
+        m.fetched_at = m.fetched_at or now
+        data.append('\t'.join(_copy_value(getattr(m, f)) for f in COPY_FIELDS) + '\n')
+    data = ''.join(data)
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Still there if an enclosing transaction already loaded a batch
+        cursor.execute('DROP TABLE IF EXISTS mention_copy')
+        cursor.execute(
+            f'CREATE TEMP TABLE mention_copy ON COMMIT DROP AS '
+            f'SELECT {columns} FROM {quote(meta.db_table)} WITH NO DATA'
+        )
+        sql = f'COPY mention_copy ({columns}) FROM STDIN'
+        raw = cursor.cursor
+        if hasattr(raw, 'copy'):
+            # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(data)
+        else:
+            import io
+            raw.copy_expert(sql, io.StringIO(data))
+        cursor.execute(
+            f'INSERT INTO {quote(meta.db_table)} ({columns}) '
+            f'SELECT {columns} FROM mention_copy ON CONFLICT DO NOTHING '
+            f'RETURNING {quote(meta.pk.column)}, {quote(meta.get_field("content_hash").column)}'
+        )
+        return [tuple(r) for r in cursor.fetchall()]
+
+def assign_clusters(rows, texts_by_hash):
+    """Store story cluster ids for newly inserted (id, content_hash) rows, in id order"""
+    clusterer = get_clusterer()
+    if clusterer is None or not rows:
+        return {}
+    clusters = clusterer.assign_many(
+        (mention_id, texts_by_hash.get(content_hash, '')) for mention_id, content_hash in rows
+    )
+    # One UPDATE per story rather than per mention
+    members = defaultdict(list)
+    for mention_id, cluster_id in clusters.items():
+        members[cluster_id].append(mention_id)
+    for cluster_id, ids in members.items():
+        Mention.objects.filter(id__in=ids).update(cluster_id=cluster_id)
+    return clusters
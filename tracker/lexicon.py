@@ -0,0 +1,138 @@
+# tracker/lexicon.py - compiled keyword sentiment for the lightweight NLP path
+import hashlib
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# Words are matched as whole tokens, so inflections are listed explicitly
+POSITIVE = {
+    'good': 1.0, 'great': 1.5, 'excellent': 2.0, 'amazing': 2.0, 'love': 1.5, 'loved': 1.5,
+    'loves': 1.5, 'loving': 1.2, 'lovely': 1.2, 'best': 1.5, 'awesome': 2.0, 'fantastic': 2.0,
+    'wonderful': 2.0, 'perfect': 2.0, 'brilliant': 2.0, 'outstanding': 2.0, 'superb': 2.0,
+    'terrific': 2.0, 'fabulous': 2.0, 'delighted': 1.5, 'pleased': 1.0, 'satisfied': 1.0,
+    'happy': 1.0, 'joy': 1.0, 'enjoy': 1.0, 'enjoyed': 1.0, 'enjoys': 1.0, 'like': 0.5,
+    'liked': 0.7, 'likes': 0.5, 'prefer': 0.5, 'preferred': 0.5, 'recommend': 1.2,
+    'recommended': 1.2, 'praise': 1.2, 'praised': 1.2, 'appreciate': 1.0, 'appreciated': 1.0,
+    'admire': 1.0, 'impressed': 1.2, 'impressive': 1.2, 'success': 1.2, 'successful': 1.2,
+    'win': 1.0, 'wins': 1.0, 'won': 1.0, 'winning': 1.0, 'victory': 1.2, 'improved': 0.8,
+    'innovative': 1.0, 'reliable': 1.0,
+}
+NEGATIVE = {
+    'bad': 1.0, 'terrible': 2.0, 'awful': 2.0, 'hate': 2.0, 'hated': 2.0, 'hates': 2.0,
+    'worst': 2.0, 'horrible': 2.0, 'disappointed': 1.5, 'disappointing': 1.5, 'poor': 1.0,
+    'fail': 1.2, 'fails': 1.2, 'failed': 1.2, 'failing': 1.2, 'failure': 1.5, 'failures': 1.5,
+    'problem': 1.0, 'problems': 1.0, 'issue': 0.7, 'issues': 0.7, 'error': 1.0, 'errors': 1.0,
+    'mistake': 1.0, 'mistakes': 1.0, 'disgusting': 2.0, 'annoying': 1.2, 'annoyed': 1.2,
+    'frustrated': 1.5, 'frustrating': 1.5, 'angry': 1.5, 'upset': 1.2, 'sad': 1.0,
+    'unhappy': 1.5, 'dislike': 1.2, 'disliked': 1.2, 'complain': 1.0, 'complained': 1.0,
+    'complaint': 1.0, 'complaints': 1.0, 'criticize': 1.0, 'criticized': 1.0, 'blame': 1.0,
+    'blamed': 1.0, 'fault': 1.0, 'faulty': 1.2, 'defect': 1.2, 'defects': 1.2,
+    'defective': 1.5, 'broken': 1.2, 'outage': 1.5, 'breach': 1.5, 'lawsuit': 1.2,
+    'recall': 1.0, 'scandal': 1.5, 'layoffs': 1.0,
+}
+NEGATIONS = frozenset({
+    'not', 'no', 'never', 'none', 'nothing', 'neither', 'nor', 'without', 'hardly',
+    'barely', 'cannot', "can't", "don't", "doesn't", "didn't", "isn't", "aren't", "wasn't",
+    "weren't", "won't", "wouldn't", "shouldn't", "couldn't", "haven't", "hasn't", "hadn't",
+    "ain't", 'dont', 'doesnt', 'didnt', 'isnt', 'wasnt', 'cant', 'wont',
+})
+INTENSIFIERS = {
+    'very': 1.5, 'really': 1.4, 'extremely': 2.0, 'incredibly': 1.8, 'super': 1.5,
+    'so': 1.3, 'totally': 1.4, 'absolutely': 1.6, 'truly': 1.3, 'highly': 1.5,
+    'slightly': 0.6, 'somewhat': 0.7, 'fairly': 0.8, 'pretty': 1.2,
+}
+# Tokens a negation reaches forward, stopping early at clause punctuation
+NEGATION_SCOPE = 3
+
+_TOKEN = re.compile(r"[a-z]+(?:'[a-z]+)?|[.,;:!?]")
+_BOUNDARY = frozenset('.,;:!?')
+
+class Lexicon:
+    """Single-pass lexicon scorer with negation and intensifier handling.
+
+    Each text is tokenized once with one compiled regex and every token is
+    one dict lookup, instead of a substring scan per keyword, so "like" no
+    longer matches inside "unlikely".
+    """
+
+    def __init__(self, weights, negations=NEGATIONS, intensifiers=INTENSIFIERS, scope=NEGATION_SCOPE):
+        # Signed weights: positive words > 0, negative words < 0
+        self.weights = dict(weights)
+        self.negations = frozenset(negations)
+        self.intensifiers = dict(intensifiers)
+        self.scope = scope
+        digest = hashlib.sha1(json.dumps(
+            [sorted(self.weights.items()), sorted(self.negations), sorted(self.intensifiers.items()), scope]
+        ).encode()).hexdigest()
+        self.version = f'lexicon-{digest[:12]}'
+
+    def raw_score(self, text):
+        """Signed sum of word weights after negation and intensifiers"""
+        weights = self.weights
+        negations = self.negations
+        intensifiers = self.intensifiers
+        total = 0.0
+        negate = 0
+        boost = 1.0
+        for tok in _TOKEN.findall(text.lower().replace('’', "'")):
+            if tok in _BOUNDARY:
+                negate = 0
+                boost = 1.0
+                continue
+            w = weights.get(tok)
+            if w is not None:
+                if negate:
+                    w = -w
+                total += w * boost
+                boost = 1.0
+                negate = 0
+                continue
+            if tok in negations:
+                negate = self.scope
+                continue
+            b = intensifiers.get(tok)
+            if b is not None:
+                boost *= b
+                continue
+            boost = 1.0
+            if negate:
+                negate -= 1
+        return total
+
+    def score(self, text):
+        """(sentiment, score) with score in 0.5..0.9 like the keyword counter it replaced"""
+        raw = self.raw_score(text)
+        if raw > 0:
+            return 'positive', min(0.9, 0.5 + raw * 0.1)
+        if raw < 0:
+            return 'negative', min(0.9, 0.5 - raw * 0.1)
+        return 'neutral', 0.5
+
+    def score_many(self, texts):
+        score = self.score
+        return [score(t or '') for t in texts]
+
+def load_default_lexicon():
+    """Built-in lexicon, with word weights overridden from SENTIMENT_LEXICON_PATH (JSON) if set"""
+    weights = dict(POSITIVE)
+    weights.update({w: -v for w, v in NEGATIVE.items()})
+    path = os.environ.get('SENTIMENT_LEXICON_PATH')
+    if path:
+        try:
+            with open(path) as f:
+                weights.update({str(k).lower(): float(v) for k, v in json.load(f).items()})
+            logger.info(f"Loaded sentiment lexicon overrides from {path}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load sentiment lexicon from {path}: {e}")
+    return Lexicon(weights)
+
+_lexicon = None
+
+def get_lexicon():
+    global _lexicon
+    if _lexicon is None:
+        _lexicon = load_default_lexicon()
+    return _lexicon
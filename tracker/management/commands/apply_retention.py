@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from tracker import retention
+
+
+class Command(BaseCommand):
+    help = ('Move processed mentions older than the retention age into the archive table and '
+            'write archive months past the cold age to compressed files (what the apply-retention beat task runs)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Archive mentions older than N days (default: RETENTION_DAYS, 0 skips)')
+        parser.add_argument('--cold-days', type=int, default=None,
+                            help='Freeze archive months older than N days (default: RETENTION_COLD_DAYS, 0 skips)')
+        parser.add_argument('--format', choices=['ndjson', 'csv', 'parquet'], default=None,
+                            help='Frozen file format (default: RETENTION_ARCHIVE_FORMAT)')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Mentions moved per transaction (default: RETENTION_BATCH_SIZE)')
+        parser.add_argument('--limit', type=int, default=None, help='Stop after archiving N mentions')
+
+    def handle(self, *args, **options):
+        moved = retention.archive_mentions(days=options['days'], batch_size=options['batch_size'],
+                                           limit=options['limit'])
+        self.stdout.write(f'Archived {moved} mentions')
+        paths = retention.freeze_archive(days=options['cold_days'], fmt=options['format'])
+        for path in paths:
+            self.stdout.write(f'Froze {path}')
+        self.stdout.write(self.style.SUCCESS('Done'))
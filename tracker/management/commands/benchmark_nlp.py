@@ -0,0 +1,106 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker import nlp
+from tracker.models import Mention
+
+SAMPLE_TEXTS = [
+    'The new release is great, setup took two minutes.',
+    'Support never answered my ticket, really disappointed.',
+    'Pricing page updated with the new plans.',
+    'The app keeps crashing after the latest update.',
+    'Honestly the best customer service I have had this year.',
+    'Not bad, but the battery life could be better.',
+]
+
+
+def _load(backend):
+    """(sentiment, embedder) for one backend, built directly so nlp's globals stay untouched"""
+    if backend == 'torch':
+        from sentence_transformers import SentenceTransformer
+        from transformers import pipeline
+        return (
+            pipeline('text-classification', model=nlp.SENTIMENT_MODEL_NAME, truncation=True),
+            SentenceTransformer(nlp.EMBED_MODEL_NAME, device='cpu'),
+        )
+    from tracker import onnx_backend
+    quantize = backend == 'onnx-int8'
+    return (
+        onnx_backend.load_sentiment(nlp.SENTIMENT_MODEL_NAME, quantize=quantize),
+        onnx_backend.load_embedder(nlp.EMBED_MODEL_NAME, quantize=quantize),
+    )
+
+
+class Command(BaseCommand):
+    help = ('Compare latency, throughput and agreement of the torch, onnx and onnx-int8 '
+            'NLP backends on stored mentions (or built-in sample texts)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', default='torch,onnx,onnx-int8',
+                            help='Comma-separated backends; the first one is the reference')
+        parser.add_argument('--texts', type=int, default=256, help='Number of texts to run')
+        parser.add_argument('--batch-size', type=int, default=nlp.NLP_BATCH_SIZE)
+        parser.add_argument('--runs', type=int, default=3, help='Timed passes over the texts')
+
+    def handle(self, *args, **options):
+        import numpy as np
+
+        from tracker import onnx_backend
+
+        backends = [b.strip() for b in options['backends'].split(',') if b.strip()]
+        unknown = [b for b in backends if b not in onnx_backend.BACKENDS]
+        if unknown:
+            raise CommandError(f'Unknown backends: {", ".join(unknown)}')
+        texts = self._texts(options['texts'])
+        batch_size = options['batch_size']
+        self.stdout.write(f'{len(texts)} texts, batch size {batch_size}, {options["runs"]} runs')
+
+        reference = None
+        for backend in backends:
+            started = time.perf_counter()
+            try:
+                sentiment, embedder = _load(backend)
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f'{backend:<10} unavailable: {e}'))
+                continue
+            load_s = time.perf_counter() - started
+            # One untimed pass so lazy initialisation doesn't count as latency
+            sentiment(texts[:batch_size], batch_size=batch_size)
+            embedder.encode(texts[:batch_size], batch_size=batch_size, show_progress_bar=False)
+
+            batch_ms = []
+            for _ in range(options['runs']):
+                labels = []
+                vectors = []
+                for start in range(0, len(texts), batch_size):
+                    chunk = texts[start:start + batch_size]
+                    t0 = time.perf_counter()
+                    labels.extend(nlp._label_to_sentiment(r)[0] for r in sentiment(chunk, batch_size=batch_size))
+                    vectors.append(np.asarray(embedder.encode(chunk, batch_size=batch_size,
+                                                              show_progress_bar=False), dtype=np.float32))
+                    batch_ms.append((time.perf_counter() - t0) * 1000)
+            vectors = np.concatenate(vectors)
+            total_s = sum(batch_ms) / 1000 / options['runs']
+
+            line = (f'{backend:<10} load {load_s:6.1f}s  p50 {statistics.median(batch_ms):8.1f} ms/batch  '
+                    f'p95 {np.percentile(batch_ms, 95):8.1f} ms/batch  {len(texts) / total_s:8.1f} texts/s')
+            if reference is None:
+                reference = (backend, labels, vectors)
+            else:
+                ref_backend, ref_labels, ref_vectors = reference
+                agree = sum(a == b for a, b in zip(labels, ref_labels)) / len(texts)
+                cos = (vectors * ref_vectors).sum(axis=1) / np.clip(
+                    np.linalg.norm(vectors, axis=1) * np.linalg.norm(ref_vectors, axis=1), 1e-12, None)
+                line += (f'  vs {ref_backend}: sentiment agreement {agree:.1%}, '
+                         f'embedding cosine mean {cos.mean():.4f} / min {cos.min():.4f}')
+            self.stdout.write(line)
+
+    def _texts(self, n):
+        texts = list(
+            Mention.objects.exclude(text='').order_by('-id').values_list('text', flat=True)[:n]
+        )
+        while len(texts) < n:
+            texts.extend(SAMPLE_TEXTS[:n - len(texts)])
+        return texts
@@ -0,0 +1,112 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from tracker.models import Alert, Mention, MentionRollup
+
+
+class Rollback(Exception):
+    pass
+
+
+def hot_queries():
+    """(name, queryset, acceptable indexes) for the queries the views and tasks run"""
+    now = timezone.now()
+    last_24h = now - timedelta(hours=24)
+    return [
+        ('mentions list', Mention.objects.order_by('-created_at', '-id')[:50],
+         'tracker_mention_created_idx'),
+        ('mentions recent', Mention.objects.filter(processed=True).order_by('-created_at')[:50],
+         # Mostly-processed tables are cheaper to walk in created_at order
+         ('tracker_mention_processed_idx', 'tracker_mention_created_idx')),
+        ('mentions by sentiment', Mention.objects.filter(sentiment='negative', created_at__gte=last_24h)
+         .order_by('-created_at')[:100], 'tracker_mention_sentiment_idx'),
+        ('mentions by source', Mention.objects.filter(source='rss', created_at__gte=last_24h).values('id'),
+         'tracker_mention_source_idx'),
+        ('pending mentions', Mention.objects.filter(processed=False).order_by('id').values('id')[:1000],
+         'tracker_mention_pending_idx'),
+        ('unresolved alerts', Alert.objects.filter(resolved=False).values('id'),
+         'tracker_alert_resolved_idx'),
+        ('alerts list', Alert.objects.order_by('-created_at')[:50],
+         'tracker_alert_created_idx'),
+        ('rollup last 24h', MentionRollup.objects.filter(hour__gte=last_24h).values('hour', 'count'),
+         'tracker_rollup_hour_idx'),
+    ]
+
+
+class Command(BaseCommand):
+    help = ('EXPLAIN the hot dashboard/list queries on the current database, time them and '
+            'check that each one uses its index (SQLite and PostgreSQL)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Insert N synthetic mentions first; rolled back afterwards')
+        parser.add_argument('--runs', type=int, default=20, help='Timed executions per query')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the full plans')
+        parser.add_argument('--strict', action='store_true',
+                            help='Exit with an error if a query does not use its index')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'Unsupported database vendor: {connection.vendor}')
+        missing = []
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    self._seed(options['seed'])
+                missing = self._report(options)
+                raise Rollback
+        except Rollback:
+            pass
+        if missing and options['strict']:
+            raise CommandError(f'Queries not using their index: {", ".join(missing)}')
+
+    def _seed(self, n):
+        now = timezone.now()
+        sentiments = ['positive', 'negative', 'neutral']
+        mentions = [
+            Mention(
+                source=random.choice(['rss', 'webhook', 'social']),
+                text=f'synthetic mention {i}',
+                created_at=now - timedelta(minutes=random.randint(0, 60 * 24 * 90)),
+                processed=i % 50 != 0,
+                sentiment=random.choice(sentiments),
+                topic=f'topic {i % 20}',
+            )
+            for i in range(n)
+        ]
+        Mention.objects.bulk_create(mentions, batch_size=2000)
+        ids = list(Mention.objects.order_by('-id').values_list('id', flat=True)[:n // 20])
+        Alert.objects.bulk_create(
+            [Alert(mention_id=i, alert_type='negative_spike', resolved=bool(i % 3)) for i in ids],
+            batch_size=2000,
+        )
+        # Fresh statistics so the planner sees the seeded distribution
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(f'Seeded {n} mentions and {len(ids)} alerts')
+
+    def _report(self, options):
+        missing = []
+        self.stdout.write(f'{connection.vendor}: {Mention.objects.count()} mentions')
+        for name, qs, indexes in hot_queries():
+            if isinstance(indexes, str):
+                indexes = (indexes,)
+            plan = qs.explain()
+            used = any(index in plan for index in indexes)
+            started = time.perf_counter()
+            for _ in range(options['runs']):
+                list(qs.all())
+            avg_ms = (time.perf_counter() - started) * 1000 / max(options['runs'], 1)
+            status = self.style.SUCCESS('index') if used else self.style.WARNING('NO INDEX')
+            self.stdout.write(f'{name:<24} {avg_ms:8.2f} ms  {status}  ({" / ".join(indexes)})')
+            if options['verbose_plans'] or not used:
+                for line in plan.splitlines():
+                    self.stdout.write(f'    {line}')
+            if not used:
+                missing.append(name)
+        return missing
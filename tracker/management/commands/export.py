@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker import export
+
+
+class Command(BaseCommand):
+    help = ('Stream mentions or alerts to a file (or stdout) as NDJSON, CSV or Parquet '
+            'in constant memory, with the same filters as /api/export/')
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(export.EXPORTS))
+        parser.add_argument('--format', default='ndjson', choices=sorted(export.ENCODERS))
+        parser.add_argument('--output', '-o', default='-', help="File to write ('-' for stdout)")
+        parser.add_argument('--fields', default=None, help='Comma-separated columns (default: all)')
+        parser.add_argument('--since', default=None, help='ISO date or time, on created_at')
+        parser.add_argument('--until', default=None, help='ISO date or time, on created_at (inclusive)')
+        for name in sorted({f for _, filters in export.EXPORTS.values() for f in filters}):
+            parser.add_argument(f'--{name.replace("_", "-")}', dest=name, default=None,
+                                help=f'Only rows with this {name}')
+
+    def handle(self, *args, **options):
+        kind = options['kind']
+        allowed = export.EXPORTS[kind][1]
+        params = {k: options[k] for k in ('fields', 'since', 'until') + allowed}
+        stray = [k for _, filters in export.EXPORTS.values() for k in filters
+                 if k not in allowed and options[k] is not None]
+        if stray:
+            raise CommandError(f'{kind} cannot be filtered by {", ".join(stray)}')
+        try:
+            qs, fields = export.build_queryset(kind, params)
+            chunks = export.export_chunks(qs, fields, options['format'])
+        except (ValueError, RuntimeError) as e:
+            raise CommandError(str(e))
+
+        path = options['output']
+        started = time.monotonic()
+        written = 0
+        out = sys.stdout.buffer if path == '-' else open(f'{path}.tmp', 'wb')
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+        except BaseException:
+            if path != '-':
+                out.close()
+                os.remove(f'{path}.tmp')
+            raise
+        if path == '-':
+            out.flush()
+            return
+        out.close()
+        # Only a complete export appears under the final name
+        os.replace(f'{path}.tmp', path)
+        self.stderr.write(f'Wrote {written / 1e6:.1f} MB to {path} in {time.monotonic() - started:.1f}s')
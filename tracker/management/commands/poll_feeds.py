@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tracker import feeds
+from tracker.models import Feed
+from tracker.poller import poller_available, poll_due_feeds
+
+
+class Command(BaseCommand):
+    help = 'Poll all registered feeds from an asyncio event loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run a single polling round and exit')
+        parser.add_argument('--max-sleep', type=float, default=30.0,
+                            help='Longest wait between rounds in seconds (default: 30)')
+        parser.add_argument('--add', nargs='*', default=[], metavar='URL',
+                            help='Register feed URLs before polling')
+
+    def handle(self, *args, **options):
+        if not poller_available():
+            raise CommandError('aiohttp is required for the feed poller: pip install aiohttp')
+        for url in options['add']:
+            feeds.get_feed(url)
+
+        while True:
+            results = poll_due_feeds()
+            if results:
+                created = sum(r['created'] for r in results)
+                errors = sum(1 for r in results if r['status'] == 'error')
+                self.stdout.write(f'Polled {len(results)} feeds: {created} new mentions, {errors} errors')
+            if options['once']:
+                return
+            next_due = Feed.objects.filter(active=True, next_poll_at__isnull=False) \
+                .order_by('next_poll_at').values_list('next_poll_at', flat=True).first()
+            wait = options['max_sleep']
+            if next_due is not None:
+                wait = min(wait, max((next_due - timezone.now()).total_seconds(), 1.0))
+            time.sleep(wait)
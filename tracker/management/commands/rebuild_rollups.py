@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tracker import rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the hourly MentionRollup table from the mentions table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Only rebuild the last N days (default: everything)')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['days'] is not None:
+            since = timezone.now() - timedelta(days=options['days'])
+        rows = rollups.rebuild(since=since)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} rollup rows'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from tracker import topics
+
+
+class Command(BaseCommand):
+    help = ('Refit the topic model on the stored embeddings of recent mentions, publish it '
+            'as a new version and relabel the window (what the refit-topics beat task runs)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Window to fit on (default: TOPIC_REFIT_DAYS)')
+        parser.add_argument('--max-docs', type=int, default=None,
+                            help='Most recent mentions to use (default: TOPIC_REFIT_MAX_DOCS)')
+        parser.add_argument('--min-docs', type=int, default=None,
+                            help='Skip the refit below this many embedded mentions (default: TOPIC_MIN_DOCS)')
+
+    def handle(self, *args, **options):
+        summary = topics.refit(days=options['days'], max_docs=options['max_docs'],
+                               min_docs=options['min_docs'])
+        if summary['version'] is None:
+            self.stdout.write(self.style.WARNING(
+                f"No refit: {summary['documents']} embedded mentions in the window"))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Published {summary['version']}: {summary['topics']} topics from {summary['documents']} "
+            f"mentions, {summary['relabelled']} relabelled in {summary['seconds']}s"))
@@ -0,0 +1,36 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker import nlp
+from tracker.inference_server import InferenceServer
+
+
+class Command(BaseCommand):
+    help = ('Run the long-lived NLP inference server; point workers at it with '
+            'NLP_INFERENCE_ADDRESS so they stop loading their own model copies')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--address', default=nlp.NLP_INFERENCE_ADDRESS or '/tmp/brandtracker-nlp.sock',
+                            help="Unix socket path or host:port (default: NLP_INFERENCE_ADDRESS)")
+        parser.add_argument('--allow-remote', action='store_true',
+                            help='Allow a TCP address other than loopback; the protocol is '
+                                 'unauthenticated, so only on a network reachable by workers alone')
+        parser.add_argument('--max-batch', type=int, default=nlp.NLP_BATCH_SIZE * 2,
+                            help='Texts per merged batch')
+        parser.add_argument('--max-wait-ms', type=float, default=10.0,
+                            help='Longest a request waits for others to join its batch')
+
+    def handle(self, *args, **options):
+        # The server itself must never forward to an inference server
+        nlp.NLP_INFERENCE_ADDRESS = ''
+        status = nlp.warmup()
+        self.stdout.write(f"Models ready: {status}")
+        server = InferenceServer(options['address'], max_batch=options['max_batch'],
+                                 max_wait_ms=options['max_wait_ms'], allow_remote=options['allow_remote'])
+        try:
+            asyncio.run(server.serve_forever())
+        except ValueError as e:
+            raise CommandError(str(e))
+        except KeyboardInterrupt:
+            self.stdout.write(f"Stopped after {server.stats}")
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MentionEmbedding',
+            fields=[
+                ('mention', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='embedding', serialize=False, to='tracker.mention')),
+                ('model_name', models.CharField(max_length=255)),
+                ('dim', models.PositiveIntegerField()),
+                ('vector', models.BinaryField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:51
+
+import hashlib
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+def backfill_content_hash(apps, schema_editor):
+    # Frozen copy of tracker.utils.text_fingerprint
+    non_word = re.compile(r'[\W_]+', re.UNICODE)
+    Mention = apps.get_model('tracker', 'Mention')
+    batch = []
+    for m in Mention.objects.filter(content_hash__isnull=True).only('id', 'text').iterator(chunk_size=2000):
+        text = non_word.sub(' ', unicodedata.normalize('NFKC', m.text or '').casefold()).strip()
+        m.content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        batch.append(m)
+        if len(batch) >= 2000:
+            Mention.objects.bulk_update(batch, ['content_hash'])
+            batch = []
+    if batch:
+        Mention.objects.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0002_mentionembedding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mention',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='mention',
+            constraint=models.UniqueConstraint(fields=('source', 'external_id'), name='unique_mention_source_external_id'),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0004_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feed',
+            name='active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='feed',
+            name='next_poll_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='feed',
+            name='poll_interval',
+            field=models.PositiveIntegerField(default=300),
+        ),
+    ]
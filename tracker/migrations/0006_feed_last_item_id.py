@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0005_feed_scheduling'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feed',
+            name='last_item_id',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:55
+
+from datetime import timezone
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+
+
+def backfill_rollups(apps, schema_editor):
+    Mention = apps.get_model('tracker', 'Mention')
+    MentionRollup = apps.get_model('tracker', 'MentionRollup')
+    rows = (
+        Mention.objects.filter(processed=True)
+        .annotate(bucket_hour=TruncHour('created_at', tzinfo=timezone.utc))
+        .values('bucket_hour', 'source', 'sentiment', 'topic')
+        .annotate(n=Count('id'))
+    )
+    merged = {}
+    for row in rows.iterator():
+        key = (row['bucket_hour'], row['source'], row['sentiment'] or '', row['topic'] or '')
+        merged[key] = merged.get(key, 0) + row['n']
+    MentionRollup.objects.bulk_create(
+        [MentionRollup(hour=h, source=src, sentiment=sent, topic=topic, count=n)
+         for (h, src, sent, topic), n in merged.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0006_feed_last_item_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MentionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('source', models.CharField(max_length=50)),
+                ('sentiment', models.CharField(blank=True, max_length=20)),
+                ('topic', models.CharField(blank=True, max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='tracker_rollup_hour_idx')],
+                'constraints': [models.UniqueConstraint(fields=('hour', 'source', 'sentiment', 'topic'), name='unique_mention_rollup_bucket')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
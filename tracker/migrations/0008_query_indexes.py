@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0007_mentionrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['-created_at'], name='tracker_alert_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['resolved', 'created_at'], name='tracker_alert_resolved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mention',
+            index=models.Index(fields=['-created_at', '-id'], name='tracker_mention_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mention',
+            index=models.Index(fields=['processed', '-created_at'], name='tracker_mention_processed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mention',
+            index=models.Index(fields=['sentiment', 'created_at'], name='tracker_mention_sentiment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mention',
+            index=models.Index(fields=['source', 'created_at'], name='tracker_mention_source_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mention',
+            index=models.Index(fields=['topic', 'created_at'], name='tracker_mention_topic_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mention',
+            index=models.Index(condition=models.Q(('processed', False)), fields=['id'], name='tracker_mention_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:10
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_story_counts(apps, schema_editor):
+    # Mentions stored before clustering each count as their own story
+    MentionRollup = apps.get_model('tracker', 'MentionRollup')
+    MentionRollup.objects.update(story_count=F('count'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0008_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mention',
+            name='cluster_id',
+            field=models.BigIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mentionrollup',
+            name='story_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_story_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:22
+
+from django.db import migrations, models
+
+
+def create_archive_table(apps, schema_editor):
+    MentionArchive = apps.get_model('tracker', 'MentionArchive')
+    if schema_editor.connection.vendor != 'postgresql':
+        schema_editor.create_model(MentionArchive)
+        return
+    # Range-partitioned by created_at; the partition key has to be part of the
+    # primary key. Monthly partitions are created by tracker.retention as needed
+    quote = schema_editor.quote_name
+    columns = []
+    for field in MentionArchive._meta.local_fields:
+        if field.primary_key:
+            columns.append(f'{quote(field.column)} {field.db_type(schema_editor.connection)} NOT NULL')
+        else:
+            sql, _ = schema_editor.column_sql(MentionArchive, field)
+            columns.append(f'{quote(field.column)} {sql}')
+    table = quote(MentionArchive._meta.db_table)
+    schema_editor.execute(
+        f'CREATE TABLE {table} ({", ".join(columns)}, PRIMARY KEY ("id", "created_at")) '
+        f'PARTITION BY RANGE ("created_at")'
+    )
+    for index in MentionArchive._meta.indexes:
+        schema_editor.add_index(MentionArchive, index)
+
+
+def drop_archive_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model('tracker', 'MentionArchive'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0009_story_clusters'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='MentionArchive',
+                    fields=[
+                        ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                        ('source', models.CharField(max_length=50)),
+                        ('external_id', models.CharField(blank=True, max_length=255, null=True)),
+                        ('author', models.CharField(blank=True, max_length=255)),
+                        ('text', models.TextField()),
+                        ('created_at', models.DateTimeField()),
+                        ('fetched_at', models.DateTimeField()),
+                        ('language', models.CharField(default='en', max_length=10)),
+                        ('sentiment', models.CharField(blank=True, max_length=20, null=True)),
+                        ('sentiment_score', models.FloatField(blank=True, null=True)),
+                        ('topic', models.CharField(blank=True, max_length=255, null=True)),
+                        ('processed', models.BooleanField(default=True)),
+                        ('content_hash', models.CharField(blank=True, max_length=64, null=True)),
+                        ('cluster_id', models.BigIntegerField(blank=True, null=True)),
+                    ],
+                    options={
+                        'indexes': [models.Index(fields=['-created_at', '-id'], name='tracker_archive_created_idx')],
+                    },
+                ),
+            ],
+        ),
+        # The table itself, partitioned on PostgreSQL
+        migrations.RunPython(create_archive_table, drop_archive_table),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:49
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0010_mention_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mentionembedding',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='mentionembedding',
+            index=models.Index(fields=['model_name', 'updated_at', 'mention'], name='tracker_embedding_updated_idx'),
+        ),
+    ]
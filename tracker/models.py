@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 class Mention(models.Model):
     source = models.CharField(max_length=50, default='rss')
@@ -13,10 +14,108 @@ class Mention(models.Model):
     sentiment_score = models.FloatField(blank=True, null=True)
     topic = models.CharField(max_length=255, blank=True, null=True)
     processed = models.BooleanField(default=False)
+    # SHA-256 of the normalized text, see tracker.utils.text_fingerprint
+    content_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)
+    # Id of the mention that started this story, see tracker.clusters
+    cluster_id = models.BigIntegerField(blank=True, null=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'external_id'], name='unique_mention_source_external_id'),
+        ]
+        # Matched to the hot queries in views.py, tasks.py and stats.py;
+        # `manage.py explain_queries` checks that the planner picks them
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='tracker_mention_created_idx'),
+            models.Index(fields=['processed', '-created_at'], name='tracker_mention_processed_idx'),
+            models.Index(fields=['sentiment', 'created_at'], name='tracker_mention_sentiment_idx'),
+            models.Index(fields=['source', 'created_at'], name='tracker_mention_source_idx'),
+            models.Index(fields=['topic', 'created_at'], name='tracker_mention_topic_idx'),
+            # Partial index: only the small unprocessed backlog is indexed
+            models.Index(fields=['id'], condition=models.Q(processed=False), name='tracker_mention_pending_idx'),
+        ]
 
     def __str__(self):
         return f"{self.source} @ {self.created_at}: {self.text[:50]}"
 
+class MentionRollup(models.Model):
+    """Processed-mention counts per (hour, source, sentiment, topic), kept up to date
+    as mentions are analyzed; rebuild with `manage.py rebuild_rollups`"""
+    hour = models.DateTimeField()
+    source = models.CharField(max_length=50)
+    sentiment = models.CharField(max_length=20, blank=True)
+    topic = models.CharField(max_length=255, blank=True)
+    count = models.IntegerField(default=0)
+    # Mentions that started a story cluster, i.e. distinct stories
+    story_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'source', 'sentiment', 'topic'], name='unique_mention_rollup_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['hour'], name='tracker_rollup_hour_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H}:00 {self.source}/{self.sentiment}/{self.topic}: {self.count}"
+
+class MentionArchive(models.Model):
+    """Processed mentions moved out of the hot table by tracker.retention.
+
+    On PostgreSQL the table is range-partitioned by month on created_at (see
+    migration 0010), so whole months can be frozen to files and dropped.
+    Rows keep their original id; rollups keep counting them.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    source = models.CharField(max_length=50)
+    external_id = models.CharField(max_length=255, blank=True, null=True)
+    author = models.CharField(max_length=255, blank=True)
+    text = models.TextField()
+    created_at = models.DateTimeField()
+    fetched_at = models.DateTimeField()
+    language = models.CharField(max_length=10, default='en')
+    sentiment = models.CharField(max_length=20, blank=True, null=True)
+    sentiment_score = models.FloatField(blank=True, null=True)
+    topic = models.CharField(max_length=255, blank=True, null=True)
+    processed = models.BooleanField(default=True)
+    content_hash = models.CharField(max_length=64, blank=True, null=True)
+    cluster_id = models.BigIntegerField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='tracker_archive_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} @ {self.created_at} (archived): {self.text[:50]}"
+
+class Feed(models.Model):
+    """An RSS/Atom feed and the HTTP state needed to poll it cheaply"""
+    url = models.URLField(max_length=500, unique=True)
+    active = models.BooleanField(default=True)
+    # Seconds between polls; the poller adds jitter and backs off on errors
+    poll_interval = models.PositiveIntegerField(default=300)
+    next_poll_at = models.DateTimeField(blank=True, null=True, db_index=True)
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=100, blank=True)
+    # SHA-256 of the last body that was ingested
+    content_hash = models.CharField(max_length=64, blank=True)
+    # guid (or link) of the newest item of the last ingested body
+    last_item_id = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_fetched_at = models.DateTimeField(blank=True, null=True)
+    last_fetch_duration = models.FloatField(blank=True, null=True)
+    last_status = models.PositiveSmallIntegerField(blank=True, null=True)
+    fetch_count = models.PositiveIntegerField(default=0)
+    not_modified_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    consecutive_errors = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return self.url
+
 class Alert(models.Model):
     mention = models.ForeignKey(Mention, on_delete=models.CASCADE)
     alert_type = models.CharField(max_length=100)
@@ -24,5 +123,28 @@ class Alert(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     resolved = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], name='tracker_alert_created_idx'),
+            models.Index(fields=['resolved', 'created_at'], name='tracker_alert_resolved_idx'),
+        ]
+
     def __str__(self):
         return f"{self.alert_type} @ {self.created_at}"
+
+class MentionEmbedding(models.Model):
+    """Sentence embedding of a mention, stored as raw little-endian float32 bytes"""
+    mention = models.OneToOneField(Mention, on_delete=models.CASCADE, primary_key=True, related_name='embedding')
+    model_name = models.CharField(max_length=255)
+    dim = models.PositiveIntegerField()
+    vector = models.BinaryField()
+    # Set on every upsert; vector indexes in other processes follow the table by it
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model_name', 'updated_at', 'mention'], name='tracker_embedding_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model_name}[{self.dim}] for mention {self.mention_id}"
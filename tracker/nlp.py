@@ -1,7 +1,9 @@
 # tracker/nlp.py - transformer-based NLP with lightweight fallback
-import pickle
 import os
 import logging
+import time
+
+from .lexicon import get_lexicon
 
 logger = logging.getLogger(__name__)
 
@@ -11,7 +13,8 @@ USE_LIGHTWEIGHT_NLP = os.environ.get('USE_LIGHTWEIGHT_NLP', 'false').lower() ==
 # Try to import heavy ML libraries, fallback to TextBlob if not available
 _sentiment = None
 _embedder = None
-_topic_model = None
+# (model, version) as one tuple so a hot swap replaces both in a single assignment
+_topic = (None, None)
 _transformers_available = False
 _sentence_transformers_available = False
 _bertopic_available = False
@@ -51,6 +54,29 @@ except ImportError:
 
 SENTIMENT_MODEL_NAME = os.environ.get('SENTIMENT_MODEL','distilbert-base-uncased-finetuned-sst-2-english')
 EMBED_MODEL_NAME = os.environ.get('EMBED_MODEL','all-MiniLM-L6-v2')
+# Texts per forward pass when analyzing a batch of mentions
+NLP_BATCH_SIZE = int(os.environ.get('NLP_BATCH_SIZE', '32'))
+# Optional shared inference server: '/path/to.sock' or 'host:port'
+NLP_INFERENCE_ADDRESS = os.environ.get('NLP_INFERENCE_ADDRESS', '')
+# Model runtime: 'torch', 'onnx' or 'onnx-int8' (see tracker.onnx_backend)
+NLP_BACKEND = os.environ.get('NLP_BACKEND', 'torch').lower()
+
+def _load_onnx(kind, model_name):
+    """ONNX Runtime version of a model when NLP_BACKEND asks for one, else None"""
+    if not NLP_BACKEND.startswith('onnx'):
+        return None
+    try:
+        from . import onnx_backend
+        if not onnx_backend.onnx_available():
+            logger.warning("onnxruntime not available, using the PyTorch models")
+            return None
+        load = onnx_backend.load_sentiment if kind == 'sentiment' else onnx_backend.load_embedder
+        model = load(model_name, quantize=NLP_BACKEND == 'onnx-int8')
+        logger.info(f"Loaded {kind} model {model_name} on ONNX Runtime ({NLP_BACKEND})")
+        return model
+    except Exception as e:
+        logger.warning(f"Error loading ONNX {kind} model, using PyTorch: {e}")
+        return None
 
 def _get_sentiment_pipeline():
     global _sentiment
@@ -59,6 +85,9 @@ def _get_sentiment_pipeline():
             _sentiment = 'textblob'  # Use TextBlob
             logger.info("Using TextBlob for sentiment analysis (lightweight mode)")
         else:
+            _sentiment = _load_onnx('sentiment', SENTIMENT_MODEL_NAME)
+            if _sentiment is not None:
+                return _sentiment
             try:
                 _sentiment = pipeline('text-classification', model=SENTIMENT_MODEL_NAME, truncation=True)
                 logger.info(f"Loaded sentiment model: {SENTIMENT_MODEL_NAME}")
@@ -74,6 +103,9 @@ def _get_embedder():
             _embedder = None  # Skip embeddings in lightweight mode
             logger.info("Skipping embeddings in lightweight mode")
         else:
+            _embedder = _load_onnx('embedder', EMBED_MODEL_NAME)
+            if _embedder is not None:
+                return _embedder
             try:
                 _embedder = SentenceTransformer(EMBED_MODEL_NAME)
                 logger.info(f"Loaded embedding model: {EMBED_MODEL_NAME}")
@@ -92,128 +124,281 @@ def encode_text(text):
     emb = embedder.encode(text, show_progress_bar=False)
     return np.array(emb)
 
-def analyze_text(text, use_topic=True):
-    text = (text or '').strip()
-    if not text:
-        return 'neutral', 0.0, 'general', None
-    
+_readiness = {'ready': False}
+
+def warmup(run_inference=True):
+    """Load every model up front and optionally run one dummy batch through them.
+
+    Returns (and remembers, see readiness()) which models are loaded. With
+    run_inference=False only weights are loaded, which is what a prefork
+    parent should do: children then share the pages copy-on-write and run
+    their own dummy batch, without inheriting thread pools across fork.
+    With NLP_INFERENCE_ADDRESS set nothing is loaded; the process is ready
+    once the inference server answers a ping.
+    """
+    started = time.monotonic()
+    if NLP_INFERENCE_ADDRESS:
+        return _warmup_remote(started)
+    sentiment = _get_sentiment_pipeline()
+    embedder = _get_embedder()
+    get_lexicon()
+    _refresh_topic_model(force=True)
+    if run_inference:
+        analyze_texts(['Warm-up: the new release is great, but the update broke the app.'])
+    _readiness.update({
+        'ready': run_inference,
+        'loaded': True,
+        'sentiment': 'lexicon' if sentiment == 'textblob' else SENTIMENT_MODEL_NAME,
+        'embedder': EMBED_MODEL_NAME if embedder is not None else None,
+        'topic_model': topic_version(),
+        'backend': NLP_BACKEND,
+        'pid': os.getpid(),
+        'seconds': round(time.monotonic() - started, 3),
+    })
+    logger.info(f"NLP warm-up finished: {_readiness}")
+    if run_inference:
+        _touch_ready_file()
+    return dict(_readiness)
+
+def _warmup_remote(started):
+    # Models live in the inference server: don't load copies here, only check it answers
+    from .inference_server import ping
+    stats = ping(NLP_INFERENCE_ADDRESS)
+    get_lexicon()  # the fallback if the server goes away, cheap to build
+    _readiness.update({
+        'ready': stats is not None,
+        'loaded': False,
+        'inference_server': NLP_INFERENCE_ADDRESS,
+        'server_stats': stats,
+        'pid': os.getpid(),
+        'seconds': round(time.monotonic() - started, 3),
+    })
+    logger.info(f"NLP warm-up finished: {_readiness}")
+    if stats is not None:
+        _touch_ready_file()
+    return dict(_readiness)
+
+def _touch_ready_file():
+    ready_file = os.environ.get('NLP_READY_FILE')
+    if ready_file:
+        # Touch a file for container readiness probes
+        with open(ready_file, 'w') as f:
+            f.write(str(os.getpid()))
+
+def readiness():
+    return dict(_readiness)
+
+def _label_to_sentiment(res):
+    label = res.get('label','')
+    score = float(res.get('score',0.0))
+    if label.lower() in ['positive','pos']:
+        sentiment = 'positive'
+    elif label.lower() in ['negative','neg']:
+        sentiment = 'negative'
+    else:
+        sentiment = 'positive' if score>0.6 else ('negative' if score<0.4 else 'neutral')
+    return sentiment, score
+
+def set_topic_model(model, version):
+    """Install a topic model; in-flight batches finish on the one they started with"""
+    global _topic
+    _topic = (model, version)
+
+def topic_version():
+    return _topic[1] if _topic[0] is not None else None
+
+def topic_label(topic_id, model=None):
+    topic_info = (model or _topic[0]).get_topic(topic_id)
+    if isinstance(topic_info, list):
+        return ' '.join([w for w,_ in topic_info[:5]])
+    return str(topic_info)
+
+def model_version(use_topic=True):
+    """Identifies everything that can change a result, for the result cache key.
+
+    Workers using an inference server never load the models, so the
+    configuration stands in for whatever has not been loaded here, and the
+    published topic model version (one small file read, see tracker.topics)
+    for the topic model the server follows.
+    """
+    lightweight = USE_LIGHTWEIGHT_NLP or not _transformers_available
+    if _sentiment is not None:
+        lightweight = _sentiment == 'textblob'
+    embeds = not USE_LIGHTWEIGHT_NLP and _sentence_transformers_available
+    if _embedder is not None:
+        embeds = True
+    parts = [
+        NLP_BACKEND,
+        get_lexicon().version if lightweight else SENTIMENT_MODEL_NAME,
+        EMBED_MODEL_NAME if embeds else '-',
+    ]
+    if use_topic:
+        if _topic[0] is not None and not NLP_INFERENCE_ADDRESS:
+            parts.append(_topic[1] or 'topic')
+        else:
+            from .topics import current_version
+            parts.append(current_version() or '-')
+    return '|'.join(parts)
+
+def analyze_texts(texts, use_topic=True, batch_size=None):
+    """Analyze a list of texts with one batched call per model.
+
+    Returns a list of (sentiment, score, topic_label, emb_bytes) tuples in the
+    same order as ``texts``. Texts seen before (after normalization, see
+    tracker.analysis_cache) are served from the result cache. When
+    NLP_INFERENCE_ADDRESS points at a running inference server (see
+    tracker.inference_server) the rest are sent there, falling back to the
+    in-process models if it can't be reached.
+    """
+    texts = list(texts)
+    cache = None
+    if texts and use_topic and not NLP_INFERENCE_ADDRESS:
+        _refresh_topic_model()
+    if texts:
+        from .analysis_cache import get_analysis_cache
+        cache = get_analysis_cache()
+    if cache is None:
+        return _analyze_uncached(texts, use_topic, batch_size)
+
+    if not NLP_INFERENCE_ADDRESS:
+        # Load first so the key names the models that really run, not ones that failed to load
+        _get_sentiment_pipeline()
+        if not USE_LIGHTWEIGHT_NLP and _sentence_transformers_available and _numpy_available:
+            _get_embedder()
+    version = model_version(use_topic)
+    keys = [cache.key(t or '', version) for t in texts]
+    found = cache.get_many(list(dict.fromkeys(keys)))
+    # Copies within the batch are analyzed once
+    todo = {}
+    for text, key in zip(texts, keys):
+        if key not in found:
+            todo.setdefault(key, text)
+    if todo:
+        fresh = dict(zip(todo, _analyze_uncached(list(todo.values()), use_topic, batch_size)))
+        # A fallback from an unreachable inference server to other models changes
+        # the version; those results are not what the key stands for
+        if model_version(use_topic) == version:
+            cache.set_many(fresh)
+        found.update(fresh)
+    return [found[key] for key in keys]
+
+def _refresh_topic_model(force=False):
+    # Pick up a newly published refit (throttled, see tracker.topics)
+    if USE_LIGHTWEIGHT_NLP or not _bertopic_available:
+        return
+    try:
+        from .topics import ensure_current
+        ensure_current(force=force)
+    except Exception as e:
+        logger.warning(f"Topic model check failed: {e}")
+
+def _analyze_uncached(texts, use_topic, batch_size):
+    if NLP_INFERENCE_ADDRESS and texts:
+        from .inference_server import remote_analyze
+        results = remote_analyze(NLP_INFERENCE_ADDRESS, texts, use_topic)
+        if results is not None:
+            return results
+    return analyze_texts_local(texts, use_topic=use_topic, batch_size=batch_size)
+
+def analyze_texts_local(texts, use_topic=True, batch_size=None):
+    """analyze_texts() on the models loaded in this process"""
+    texts = [(t or '').strip() for t in texts]
+    results = [('neutral', 0.0, 'general', None) for _ in texts]
+    # Empty texts keep the default result and never reach the models
+    idx = [i for i, t in enumerate(texts) if t]
+    if not idx:
+        return results
+    batch = [texts[i] for i in idx]
+    batch_size = batch_size or NLP_BATCH_SIZE
+
     # Sentiment analysis
-    sentiment = 'neutral'
-    score = 0.0
-    
+    sentiments = [('neutral', 0.0)] * len(batch)
     try:
         sentiment_pipeline = _get_sentiment_pipeline()
-        
+
         if sentiment_pipeline == 'textblob' or not _transformers_available:
-            # Pure Python keyword-based sentiment analysis (no dependencies)
-            text_lower = text.lower()
-            
-            # Expanded keyword lists for better accuracy
-            positive_words = [
-                'good', 'great', 'excellent', 'amazing', 'love', 'best', 'awesome', 'fantastic',
-                'wonderful', 'perfect', 'brilliant', 'outstanding', 'superb', 'terrific', 'fabulous',
-                'delighted', 'pleased', 'satisfied', 'happy', 'joy', 'enjoy', 'like', 'prefer',
-                'recommend', 'praise', 'appreciate', 'admire', 'impressed', 'success', 'win', 'victory'
-            ]
-            negative_words = [
-                'bad', 'terrible', 'awful', 'hate', 'worst', 'horrible', 'disappointed',
-                'poor', 'worst', 'fail', 'failure', 'problem', 'issue', 'error', 'mistake',
-                'disgusting', 'annoying', 'frustrated', 'angry', 'upset', 'sad', 'unhappy',
-                'dislike', 'complain', 'criticize', 'blame', 'fault', 'defect', 'broken'
-            ]
-            
-            # Count occurrences
-            pos_count = sum(1 for word in positive_words if word in text_lower)
-            neg_count = sum(1 for word in negative_words if word in text_lower)
-            
-            # Calculate sentiment
-            total_words = len(text_lower.split())
-            if total_words > 0:
-                pos_ratio = pos_count / total_words
-                neg_ratio = neg_count / total_words
-                score = max(pos_ratio, neg_ratio) * 2  # Scale to 0-1 range
-            else:
-                score = 0.5
-            
-            if pos_count > neg_count:
-                sentiment = 'positive'
-                score = min(0.9, 0.5 + (pos_count - neg_count) * 0.1)
-            elif neg_count > pos_count:
-                sentiment = 'negative'
-                score = min(0.9, 0.5 + (neg_count - pos_count) * 0.1)
-            else:
-                sentiment = 'neutral'
-                score = 0.5
+            # Compiled lexicon, see tracker.lexicon
+            sentiments = get_lexicon().score_many(batch)
         else:
-            # Use transformers
-            res = sentiment_pipeline(text[:512])[0]
-            label = res.get('label','')
-            score = float(res.get('score',0.0))
-            if label.lower() in ['positive','pos']:
-                sentiment = 'positive'
-            elif label.lower() in ['negative','neg']:
-                sentiment = 'negative'
-            else:
-                sentiment = 'positive' if score>0.6 else ('negative' if score<0.4 else 'neutral')
+            # Use transformers, one forward pass per batch_size texts
+            outputs = sentiment_pipeline([t[:512] for t in batch], batch_size=batch_size)
+            sentiments = [_label_to_sentiment(res) for res in outputs]
     except Exception as e:
         logger.warning(f"Sentiment analysis error: {e}")
-        sentiment, score = 'neutral', 0.0
+        sentiments = [('neutral', 0.0)] * len(batch)
 
     # Embeddings (skip in lightweight mode)
-    emb_bytes = None
+    embeddings = None
     if not USE_LIGHTWEIGHT_NLP and _sentence_transformers_available and _numpy_available:
         try:
             embedder = _get_embedder()
             if embedder is not None:
-                emb = embedder.encode(text, show_progress_bar=False)
-                emb_bytes = pickle.dumps(np.array(emb))
+                embeddings = np.asarray(embedder.encode(batch, batch_size=batch_size, show_progress_bar=False))
         except Exception:
-            emb_bytes = None
+            embeddings = None
 
     # Topic modeling (skip in lightweight mode)
-    topic_label = 'general'
-    global _topic_model
-    if use_topic and _topic_model is not None and not USE_LIGHTWEIGHT_NLP and _bertopic_available:
+    topic_labels = ['general'] * len(batch)
+    topic_model = _topic[0]
+    if use_topic and topic_model is not None and not USE_LIGHTWEIGHT_NLP and _bertopic_available:
         try:
-            topics, probs = _topic_model.transform([text])
-            t = topics[0]
-            topic_info = _topic_model.get_topic(t)
-            if isinstance(topic_info, list):
-                topic_label = ' '.join([w for w,_ in topic_info[:5]])
-            else:
-                topic_label = str(topic_info)
+            # Reuses this batch's embeddings, the texts are not encoded again
+            topics, probs = topic_model.transform(batch, embeddings)
+            topic_labels = [topic_label(t, topic_model) for t in topics]
         except Exception:
-            topic_label = 'general'
-    
-    return sentiment, score, topic_label, emb_bytes
+            topic_labels = ['general'] * len(batch)
+
+    for j, i in enumerate(idx):
+        sentiment, score = sentiments[j]
+        # Raw little-endian float32, see tracker.embeddings for the loader
+        emb_bytes = np.asarray(embeddings[j], dtype='<f4').tobytes() if embeddings is not None else None
+        results[i] = (sentiment, score, topic_labels[j], emb_bytes)
+    return results
+
+def analyze_text(text, use_topic=True):
+    return analyze_texts([text], use_topic=use_topic)[0]
 
-def fit_topic_model(texts, n_components=5):
-    global _topic_model
+def fit_topic_model(texts, n_components=5, embeddings=None, install=True):
+    """Fit BERTopic on texts, reusing precomputed embeddings when given.
+
+    With install=False the model is only returned, e.g. so a refit can be
+    saved before workers switch to it (see tracker.topics).
+    """
     if USE_LIGHTWEIGHT_NLP or not _bertopic_available or not _sentence_transformers_available:
         logger.warning("Topic modeling not available in lightweight mode")
         return None
     try:
-        embedder = _get_embedder()
-        if embedder is None:
-            logger.warning("Embedder not available for topic modeling")
-            return None
-        embeddings = embedder.encode(texts, show_progress_bar=True)
-        topic_model = BERTopic(n_components=n_components, calculate_probabilities=False, verbose=False)
+        if embeddings is None:
+            embedder = _get_embedder()
+            if embedder is None:
+                logger.warning("Embedder not available for topic modeling")
+                return None
+            embeddings = embedder.encode(texts, show_progress_bar=True)
+        # n_components is the UMAP dimensionality, BERTopic itself doesn't take it
+        from umap import UMAP
+        umap_model = UMAP(n_components=n_components, n_neighbors=15, min_dist=0.0,
+                          metric='cosine', random_state=42)
+        topic_model = BERTopic(umap_model=umap_model, calculate_probabilities=False, verbose=False)
         topics, probs = topic_model.fit_transform(texts, embeddings)
-        _topic_model = topic_model
-        logger.info(f"Fitted topic model with {n_components} components")
+        if install:
+            set_topic_model(topic_model, f'fit-{time.time():.0f}')
+        logger.info(f"Fitted topic model with {n_components} components on {len(texts)} texts")
         return topic_model
     except Exception as e:
         logger.error(f"Error fitting topic model: {e}")
         raise
 
-def save_topic_model(path):
-    global _topic_model
-    if _topic_model is None:
+def save_topic_model(path, model=None):
+    model = model or _topic[0]
+    if model is None:
         raise RuntimeError('topic model not fitted')
-    _topic_model.save(path)
+    model.save(path)
+
+def read_topic_model(path):
+    """Load a saved topic model without installing it"""
+    return BERTopic.load(path)
 
 def load_topic_model(path):
-    global _topic_model
-    _topic_model = BERTopic.load(path)
-    return _topic_model
+    model = read_topic_model(path)
+    set_topic_model(model, f'{os.path.basename(path)}-{os.path.getmtime(path):.0f}')
+    return model
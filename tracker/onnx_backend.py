@@ -0,0 +1,173 @@
+# tracker/onnx_backend.py - ONNX Runtime (optionally int8) versions of the NLP models
+#
+# The PyTorch models are exported to ONNX once and cached on disk, then served
+# through onnxruntime. The wrappers mimic the two call sites in tracker.nlp:
+# OnnxSentimentPipeline(texts, batch_size=...) returns [{'label', 'score'}]
+# like a transformers pipeline, OnnxEmbedder.encode(texts, ...) returns an
+# array like SentenceTransformer.encode.
+import json
+import logging
+import os
+import re
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import onnxruntime as ort
+    _onnxruntime_available = True
+except ImportError:
+    _onnxruntime_available = False
+
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+ONNX_CACHE_DIR = os.environ.get(
+    'NLP_ONNX_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'brandtracker', 'onnx')
+)
+ONNX_THREADS = int(os.environ.get('NLP_ONNX_THREADS', '0'))
+MAX_LENGTH = 512
+
+def onnx_available():
+    return _onnxruntime_available
+
+def artifact_dir(model_name, kind, quantize):
+    safe = re.sub(r'[^A-Za-z0-9_.-]+', '--', model_name)
+    return os.path.join(ONNX_CACHE_DIR, f"{kind}-{safe}{'-int8' if quantize else ''}")
+
+def _export(model, tokenizer, path, output_names):
+    """Export a transformers model to ONNX with dynamic batch and sequence axes"""
+    import torch
+    sample = tokenizer(['warm-up text'], return_tensors='pt')
+    input_names = [n for n in ('input_ids', 'attention_mask', 'token_type_ids') if n in sample]
+    dynamic_axes = {n: {0: 'batch', 1: 'sequence'} for n in input_names}
+    for name in output_names:
+        dynamic_axes[name] = {0: 'batch'}
+    model.eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            model, tuple(sample[n] for n in input_names), path,
+            input_names=input_names, output_names=output_names,
+            dynamic_axes=dynamic_axes, opset_version=14,
+        )
+
+def _quantize(src, dst):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(src, dst, weight_type=QuantType.QInt8)
+    os.remove(src)
+
+def _prepare(model_name, kind, quantize, build):
+    """Return the cache directory for an artifact, exporting it first if missing.
+
+    build(directory, fp32_path) exports the fp32 model and returns the
+    metadata to store next to it.
+    """
+    directory = artifact_dir(model_name, kind, quantize)
+    model_path = os.path.join(directory, 'model.onnx')
+    meta_path = os.path.join(directory, 'meta.json')
+    if os.path.exists(model_path) and os.path.exists(meta_path):
+        return directory
+    os.makedirs(directory, exist_ok=True)
+    logger.info(f"Exporting {model_name} to ONNX in {directory}")
+    fp32_path = os.path.join(directory, 'model-fp32.onnx') if quantize else model_path
+    meta = build(directory, fp32_path)
+    if quantize:
+        _quantize(fp32_path, model_path)
+    meta.update({'model_name': model_name, 'quantized': quantize})
+    # meta.json last: its presence marks a complete export
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+    return directory
+
+def _session(path):
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if ONNX_THREADS:
+        options.intra_op_num_threads = ONNX_THREADS
+    return ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+
+class _OnnxModel:
+    def __init__(self, directory):
+        from transformers import AutoTokenizer
+        with open(os.path.join(directory, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.tokenizer = AutoTokenizer.from_pretrained(directory)
+        self.session = _session(os.path.join(directory, 'model.onnx'))
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.max_length = min(self.meta.get('max_length') or MAX_LENGTH, MAX_LENGTH)
+
+    def _run(self, texts):
+        encoded = self.tokenizer(
+            list(texts), padding=True, truncation=True, max_length=self.max_length, return_tensors='np'
+        )
+        feed = {k: v.astype(np.int64) for k, v in encoded.items() if k in self.input_names}
+        return self.session.run(None, feed)[0], encoded['attention_mask']
+
+class OnnxSentimentPipeline(_OnnxModel):
+    """Stand-in for pipeline('text-classification') on ONNX Runtime"""
+
+    def __call__(self, texts, batch_size=32, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        id2label = self.meta['id2label']
+        out = []
+        for start in range(0, len(texts), batch_size):
+            logits, _ = self._run(texts[start:start + batch_size])
+            logits = logits - logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            for row in probs:
+                best = int(row.argmax())
+                out.append({'label': id2label[str(best)], 'score': float(row[best])})
+        return out
+
+class OnnxEmbedder(_OnnxModel):
+    """Stand-in for SentenceTransformer.encode on ONNX Runtime"""
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, **kwargs):
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        chunks = []
+        for start in range(0, len(texts), batch_size):
+            hidden, mask = self._run(texts[start:start + batch_size])
+            if self.meta.get('pooling') == 'cls':
+                pooled = hidden[:, 0]
+            else:
+                mask = mask[..., None].astype(hidden.dtype)
+                pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if self.meta.get('normalize'):
+                pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            chunks.append(pooled.astype(np.float32))
+        result = np.concatenate(chunks) if chunks else np.zeros((0, 0), dtype=np.float32)
+        return result[0] if single else result
+
+def load_sentiment(model_name, quantize=False):
+    def build(directory, path):
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        _export(model, tokenizer, path, ['logits'])
+        tokenizer.save_pretrained(directory)
+        return {
+            'id2label': {str(k): v for k, v in model.config.id2label.items()},
+            'max_length': getattr(tokenizer, 'model_max_length', MAX_LENGTH),
+        }
+    return OnnxSentimentPipeline(_prepare(model_name, 'sentiment', quantize, build))
+
+def load_embedder(model_name, quantize=False):
+    def build(directory, path):
+        from sentence_transformers import SentenceTransformer
+        st = SentenceTransformer(model_name, device='cpu')
+        transformer = st[0]
+        pooling = 'mean'
+        normalize = False
+        for module in list(st)[1:]:
+            name = type(module).__name__
+            if name == 'Pooling' and getattr(module, 'pooling_mode_cls_token', False):
+                pooling = 'cls'
+            elif name == 'Normalize':
+                normalize = True
+        _export(transformer.auto_model, transformer.tokenizer, path, ['last_hidden_state'])
+        transformer.tokenizer.save_pretrained(directory)
+        return {'pooling': pooling, 'normalize': normalize, 'max_length': st.max_seq_length}
+    return OnnxEmbedder(_prepare(model_name, 'embedder', quantize, build))
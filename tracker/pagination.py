@@ -0,0 +1,89 @@
+# tracker/pagination.py - keyset (cursor) pagination on (created_at, id)
+import base64
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+def parse_limit(value, default, maximum):
+    """Clamp a user supplied limit to 1..maximum, falling back to default"""
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+class KeysetPagination(BasePagination):
+    """Newest-first pagination that seeks past the last (created_at, id) seen.
+
+    Unlike page-number pagination there is no COUNT(*) and no OFFSET, so
+    every page costs one index range scan of page_size + 1 rows however deep
+    the client pages. Views with a get_archive_queryset() method have pages
+    that reach back past the newest archived mention (tracker.retention)
+    merged with the same range of the archive.
+    """
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+
+    def encode_cursor(self, obj):
+        raw = f'{obj.created_at.isoformat()}|{obj.pk}'
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        value = request.query_params.get(self.cursor_query_param)
+        if not value:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode()
+            created_at, pk = raw.rsplit('|', 1)
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                raise ValueError(raw)
+            return created_at, int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound('Invalid cursor')
+
+    def _page(self, queryset, position, size):
+        queryset = queryset.order_by('-created_at', '-id')
+        if position is not None:
+            created_at, pk = position
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        return list(queryset[:size + 1])
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        size = parse_limit(request.query_params.get(self.page_size_query_param), self.page_size, self.max_page_size)
+        position = self.decode_cursor(request)
+        rows = self._page(queryset, position, size)
+        if hasattr(view, 'get_archive_queryset'):
+            from .retention import archived_until
+            until = archived_until()
+            # Archived rows are all older than `until`: a full page of newer hot rows can't contain one
+            if until is not None and (len(rows) <= size or rows[-1].created_at <= until):
+                rows += self._page(view.get_archive_queryset(), position, size)
+                rows = sorted(rows, key=lambda o: (o.created_at, o.pk), reverse=True)[:size + 1]
+        self.next_cursor = self.encode_cursor(rows[size - 1]) if len(rows) > size else None
+        return rows[:size]
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,118 @@
+# tracker/poller.py - asyncio poller for all registered feeds
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import feeds
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from a response at a time
+CHUNK_SIZE = 64 * 1024
+
+try:
+    import aiohttp
+    _aiohttp_available = True
+except ImportError:
+    _aiohttp_available = False
+
+def poller_available():
+    return _aiohttp_available
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+def _in_worker(func, *args):
+    # Worker threads hold their own DB connection; drop it if it went stale
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+def _body_chunks(loop, resp):
+    """Blocking iterator over a response body for a worker thread; the reads run on the loop.
+
+    The caller can stop early (the parser reached known items) and the rest
+    of the body is never downloaded.
+    """
+    if resp.status == 304:
+        return
+    chunks = resp.content.iter_chunked(CHUNK_SIZE)
+    while True:
+        try:
+            yield asyncio.run_coroutine_threadsafe(chunks.__anext__(), loop).result()
+        except StopAsyncIteration:
+            return
+
+def _apply_response(feed, status, headers, chunks, started):
+    from .tasks import handle_feed_response
+    try:
+        result = handle_feed_response(feed, status, headers, chunks, started)
+    except Exception as e:
+        feeds.record_error(feed, e, time.monotonic() - started, status)
+        raise
+    finally:
+        feeds.schedule_next_poll(feed)
+    return result
+
+def _apply_error(feed, error, started, status=None):
+    feeds.record_error(feed, error, time.monotonic() - started, status)
+    feeds.schedule_next_poll(feed)
+
+async def _poll_one(session, feed, executor):
+    loop = asyncio.get_running_loop()
+    started = time.monotonic()
+    try:
+        async with session.get(feed.url, headers=feeds.request_headers(feed)) as resp:
+            if resp.status >= 400:
+                await loop.run_in_executor(
+                    executor, _in_worker, _apply_error, feed, f'HTTP {resp.status}', started, resp.status
+                )
+                return {'url': feed.url, 'status': 'error', 'created': 0}
+            # Parsing and DB writes run in the worker pool so the loop keeps serving
+            # other hosts; the body streams into the parser as it arrives. The headers
+            # are copied case-insensitively: aiohttp reports ETag as "Etag"
+            try:
+                result = await loop.run_in_executor(
+                    executor, _in_worker, _apply_response, feed, resp.status, resp.headers.copy(),
+                    _body_chunks(loop, resp), started
+                )
+            except Exception as e:
+                # Read errors included; _apply_response already recorded them
+                logger.warning(f"Error ingesting feed {feed.url}: {e!r}")
+                return {'url': feed.url, 'status': 'error', 'created': 0}
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        await loop.run_in_executor(executor, _in_worker, _apply_error, feed, repr(e), started)
+        logger.warning(f"Feed poll failed for {feed.url}: {e!r}")
+        return {'url': feed.url, 'status': 'error', 'created': 0}
+    return {'url': feed.url, **result}
+
+async def poll_feeds_async(feed_list):
+    """Poll the given feeds concurrently over one pooled keep-alive session"""
+    connector = aiohttp.TCPConnector(
+        limit=_setting('FEED_POLL_CONCURRENCY', 20),
+        limit_per_host=_setting('FEED_POLL_PER_HOST', 2),
+        ttl_dns_cache=300,
+    )
+    timeout = aiohttp.ClientTimeout(total=_setting('FEED_POLL_TIMEOUT', 20))
+    with ThreadPoolExecutor(max_workers=_setting('FEED_PARSE_WORKERS', 4)) as executor:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            return await asyncio.gather(*(_poll_one(session, feed, executor) for feed in feed_list))
+
+def poll_due_feeds():
+    """Poll every feed whose next_poll_at has passed; returns per-feed results"""
+    if not _aiohttp_available:
+        raise RuntimeError('aiohttp is required for the feed poller: pip install aiohttp')
+    due = feeds.claim_due_feeds()
+    if not due:
+        return []
+    started = time.monotonic()
+    results = asyncio.run(poll_feeds_async(due))
+    created = sum(r['created'] for r in results)
+    logger.info(f"Polled {len(due)} feeds in {time.monotonic() - started:.2f}s, created {created} mentions")
+    return results
@@ -0,0 +1,23 @@
+# tracker/reanalysis.py - process pool workers for `manage.py reanalyze`
+#
+# Kept free of module-level Django imports: spawned workers unpickle these
+# functions by importing this module before Django is set up.
+import os
+
+def init_worker(threads):
+    """Set up Django and load the models once per worker process"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'brandtracker.settings')
+    import django
+    django.setup()
+    if threads:
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+    from .nlp import warmup
+    warmup()
+
+def analyze_chunk(ids, texts, use_topic):
+    from .nlp import analyze_texts_local
+    return ids, analyze_texts_local(texts, use_topic=use_topic)
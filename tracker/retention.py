@@ -0,0 +1,216 @@
+# tracker/retention.py - moving old mentions out of the hot table
+#
+# Processed mentions older than RETENTION_DAYS are moved, in id-ordered
+# batches, into MentionArchive (monthly range partitions on PostgreSQL, a
+# plain table elsewhere) and deleted from Mention together with their
+# embeddings. Months older than RETENTION_COLD_DAYS are then written to
+# compressed files under RETENTION_ARCHIVE_DIR and dropped from the archive.
+# Rollups are left alone, so dashboard counts still include everything.
+import gzip
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .models import Alert, Mention, MentionArchive
+from .rollups import floor_hour
+
+logger = logging.getLogger(__name__)
+
+# Columns copied from Mention to MentionArchive
+FIELDS = [f.attname for f in MentionArchive._meta.concrete_fields]
+
+LOCK_ID = 0x61726368
+
+def _advisory_lock(shared):
+    # Archive batches share the lock, freezing a month takes it alone (PostgreSQL)
+    if connection.vendor == 'postgresql':
+        fn = 'pg_advisory_xact_lock_shared' if shared else 'pg_advisory_xact_lock'
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT {fn}(%s)', [LOCK_ID])
+
+def archive_dir():
+    return str(getattr(settings, 'RETENTION_ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'archive')))
+
+def _month_start(dt):
+    return dt.astimezone(dt_timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def _next_month(start):
+    return (start + timedelta(days=32)).replace(day=1)
+
+def _partition_name(start):
+    return f'{MentionArchive._meta.db_table}_p{start:%Y%m}'
+
+def _partitioned():
+    return connection.vendor == 'postgresql'
+
+def ensure_partitions(first, last):
+    """Create the monthly archive partitions covering first..last (PostgreSQL only)"""
+    if not _partitioned():
+        return
+    quote = connection.ops.quote_name
+    start = _month_start(first)
+    with connection.cursor() as cursor:
+        while start <= last:
+            end = _next_month(start)
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {quote(_partition_name(start))} '
+                f'PARTITION OF {quote(MentionArchive._meta.db_table)} '
+                f'FOR VALUES FROM (%s) TO (%s)', [start, end]
+            )
+            start = end
+
+_archived_until = (0.0, None)
+_archived_lock = threading.Lock()
+
+def archived_until(max_age=60):
+    """created_at of the newest archived mention (None if the archive is empty), cached for max_age seconds"""
+    global _archived_until
+    checked, value = _archived_until
+    if time.monotonic() - checked < max_age:
+        return value
+    with _archived_lock:
+        value = MentionArchive.objects.aggregate(n=Max('created_at'))['n']
+        _archived_until = (time.monotonic(), value)
+    return value
+
+def _frozen_until():
+    # End of the newest month written out by freeze_archive()
+    try:
+        names = [n for n in os.listdir(archive_dir()) if n.startswith('mentions-') and not n.endswith('.tmp')]
+    except OSError:
+        return None
+    if not names:
+        return None
+    year, month = max(names)[len('mentions-'):len('mentions-YYYY-MM')].split('-')
+    return _next_month(datetime(int(year), int(month), 1, tzinfo=dt_timezone.utc))
+
+def hot_since():
+    """Start of the first hour that was never archived; rollups before it can't be rebuilt"""
+    until = archived_until(max_age=0)
+    bounds = [b for b in (until and floor_hour(until) + timedelta(hours=1), _frozen_until()) if b]
+    return max(bounds) if bounds else None
+
+def _candidates(cutoff):
+    # Mentions an alert points to stay hot: deleting them would cascade to the alert
+    return (
+        Mention.objects.filter(processed=True, created_at__lt=cutoff)
+        .exclude(id__in=Alert.objects.values('mention_id'))
+    )
+
+def archive_mentions(days=None, batch_size=None, limit=None):
+    """Move processed mentions older than ``days`` (RETENTION_DAYS) to the archive; returns the number moved"""
+    days = days if days is not None else getattr(settings, 'RETENTION_DAYS', 0)
+    if not days:
+        return 0
+    batch_size = batch_size or getattr(settings, 'RETENTION_BATCH_SIZE', 1000)
+    # Whole hours only, so an hour's rollup bucket is either archived or hot
+    cutoff = floor_hour(timezone.now() - timedelta(days=days))
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(MentionArchive._meta.get_field(f).column) for f in FIELDS)
+    moved = 0
+    last_id = 0
+    started = time.monotonic()
+    while limit is None or moved < limit:
+        size = batch_size if limit is None else min(batch_size, limit - moved)
+        ids = list(_candidates(cutoff).filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:size])
+        if not ids:
+            break
+        last_id = ids[-1]
+        batch = Mention.objects.filter(id__in=ids)
+        with transaction.atomic():
+            _advisory_lock(shared=True)
+            bounds = batch.aggregate(first=Min('created_at'), last=Max('created_at'))
+            ensure_partitions(bounds['first'], bounds['last'])
+            select, params = batch.values_list(*FIELDS).query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'INSERT INTO {quote(MentionArchive._meta.db_table)} ({columns}) {select}', params)
+            # Embeddings go with the mention (cascade)
+            batch.delete()
+        moved += len(ids)
+    if moved:
+        logger.info(f"Archived {moved} mentions older than {cutoff:%Y-%m-%d %H:00} "
+                    f"in {time.monotonic() - started:.1f}s")
+        archived_until(max_age=0)
+    return moved
+
+def _month_path(start, suffix):
+    """First unused file name for a month; mentions archived into an already frozen
+    month later get their own part file instead of replacing the earlier one"""
+    path = os.path.join(archive_dir(), f'mentions-{start:%Y-%m}.{suffix}')
+    part = 1
+    while os.path.exists(path):
+        part += 1
+        path = os.path.join(archive_dir(), f'mentions-{start:%Y-%m}.part{part}.{suffix}')
+    return path
+
+def _write_file(path, qs, fmt):
+    from .export import export_chunks
+    tmp = f'{path}.tmp'
+    chunks = export_chunks(qs.order_by('pk').values_list(*FIELDS), FIELDS, fmt)
+    opener = gzip.open if fmt != 'parquet' else open
+    with opener(tmp, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    # A file under its final name is always complete
+    os.replace(tmp, path)
+
+def freeze_archive(days=None, fmt=None):
+    """Write archived months older than ``days`` (RETENTION_COLD_DAYS) to files and drop them.
+
+    Frozen months are no longer served by the API. Existing files are never
+    replaced: rows that reach a frozen month later go to a new part file.
+    Each month is written and dropped under an exclusive lock that
+    archive_mentions() waits for, and where there is no such lock a month
+    that gained rows while it was written is left for the next run.
+    Returns the written paths.
+    """
+    days = days if days is not None else getattr(settings, 'RETENTION_COLD_DAYS', 0)
+    if not days:
+        return []
+    fmt = fmt or getattr(settings, 'RETENTION_ARCHIVE_FORMAT', 'ndjson')
+    suffix = 'parquet' if fmt == 'parquet' else f'{fmt}.gz'
+    first = MentionArchive.objects.aggregate(n=Min('created_at'))['n']
+    if first is None:
+        return []
+    cutoff = _month_start(timezone.now() - timedelta(days=days))
+    os.makedirs(archive_dir(), exist_ok=True)
+    quote = connection.ops.quote_name
+    written = []
+    start = _month_start(first)
+    while _next_month(start) <= cutoff:
+        end = _next_month(start)
+        month = MentionArchive.objects.filter(created_at__gte=start, created_at__lt=end)
+        with transaction.atomic():
+            _advisory_lock(shared=False)
+            count = month.count()
+            if count:
+                path = _month_path(start, suffix)
+                _write_file(path, month, fmt)
+                if month.count() != count:
+                    os.remove(path)
+                    logger.warning(f"Archived mentions of {start:%Y-%m} changed while freezing, retrying next run")
+                    start = end
+                    continue
+                written.append(path)
+                logger.info(f"Froze archived mentions of {start:%Y-%m} to {path}")
+            if _partitioned():
+                with connection.cursor() as cursor:
+                    # Dropping the partition is instant and returns its space at once
+                    cursor.execute(f'DROP TABLE IF EXISTS {quote(_partition_name(start))}')
+            else:
+                month.delete()
+        start = end
+    if written:
+        archived_until(max_age=0)
+    return written
+
+def apply_retention():
+    """Archive old mentions, then freeze old archive months; scheduled by Celery beat"""
+    return {'archived': archive_mentions(), 'frozen': freeze_archive()}
@@ -0,0 +1,141 @@
+# tracker/rollups.py - hourly mention counts for the dashboard
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .clusters import is_story
+from .models import Mention, MentionRollup
+
+logger = logging.getLogger(__name__)
+
+def floor_hour(dt):
+    return dt.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+def bucket(m):
+    """Rollup key of a processed mention"""
+    return (floor_hour(m.created_at), m.source, m.sentiment or '', m.topic or '')
+
+def story_buckets(mentions):
+    """Bucket keys of the mentions that started a story cluster"""
+    return [bucket(m) for m in mentions if is_story(m)]
+
+# PostgreSQL advisory lock shared by updating() blocks and held exclusively by rebuild()
+LOCK_ID = 0x726f6c6c
+
+def _advisory_lock(shared):
+    if connection.vendor == 'postgresql':
+        fn = 'pg_advisory_xact_lock_shared' if shared else 'pg_advisory_xact_lock'
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT {fn}(%s)', [LOCK_ID])
+
+@contextmanager
+def updating():
+    """Transaction for writing mentions together with their update() increments.
+
+    rebuild() waits for open ones and new ones wait for it, so a mention is
+    never counted both by a rebuild and by its own increment. (SQLite has a
+    single writer, so the transaction alone is enough there.)
+    """
+    with transaction.atomic():
+        _advisory_lock(shared=True)
+        yield
+
+def update(added=(), removed=(), added_stories=(), removed_stories=()):
+    """Apply bucket keys to the rollup table: +1 per added key, -1 per removed one.
+
+    The *_stories keys move story_count the same way, see story_buckets().
+    """
+    deltas = Counter(added)
+    deltas.subtract(Counter(removed))
+    story_deltas = Counter(added_stories)
+    story_deltas.subtract(Counter(removed_stories))
+    for (hour, source, sentiment, topic) in set(deltas) | set(story_deltas):
+        n = deltas[(hour, source, sentiment, topic)]
+        stories = story_deltas[(hour, source, sentiment, topic)]
+        if not n and not stories:
+            continue
+        key = dict(hour=hour, source=source, sentiment=sentiment, topic=topic)
+        changes = dict(count=F('count') + n, story_count=F('story_count') + stories)
+        if MentionRollup.objects.filter(**key).update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                MentionRollup.objects.create(count=n, story_count=stories, **key)
+        except IntegrityError:
+            # Created concurrently by another worker
+            MentionRollup.objects.filter(**key).update(**changes)
+
+def rebuild(since=None, batch_size=1000):
+    """Recompute the rollup rows from the mentions table, optionally from `since` on.
+
+    Hours whose mentions were archived (tracker.retention) keep their rows.
+    Concurrent analysis waits while the rows are replaced, see updating().
+    """
+    from .retention import hot_since
+    boundary = hot_since()
+    if boundary is not None and (since is None or since < boundary):
+        since = boundary
+    rollups = MentionRollup.objects.all()
+    mentions = Mention.objects.filter(processed=True)
+    if since is not None:
+        since = floor_hour(since)
+        rollups = rollups.filter(hour__gte=since)
+        mentions = mentions.filter(created_at__gte=since)
+    rows = (
+        mentions.annotate(bucket_hour=TruncHour('created_at', tzinfo=dt_timezone.utc))
+        .values('bucket_hour', 'source', 'sentiment', 'topic')
+        .annotate(n=Count('id'), stories=Count('id', filter=Q(cluster_id__isnull=True) | Q(cluster_id=F('id'))))
+    )
+    with transaction.atomic():
+        _advisory_lock(shared=False)
+        rollups.delete()
+        merged = Counter()
+        merged_stories = Counter()
+        for row in rows.iterator():
+            key = (row['bucket_hour'], row['source'], row['sentiment'] or '', row['topic'] or '')
+            merged[key] += row['n']
+            merged_stories[key] += row['stories']
+        objs = [
+            MentionRollup(hour=hour, source=source, sentiment=sentiment, topic=topic,
+                          count=n, story_count=merged_stories[(hour, source, sentiment, topic)])
+            for (hour, source, sentiment, topic), n in merged.items()
+        ]
+        MentionRollup.objects.bulk_create(objs, batch_size=batch_size)
+    return len(objs)
+
+# What the read helpers sum: 'count' for mentions, 'story_count' for distinct stories
+MEASURES = ('count', 'story_count')
+
+def total(since=None, measure='count'):
+    qs = MentionRollup.objects.all()
+    if since is not None:
+        qs = qs.filter(hour__gte=floor_hour(since))
+    return qs.aggregate(n=Sum(measure))['n'] or 0
+
+def counts_by(field, since=None, limit=None, measure='count'):
+    """[{field: value, 'count': n}] ordered by count, most frequent first"""
+    qs = MentionRollup.objects.exclude(**{field: ''})
+    if since is not None:
+        qs = qs.filter(hour__gte=floor_hour(since))
+    qs = qs.values(field).annotate(count=Sum(measure)).order_by('-count')
+    return list(qs[:limit] if limit else qs)
+
+def hourly(hours=24, now=None, measure='count'):
+    """Counts for the last `hours` hours, oldest first, current hour included"""
+    end = floor_hour(now or timezone.now())
+    start = end - timedelta(hours=hours - 1)
+    counts = dict(
+        MentionRollup.objects.filter(hour__gte=start)
+        .values_list('hour').annotate(n=Sum(measure)).values_list('hour', 'n')
+    )
+    series = []
+    for i in range(hours):
+        hour = start + timedelta(hours=i)
+        series.append({'hour': hour.hour, 'time': hour.isoformat(), 'count': counts.get(hour, 0)})
+    return series
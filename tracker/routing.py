@@ -3,4 +3,5 @@ from . import consumers
 
 websocket_urlpatterns = [
     path('ws/mentions/', consumers.TrackerConsumer.as_asgi()),
+    path('ws/dashboard/', consumers.DashboardConsumer.as_asgi()),
 ]
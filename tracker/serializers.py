@@ -1,7 +1,26 @@
 from rest_framework import serializers
 from .models import Mention, Alert
 
-class MentionSerializer(serializers.ModelSerializer):
+def requested_fields(request):
+    """Set of field names from ?fields=a,b,c, or None when not given"""
+    if request is None:
+        return None
+    value = request.query_params.get('fields')
+    if not value:
+        return None
+    return {f.strip() for f in value.split(',') if f.strip()}
+
+class FieldsProjectionMixin:
+    """Drops every field not listed in the request's ?fields= parameter"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get('request'))
+        if fields:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+class MentionSerializer(FieldsProjectionMixin, serializers.ModelSerializer):
     created_at = serializers.DateTimeField(format='%Y-%m-%dT%H:%M:%S.%fZ', read_only=True)
     fetched_at = serializers.DateTimeField(format='%Y-%m-%dT%H:%M:%S.%fZ', read_only=True)
     
@@ -10,7 +29,7 @@ class MentionSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('fetched_at',)
 
-class AlertSerializer(serializers.ModelSerializer):
+class AlertSerializer(FieldsProjectionMixin, serializers.ModelSerializer):
     mention = MentionSerializer(read_only=True)
     created_at = serializers.DateTimeField(format='%Y-%m-%dT%H:%M:%S.%fZ', read_only=True)
     
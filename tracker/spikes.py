@@ -0,0 +1,176 @@
+# tracker/spikes.py - sliding-window negative spike detection
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+Spike = namedtuple('Spike', 'scope count threshold mention')
+
+def _minute(ts):
+    return int(ts // 60)
+
+class MemoryCounter:
+    """Per-scope ring buffers of per-minute buckets, local to this process.
+
+    With a shared ``cooldown_cache`` the cooldowns live there instead, so
+    workers counting separately still raise one alert per burst between them.
+    """
+
+    def __init__(self, window, cooldown_cache=None):
+        self.window = window
+        self.cooldown_cache = cooldown_cache
+        self._rings = {}
+        self._cooldowns = {}
+        self._lock = threading.Lock()
+
+    def add(self, scope, minute, n=1):
+        with self._lock:
+            counts, stamps = self._rings.setdefault(scope, ([0] * self.window, [None] * self.window))
+            i = minute % self.window
+            if stamps[i] != minute:
+                # Bucket still holds an expired minute, reuse it
+                stamps[i] = minute
+                counts[i] = 0
+            counts[i] += n
+
+    def total(self, scope, minute):
+        with self._lock:
+            ring = self._rings.get(scope)
+            if ring is None:
+                return 0
+            counts, stamps = ring
+            oldest = minute - self.window
+            return sum(c for c, m in zip(counts, stamps) if m is not None and oldest < m <= minute)
+
+    def acquire(self, scope, seconds):
+        """True if the scope was not cooling down; starts a new cooldown"""
+        if self.cooldown_cache is not None:
+            return self.cooldown_cache.add(f'spike-cooldown:{scope}', 1, timeout=seconds)
+        now = time.time()
+        with self._lock:
+            if self._cooldowns.get(scope, 0) > now:
+                return False
+            self._cooldowns[scope] = now + seconds
+            if len(self._cooldowns) > 10000:
+                # Per-story keys accumulate when counting stories
+                self._cooldowns = {k: t for k, t in self._cooldowns.items() if t > now}
+            return True
+
+class CacheCounter:
+    """Per-minute buckets in Django's cache, shared between workers with a Redis cache"""
+
+    def __init__(self, window, alias='default'):
+        from django.core.cache import caches
+        self.window = window
+        self.cache = caches[alias]
+
+    def _key(self, scope, minute):
+        return f'spike:{scope}:{minute}'
+
+    def add(self, scope, minute, n=1):
+        key = self._key(scope, minute)
+        self.cache.add(key, 0, timeout=(self.window + 1) * 60)
+        try:
+            self.cache.incr(key, n)
+        except ValueError:
+            # Expired between add and incr
+            self.cache.set(key, n, timeout=(self.window + 1) * 60)
+
+    def total(self, scope, minute):
+        keys = [self._key(scope, m) for m in range(minute - self.window + 1, minute + 1)]
+        return sum(self.cache.get_many(keys).values())
+
+    def acquire(self, scope, seconds):
+        return self.cache.add(f'spike-cooldown:{scope}', 1, timeout=seconds)
+
+class SpikeDetector:
+    """Counts negative mentions per scope and reports each spike once per episode.
+
+    Scopes are ``all``, ``source:<name>`` and ``topic:<label>``. Only scopes
+    with a threshold are counted; ``source:*`` and ``topic:*`` set a
+    threshold for every source or topic. After a spike fires, its scope is
+    silent for the cooldown so a burst yields one alert, not one per mention.
+
+    With count_stories, each story cluster (see tracker.clusters) counts once
+    per scope and window, so one wire story syndicated across many feeds
+    doesn't look like a spike by itself.
+    """
+
+    def __init__(self, counter, thresholds, window, cooldown, count_stories=False):
+        self.counter = counter
+        self.thresholds = thresholds
+        self.window = window
+        self.cooldown = cooldown
+        self.count_stories = count_stories
+
+    def threshold_for(self, scope):
+        if scope in self.thresholds:
+            return self.thresholds[scope]
+        kind = scope.split(':', 1)[0]
+        return self.thresholds.get(f'{kind}:*')
+
+    def scopes_for(self, mention):
+        scopes = ['all', f'source:{mention.source}']
+        if mention.topic:
+            scopes.append(f'topic:{mention.topic}')
+        return [s for s in scopes if self.threshold_for(s) is not None]
+
+    def record(self, mentions):
+        """Count negative mentions and return the spikes that start an episode"""
+        now = time.time()
+        current = _minute(now)
+        oldest = current - self.window
+        latest = {}
+        for m in mentions:
+            minute = min(_minute(m.created_at.timestamp()), current)
+            if minute <= oldest:
+                # Outside the window already, e.g. an old item from a feed backlog
+                continue
+            for scope in self.scopes_for(m):
+                if self.count_stories and not self._first_of_story(scope, m):
+                    continue
+                self.counter.add(scope, minute)
+                latest[scope] = m
+
+        spikes = []
+        for scope, mention in latest.items():
+            threshold = self.threshold_for(scope)
+            count = self.counter.total(scope, current)
+            if count > threshold and self.counter.acquire(scope, self.cooldown * 60):
+                spikes.append(Spike(scope, count, threshold, mention))
+        return spikes
+
+    def _first_of_story(self, scope, mention):
+        story = mention.cluster_id or mention.id
+        if story is None:
+            return True
+        return self.counter.acquire(f'{scope}:story:{story}', self.window * 60)
+
+_detector = None
+_detector_lock = threading.Lock()
+
+def get_detector():
+    global _detector
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                window = getattr(settings, 'SPIKE_WINDOW_MINUTES', 10)
+                if getattr(settings, 'SPIKE_BACKEND', 'memory') == 'cache':
+                    counter = CacheCounter(window)
+                elif 'redis' in settings.CACHES['default']['BACKEND'].lower():
+                    from django.core.cache import caches
+                    counter = MemoryCounter(window, cooldown_cache=caches['default'])
+                else:
+                    counter = MemoryCounter(window)
+                _detector = SpikeDetector(
+                    counter,
+                    thresholds=getattr(settings, 'SPIKE_THRESHOLDS', {'all': 8}),
+                    window=window,
+                    cooldown=getattr(settings, 'SPIKE_COOLDOWN_MINUTES', 30),
+                    count_stories=getattr(settings, 'SPIKE_COUNT', 'mentions') == 'stories',
+                )
+    return _detector
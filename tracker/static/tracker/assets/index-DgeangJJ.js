@@ -45,4 +45,4 @@ Error generating stack: `+o.message+`
  *
  * This source code is licensed under the MIT license found in the
  * LICENSE file in the root directory of this source tree.
- */var Ln=U;function Hp(e,t){return e===t&&(e!==0||1/e===1/t)||e!==e&&t!==t}var Qp=typeof Object.is=="function"?Object.is:Hp,Kp=Ln.useState,Yp=Ln.useEffect,Xp=Ln.useLayoutEffect,Gp=Ln.useDebugValue;function Zp(e,t){var n=t(),r=Kp({inst:{value:n,getSnapshot:t}}),l=r[0].inst,o=r[1];return Xp(function(){l.value=n,l.getSnapshot=t,xo(l)&&o({inst:l})},[e,n,t]),Yp(function(){return xo(l)&&o({inst:l}),e(function(){xo(l)&&o({inst:l})})},[e]),Gp(n),n}function xo(e){var t=e.getSnapshot;e=e.value;try{var n=t();return!Qp(e,n)}catch{return!0}}function Jp(e,t){return t()}var qp=typeof window>"u"||typeof window.document>"u"||typeof window.document.createElement>"u"?Jp:Zp;lf.useSyncExternalStore=Ln.useSyncExternalStore!==void 0?Ln.useSyncExternalStore:qp;rf.exports=lf;var bp=rf.exports;const of=0,uf=1,sf=2,As=3;var Us=Object.prototype.hasOwnProperty;function wi(e,t){var n,r;if(e===t)return!0;if(e&&t&&(n=e.constructor)===t.constructor){if(n===Date)return e.getTime()===t.getTime();if(n===RegExp)return e.toString()===t.toString();if(n===Array){if((r=e.length)===t.length)for(;r--&&wi(e[r],t[r]););return r===-1}if(!n||typeof e=="object"){r=0;for(n in e)if(Us.call(e,n)&&++r&&!Us.call(t,n)||!(n in t)||!wi(e[n],t[n]))return!1;return Object.keys(t).length===r}}return e!==e&&t!==t}const ut=new WeakMap,Nt=()=>{},pe=Nt(),xi=Object,z=e=>e===pe,be=e=>typeof e=="function",It=(e,t)=>({...e,...t}),af=e=>be(e.then),So={},Hr={},ku="undefined",Cr=typeof window!=ku,Si=typeof document!=ku,em=Cr&&"Deno"in window,tm=()=>Cr&&typeof window.requestAnimationFrame!=ku,cf=(e,t)=>{const n=ut.get(e);return[()=>!z(t)&&e.get(t)||So,r=>{if(!z(t)){const l=e.get(t);t in Hr||(Hr[t]=l),n[5](t,It(l,r),l||So)}},n[6],()=>!z(t)&&t in Hr?Hr[t]:!z(t)&&e.get(t)||So]};let ki=!0;const nm=()=>ki,[Ei,Ni]=Cr&&window.addEventListener?[window.addEventListener.bind(window),window.removeEventListener.bind(window)]:[Nt,Nt],rm=()=>{const e=Si&&document.visibilityState;return z(e)||e!=="hidden"},lm=e=>(Si&&document.addEventListener("visibilitychange",e),Ei("focus",e),()=>{Si&&document.removeEventListener("visibilitychange",e),Ni("focus",e)}),om=e=>{const t=()=>{ki=!0,e()},n=()=>{ki=!1};return Ei("online",t),Ei("offline",n),()=>{Ni("online",t),Ni("offline",n)}},im={isOnline:nm,isVisible:rm},um={initFocus:lm,initReconnect:om},$s=!Li.useId,xr=!Cr||em,sm=e=>tm()?window.requestAnimationFrame(e):setTimeout(e,1),ko=xr?U.useEffect:U.useLayoutEffect,Eo=typeof navigator<"u"&&navigator.connection,Vs=!xr&&Eo&&(["slow-2g","2g"].includes(Eo.effectiveType)||Eo.saveData),Qr=new WeakMap,am=e=>xi.prototype.toString.call(e),No=(e,t)=>e===`[object ${t}]`;let cm=0;const _i=e=>{const t=typeof e,n=am(e),r=No(n,"Date"),l=No(n,"RegExp"),o=No(n,"Object");let i,u;if(xi(e)===e&&!r&&!l){if(i=Qr.get(e),i)return i;if(i=++cm+"~",Qr.set(e,i),Array.isArray(e)){for(i="@",u=0;u<e.length;u++)i+=_i(e[u])+",";Qr.set(e,i)}if(o){i="#";const s=xi.keys(e).sort();for(;!z(u=s.pop());)z(e[u])||(i+=u+":"+_i(e[u])+",");Qr.set(e,i)}}else i=r?e.toJSON():t=="symbol"?e.toString():t=="string"?JSON.stringify(e):""+e;return i},Eu=e=>{if(be(e))try{e=e()}catch{e=""}const t=e;return e=typeof e=="string"?e:(Array.isArray(e)?e.length:e)?_i(e):"",[e,t]};let fm=0;const Ci=()=>++fm;async function ff(...e){const[t,n,r,l]=e,o=It({populateCache:!0,throwOnError:!0},typeof l=="boolean"?{revalidate:l}:l||{});let i=o.populateCache;const u=o.rollbackOnError;let s=o.optimisticData;const a=p=>typeof u=="function"?u(p):u!==!1,v=o.throwOnError;if(be(n)){const p=n,y=[],S=t.keys();for(const x of S)!/^\$(inf|sub)\$/.test(x)&&p(t.get(x)._k)&&y.push(x);return Promise.all(y.map(m))}return m(n);async function m(p){const[y]=Eu(p);if(!y)return;const[S,x]=cf(t,y),[M,c,f,d]=ut.get(t),g=()=>{const ne=M[y];return(be(o.revalidate)?o.revalidate(S().data,p):o.revalidate!==!1)&&(delete f[y],delete d[y],ne&&ne[0])?ne[0](sf).then(()=>S().data):S().data};if(e.length<3)return g();let k=r,C,_=!1;const E=Ci();c[y]=[E,0];const F=!z(s),P=S(),te=P.data,Xe=P._c,_e=z(Xe)?te:Xe;if(F&&(s=be(s)?s(_e,te):s,x({data:s,_c:_e})),be(k))try{k=k(_e)}catch(ne){C=ne,_=!0}if(k&&af(k))if(k=await k.catch(ne=>{C=ne,_=!0}),E!==c[y][0]){if(_)throw C;return k}else _&&F&&a(C)&&(i=!0,x({data:_e,_c:pe}));if(i&&!_)if(be(i)){const ne=i(k,_e);x({data:ne,error:pe,_c:pe})}else x({data:k,error:pe,_c:pe});if(c[y][1]=Ci(),Promise.resolve(g()).then(()=>{x({_c:pe})}),_){if(v)throw C;return}return k}}const Ws=(e,t)=>{for(const n in e)e[n][0]&&e[n][0](t)},dm=(e,t)=>{if(!ut.has(e)){const n=It(um,t),r=Object.create(null),l=ff.bind(pe,e);let o=Nt;const i=Object.create(null),u=(v,m)=>{const p=i[v]||[];return i[v]=p,p.push(m),()=>p.splice(p.indexOf(m),1)},s=(v,m,p)=>{e.set(v,m);const y=i[v];if(y)for(const S of y)S(m,p)},a=()=>{if(!ut.has(e)&&(ut.set(e,[r,Object.create(null),Object.create(null),Object.create(null),l,s,u]),!xr)){const v=n.initFocus(setTimeout.bind(pe,Ws.bind(pe,r,of))),m=n.initReconnect(setTimeout.bind(pe,Ws.bind(pe,r,uf)));o=()=>{v&&v(),m&&m(),ut.delete(e)}}};return a(),[e,l,a,o]}return[e,ut.get(e)[4]]},pm=(e,t,n,r,l)=>{const o=n.errorRetryCount,i=l.retryCount,u=~~((Math.random()+.5)*(1<<(i<8?i:8)))*n.errorRetryInterval;!z(o)&&i>o||setTimeout(r,u,l)},mm=wi,[df,hm]=dm(new Map),vm=It({onLoadingSlow:Nt,onSuccess:Nt,onError:Nt,onErrorRetry:pm,onDiscarded:Nt,revalidateOnFocus:!0,revalidateOnReconnect:!0,revalidateIfStale:!0,shouldRetryOnError:!0,errorRetryInterval:Vs?1e4:5e3,focusThrottleInterval:5*1e3,dedupingInterval:2*1e3,loadingTimeout:Vs?5e3:3e3,compare:mm,isPaused:()=>!1,cache:df,mutate:hm,fallback:{}},im),gm=(e,t)=>{const n=It(e,t);if(t){const{use:r,fallback:l}=e,{use:o,fallback:i}=t;r&&o&&(n.use=r.concat(o)),l&&i&&(n.fallback=It(l,i))}return n},ym=U.createContext({}),wm="$inf$",pf=Cr&&window.__SWR_DEVTOOLS_USE__,xm=pf?window.__SWR_DEVTOOLS_USE__:[],Sm=()=>{pf&&(window.__SWR_DEVTOOLS_REACT__=Li)},km=e=>be(e[1])?[e[0],e[1],e[2]||{}]:[e[0],null,(e[1]===null?e[2]:e[1])||{}],Em=()=>{const e=U.useContext(ym);return U.useMemo(()=>It(vm,e),[e])},Nm=e=>(t,n,r)=>e(t,n&&((...o)=>{const[i]=Eu(t),[,,,u]=ut.get(df);if(i.startsWith(wm))return n(...o);const s=u[i];return z(s)?n(...o):(delete u[i],s)}),r),_m=xm.concat(Nm),Cm=e=>function(...n){const r=Em(),[l,o,i]=km(n),u=gm(r,i);let s=e;const{use:a}=u,v=(a||[]).concat(_m);for(let m=v.length;m--;)s=v[m](s);return s(l,o||u.fetcher||null,u)},jm=(e,t,n)=>{const r=t[e]||(t[e]=[]);return r.push(n),()=>{const l=r.indexOf(n);l>=0&&(r[l]=r[r.length-1],r.pop())}};Sm();const _o=Li.use||(e=>{switch(e.status){case"pending":throw e;case"fulfilled":return e.value;case"rejected":throw e.reason;default:throw e.status="pending",e.then(t=>{e.status="fulfilled",e.value=t},t=>{e.status="rejected",e.reason=t}),e}}),Co={dedupe:!0},Bs=Promise.resolve(pe),Pm=(e,t,n)=>{const{cache:r,compare:l,suspense:o,fallbackData:i,revalidateOnMount:u,revalidateIfStale:s,refreshInterval:a,refreshWhenHidden:v,refreshWhenOffline:m,keepPreviousData:p}=n,[y,S,x,M]=ut.get(r),[c,f]=Eu(e),d=U.useRef(!1),g=U.useRef(!1),k=U.useRef(c),C=U.useRef(t),_=U.useRef(n),E=()=>_.current,F=()=>E().isVisible()&&E().isOnline(),[P,te,Xe,_e]=cf(r,c),ne=U.useRef({}).current,Ut=z(i)?z(n.fallback)?pe:n.fallback[c]:i,tn=(D,K)=>{for(const re in ne){const W=re;if(W==="data"){if(!l(D[W],K[W])&&(!z(D[W])||!l(vt,K[W])))return!1}else if(K[W]!==D[W])return!1}return!0},nn=U.useMemo(()=>{const D=!c||!t?!1:z(u)?E().isPaused()||o?!1:s!==!1:u,K=he=>{const rt=It(he);return delete rt._k,D?{isValidating:!0,isLoading:!0,...rt}:rt},re=P(),W=_e(),$e=K(re),rn=re===W?$e:K(W);let ie=$e;return[()=>{const he=K(P());return tn(he,ie)?(ie.data=he.data,ie.isLoading=he.isLoading,ie.isValidating=he.isValidating,ie.error=he.error,ie):(ie=he,he)},()=>rn]},[r,c]),N=bp.useSyncExternalStore(U.useCallback(D=>Xe(c,(K,re)=>{tn(re,K)||D()}),[r,c]),nn[0],nn[1]),R=!d.current,T=y[c]&&y[c].length>0,A=N.data,$=z(A)?Ut&&af(Ut)?_o(Ut):Ut:A,nt=N.error,Ue=U.useRef($),vt=p?z(A)?z(Ue.current)?$:Ue.current:A:$,Ge=T&&!z(nt)?!1:R&&!z(u)?u:E().isPaused()?!1:o?z($)?!1:s:z($)||s,$t=!!(c&&t&&R&&Ge),mf=z(N.isValidating)?$t:N.isValidating,hf=z(N.isLoading)?$t:N.isLoading,In=U.useCallback(async D=>{const K=C.current;if(!c||!K||g.current||E().isPaused())return!1;let re,W,$e=!0;const rn=D||{},ie=!x[c]||!rn.dedupe,he=()=>$s?!g.current&&c===k.current&&d.current:c===k.current,rt={isValidating:!1,isLoading:!1},Cu=()=>{te(rt)},ju=()=>{const ze=x[c];ze&&ze[1]===W&&delete x[c]},Pu={isValidating:!0};z(P().data)&&(Pu.isLoading=!0);try{if(ie&&(te(Pu),n.loadingTimeout&&z(P().data)&&setTimeout(()=>{$e&&he()&&E().onLoadingSlow(c,n)},n.loadingTimeout),x[c]=[K(f),Ci()]),[re,W]=x[c],re=await re,ie&&setTimeout(ju,n.dedupingInterval),!x[c]||x[c][1]!==W)return ie&&he()&&E().onDiscarded(c),!1;rt.error=pe;const ze=S[c];if(!z(ze)&&(W<=ze[0]||W<=ze[1]||ze[1]===0))return Cu(),ie&&he()&&E().onDiscarded(c),!1;const lt=P().data;rt.data=l(lt,re)?lt:re,ie&&he()&&E().onSuccess(re,c,n)}catch(ze){ju();const lt=E(),{shouldRetryOnError:Ql}=lt;lt.isPaused()||(rt.error=ze,ie&&he()&&(lt.onError(ze,c,lt),(Ql===!0||be(Ql)&&Ql(ze))&&(!E().revalidateOnFocus||!E().revalidateOnReconnect||F())&&lt.onErrorRetry(ze,c,lt,vf=>{const Kl=y[c];Kl&&Kl[0]&&Kl[0](As,vf)},{retryCount:(rn.retryCount||0)+1,dedupe:!0})))}return $e=!1,Cu(),!0},[c,r]),_u=U.useCallback((...D)=>ff(r,k.current,...D),[]);if(ko(()=>{C.current=t,_.current=n,z(A)||(Ue.current=A)}),ko(()=>{if(!c)return;const D=In.bind(pe,Co);let K=0;E().revalidateOnFocus&&(K=Date.now()+E().focusThrottleInterval);const W=jm(c,y,($e,rn={})=>{if($e==of){const ie=Date.now();E().revalidateOnFocus&&ie>K&&F()&&(K=ie+E().focusThrottleInterval,D())}else if($e==uf)E().revalidateOnReconnect&&F()&&D();else{if($e==sf)return In();if($e==As)return In(rn)}});return g.current=!1,k.current=c,d.current=!0,te({_k:f}),Ge&&(x[c]||(z($)||xr?D():sm(D))),()=>{g.current=!0,W()}},[c]),ko(()=>{let D;function K(){const W=be(a)?a(P().data):a;W&&D!==-1&&(D=setTimeout(re,W))}function re(){!P().error&&(v||E().isVisible())&&(m||E().isOnline())?In(Co).then(K):K()}return K(),()=>{D&&(clearTimeout(D),D=-1)}},[a,v,m,c]),U.useDebugValue(vt),o){const D=c&&z($);if(!$s&&xr&&D)throw new Error("Fallback data is required when using Suspense in SSR.");D&&(C.current=t,_.current=n,g.current=!1);const K=M[c],re=!z(K)&&D?_u(K):Bs;if(_o(re),!z(nt)&&D)throw nt;const W=D?In(Co):Bs;!z(vt)&&D&&(W.status="fulfilled",W.value=!0),_o(W)}return{mutate:_u,get data(){return ne.data=!0,vt},get error(){return ne.error=!0,nt},get isValidating(){return ne.isValidating=!0,mf},get isLoading(){return ne.isLoading=!0,hf}}},Nu=Cm(Pm),Rm=()=>"http://localhost:8000/api",Tm=()=>{const e=window.location.protocol==="https:"?"wss":"ws",n="http://localhost:8000".replace(/^https?:\/\//,"").replace(/\/api$/,"");return`${e}://${n}/ws`},Hl=Rm(),Lm=Tm(),zm=e=>fetch(e).then(t=>t.json());function Om(){const{data:e,error:t,mutate:n}=Nu(`${Hl}/dashboard-stats/`,zm,{refreshInterval:3e4});if(t)return h.jsxs("div",{className:"text-red-500",children:["Error loading dashboard: ",t.message]});if(!e)return h.jsx("div",{className:"text-gray-500",children:"Loading dashboard..."});const r=e.sentiment.positive+e.sentiment.negative+e.sentiment.neutral,l=r>0?(e.sentiment.positive/r*100).toFixed(1):0,o=r>0?(e.sentiment.negative/r*100).toFixed(1):0,i=r>0?(e.sentiment.neutral/r*100).toFixed(1):0,u=Math.max(...e.hourly_mentions.map(s=>s.count),1);return h.jsxs("div",{className:"space-y-6",children:[h.jsxs("div",{className:"grid grid-cols-1 md:grid-cols-4 gap-4",children:[h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md border-l-4 border-blue-500",children:[h.jsx("h3",{className:"text-sm font-medium text-gray-500",children:"Total Mentions"}),h.jsx("p",{className:"text-3xl font-bold text-gray-900 mt-2",children:e.mentions.total}),h.jsxs("p",{className:"text-xs text-gray-500 mt-1",children:[e.mentions.last_24h," in last 24h"]})]}),h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md border-l-4 border-green-500",children:[h.jsx("h3",{className:"text-sm font-medium text-gray-500",children:"Positive"}),h.jsx("p",{className:"text-3xl font-bold text-green-600 mt-2",children:e.sentiment.positive}),h.jsxs("p",{className:"text-xs text-gray-500 mt-1",children:[l,"% of total"]})]}),h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md border-l-4 border-red-500",children:[h.jsx("h3",{className:"text-sm font-medium text-gray-500",children:"Negative"}),h.jsx("p",{className:"text-3xl font-bold text-red-600 mt-2",children:e.sentiment.negative}),h.jsxs("p",{className:"text-xs text-gray-500 mt-1",children:[o,"% of total"]})]}),h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md border-l-4 border-yellow-500",children:[h.jsx("h3",{className:"text-sm font-medium text-gray-500",children:"Active Alerts"}),h.jsx("p",{className:"text-3xl font-bold text-yellow-600 mt-2",children:e.alerts.unresolved}),h.jsxs("p",{className:"text-xs text-gray-500 mt-1",children:[e.alerts.recent_24h," in last 24h"]})]})]}),h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md",children:[h.jsx("h2",{className:"text-xl font-bold mb-4",children:"Sentiment Breakdown"}),h.jsxs("div",{className:"space-y-3",children:[h.jsxs("div",{children:[h.jsxs("div",{className:"flex justify-between text-sm mb-1",children:[h.jsx("span",{className:"text-green-600 font-medium",children:"Positive"}),h.jsxs("span",{children:[e.sentiment.positive," (",l,"%)"]})]}),h.jsx("div",{className:"w-full bg-gray-200 rounded-full h-3",children:h.jsx("div",{className:"bg-green-500 h-3 rounded-full transition-all",style:{width:`${l}%`}})})]}),h.jsxs("div",{children:[h.jsxs("div",{className:"flex justify-between text-sm mb-1",children:[h.jsx("span",{className:"text-gray-600 font-medium",children:"Neutral"}),h.jsxs("span",{children:[e.sentiment.neutral," (",i,"%)"]})]}),h.jsx("div",{className:"w-full bg-gray-200 rounded-full h-3",children:h.jsx("div",{className:"bg-gray-400 h-3 rounded-full transition-all",style:{width:`${i}%`}})})]}),h.jsxs("div",{children:[h.jsxs("div",{className:"flex justify-between text-sm mb-1",children:[h.jsx("span",{className:"text-red-600 font-medium",children:"Negative"}),h.jsxs("span",{children:[e.sentiment.negative," (",o,"%)"]})]}),h.jsx("div",{className:"w-full bg-gray-200 rounded-full h-3",children:h.jsx("div",{className:"bg-red-500 h-3 rounded-full transition-all",style:{width:`${o}%`}})})]})]})]}),h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md",children:[h.jsx("h2",{className:"text-xl font-bold mb-4",children:"Mentions Over Last 24 Hours"}),h.jsx("div",{className:"flex items-end justify-between h-48 space-x-1",children:e.hourly_mentions.map((s,a)=>h.jsxs("div",{className:"flex-1 flex flex-col items-center",children:[h.jsx("div",{className:"w-full bg-blue-500 rounded-t transition-all hover:bg-blue-600",style:{height:`${s.count/u*100}%`},title:`${s.count} mentions at ${s.hour}:00`}),h.jsxs("span",{className:"text-xs text-gray-500 mt-1",children:[s.hour,":00"]})]},a))})]}),e.topics&&e.topics.length>0&&h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md",children:[h.jsx("h2",{className:"text-xl font-bold mb-4",children:"Top Topics"}),h.jsx("div",{className:"space-y-2",children:e.topics.slice(0,10).map((s,a)=>h.jsxs("div",{className:"flex items-center justify-between p-3 bg-gray-50 rounded",children:[h.jsx("span",{className:"text-sm font-medium text-gray-700",children:s.topic||"Unknown"}),h.jsxs("span",{className:"text-sm text-gray-500 bg-white px-3 py-1 rounded-full",children:[s.count," mentions"]})]},a))})]}),e.sources&&e.sources.length>0&&h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md",children:[h.jsx("h2",{className:"text-xl font-bold mb-4",children:"Sources"}),h.jsx("div",{className:"flex flex-wrap gap-2",children:e.sources.map((s,a)=>h.jsxs("span",{className:"px-4 py-2 bg-blue-100 text-blue-800 rounded-full text-sm font-medium",children:[s.source,": ",s.count]},a))})]})]})}const Dm=e=>fetch(e).then(t=>t.json());function Im(){const[e,t]=U.useState("all"),{data:n,error:r,mutate:l}=Nu(`${Hl}/mentions/recent/?limit=100`,Dm,{refreshInterval:15e3});if(r)return h.jsxs("div",{className:"text-red-500",children:["Error loading mentions: ",r.message]});if(!n)return h.jsx("div",{className:"text-gray-500",children:"Loading mentions..."});const o=Array.isArray(n)?n:n.results||[],i=e==="all"?o:o.filter(a=>a.sentiment===e),u=a=>{switch(a==null?void 0:a.toLowerCase()){case"positive":return"bg-green-100 text-green-800 border-green-300";case"negative":return"bg-red-100 text-red-800 border-red-300";case"neutral":return"bg-gray-100 text-gray-800 border-gray-300";default:return"bg-gray-100 text-gray-800 border-gray-300"}},s=a=>a?new Date(a).toLocaleString():"Unknown";return h.jsxs("div",{className:"bg-white rounded-lg shadow-md p-6",children:[h.jsxs("div",{className:"flex justify-between items-center mb-4",children:[h.jsx("h2",{className:"text-xl font-bold",children:"Recent Mentions"}),h.jsxs("div",{className:"flex gap-2",children:[h.jsx("button",{onClick:()=>t("all"),className:`px-4 py-2 rounded text-sm font-medium ${e==="all"?"bg-blue-500 text-white":"bg-gray-200 text-gray-700 hover:bg-gray-300"}`,children:"All"}),h.jsx("button",{onClick:()=>t("positive"),className:`px-4 py-2 rounded text-sm font-medium ${e==="positive"?"bg-green-500 text-white":"bg-gray-200 text-gray-700 hover:bg-gray-300"}`,children:"Positive"}),h.jsx("button",{onClick:()=>t("neutral"),className:`px-4 py-2 rounded text-sm font-medium ${e==="neutral"?"bg-gray-500 text-white":"bg-gray-200 text-gray-700 hover:bg-gray-300"}`,children:"Neutral"}),h.jsx("button",{onClick:()=>t("negative"),className:`px-4 py-2 rounded text-sm font-medium ${e==="negative"?"bg-red-500 text-white":"bg-gray-200 text-gray-700 hover:bg-gray-300"}`,children:"Negative"})]})]}),h.jsx("div",{className:"space-y-3 max-h-96 overflow-y-auto",children:i.length===0?h.jsxs("div",{className:"text-center py-8 text-gray-500",children:["No mentions found ",e!=="all"&&`with ${e} sentiment`]}):i.map(a=>h.jsxs("div",{className:"border rounded-lg p-4 hover:shadow-md transition-shadow",children:[h.jsxs("div",{className:"flex items-start justify-between mb-2",children:[h.jsxs("div",{className:"flex items-center gap-2",children:[h.jsx("span",{className:`px-2 py-1 rounded text-xs font-semibold border ${u(a.sentiment)}`,children:a.sentiment||"Processing..."}),a.sentiment_score&&h.jsxs("span",{className:"text-xs text-gray-500",children:[(a.sentiment_score*100).toFixed(0),"%"]}),h.jsx("span",{className:"text-xs text-gray-500 bg-gray-100 px-2 py-1 rounded",children:a.source})]}),h.jsx("span",{className:"text-xs text-gray-500",children:s(a.created_at)})]}),h.jsx("p",{className:"text-sm text-gray-700 mb-2 line-clamp-3",children:a.text}),a.topic&&h.jsxs("div",{className:"flex items-center gap-2",children:[h.jsx("span",{className:"text-xs text-gray-500",children:"Topic:"}),h.jsx("span",{className:"text-xs bg-blue-100 text-blue-800 px-2 py-1 rounded",children:a.topic})]})]},a.id))})]})}const Mm=e=>fetch(e).then(t=>t.json());function Fm(){const[e,t]=U.useState([]),{data:n,error:r}=Nu(`${Hl}/alerts/?ordering=-created_at`,Mm,{refreshInterval:1e4});U.useEffect(()=>{const u=`${Lm}/mentions/`,s=new WebSocket(u);return s.onmessage=a=>{try{const v=JSON.parse(a.data);t(m=>[v,...m].slice(0,50))}catch(v){console.error("Error parsing WebSocket message:",v)}},s.onopen=()=>console.log("WebSocket connected"),s.onerror=a=>console.error("WebSocket error:",a),s.onclose=()=>console.log("WebSocket closed"),()=>s.close()},[]);const l=[...e.map(u=>({...u,source:"realtime"})),...((n==null?void 0:n.results)||n||[]).map(u=>({...u,source:"api"}))].slice(0,50),o=u=>{if(!u)return"Just now";const s=new Date(u),v=new Date-s,m=Math.floor(v/6e4);if(m<1)return"Just now";if(m<60)return`${m} minute${m>1?"s":""} ago`;const p=Math.floor(m/60);return p<24?`${p} hour${p>1?"s":""} ago`:s.toLocaleString()},i=u=>u!=null&&u.includes("negative")||u!=null&&u.includes("spike")?"border-red-500 bg-red-50":"border-yellow-500 bg-yellow-50";return r?h.jsx("div",{className:"bg-white rounded-lg shadow-md p-6",children:h.jsxs("div",{className:"text-red-500",children:["Error loading alerts: ",r.message]})}):h.jsxs("div",{className:"bg-white rounded-lg shadow-md p-6",children:[h.jsxs("div",{className:"mb-4",children:[h.jsx("h2",{className:"text-xl font-bold",children:"Real-time Alerts"}),h.jsx("p",{className:"text-sm text-gray-600",children:"Live alerts for negative spikes and unusual activity"})]}),h.jsx("div",{className:"space-y-3 max-h-96 overflow-y-auto",children:l.length===0?h.jsx("div",{className:"text-center py-8 text-gray-500",children:h.jsx("p",{children:"No alerts yet. Alerts will appear here when negative sentiment spikes are detected."})}):l.map((u,s)=>h.jsxs("div",{className:`p-4 border-l-4 rounded-lg shadow-sm ${i(u.alert_type)}`,children:[h.jsxs("div",{className:"flex items-start justify-between mb-2",children:[h.jsxs("div",{className:"flex items-center gap-2",children:[h.jsx("span",{className:"text-sm font-semibold text-red-700 uppercase",children:u.alert_type||"Alert"}),u.source==="realtime"&&h.jsx("span",{className:"px-2 py-1 text-xs bg-green-500 text-white rounded-full animate-pulse",children:"LIVE"})]}),h.jsx("span",{className:"text-xs text-gray-600",children:o(u.created_at)})]}),h.jsx("div",{className:"text-sm text-gray-700 mb-2",children:u.description}),u.mention_text&&h.jsxs("div",{className:"mt-2 p-2 bg-white rounded border border-gray-200",children:[h.jsx("p",{className:"text-xs text-gray-500 mb-1",children:"Related Mention:"}),h.jsx("p",{className:"text-xs text-gray-700 line-clamp-2",children:u.mention_text})]})]},u.id||s))})]})}const Am=["https://rss.nytimes.com/services/xml/rss/nyt/Technology.xml","https://feeds.bbci.co.uk/news/technology/rss.xml","https://www.theguardian.com/technology/rss"];function Um(){const[e,t]=U.useState(""),[n,r]=U.useState(!1),[l,o]=U.useState(null),i=async s=>{if(s.preventDefault(),!e.trim()){o({type:"error",text:"Please enter a valid RSS feed URL"});return}r(!0),o(null);try{const a=await fetch(`${Hl}/start-fetch/`,{method:"POST",headers:{"Content-Type":"application/json"},body:JSON.stringify({url:e.trim()})}),v=await a.json();a.ok?(o({type:"success",text:`Fetch started for: ${v.url}`}),t("")):o({type:"error",text:v.error||"Failed to start fetch"})}catch(a){o({type:"error",text:`Error: ${a.message}`})}finally{r(!1)}},u=s=>{t(s)};return h.jsxs("div",{className:"bg-white rounded-lg shadow-md p-6",children:[h.jsx("h2",{className:"text-xl font-bold mb-4",children:"RSS Feed Manager"}),h.jsx("form",{onSubmit:i,className:"mb-4",children:h.jsxs("div",{className:"flex gap-2",children:[h.jsx("input",{type:"url",value:e,onChange:s=>t(s.target.value),placeholder:"Enter RSS feed URL (e.g., https://rss.nytimes.com/services/xml/rss/nyt/Technology.xml)",className:"flex-1 px-4 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500",disabled:n}),h.jsx("button",{type:"submit",disabled:n,className:"px-6 py-2 bg-blue-500 text-white rounded-lg hover:bg-blue-600 disabled:bg-gray-400 disabled:cursor-not-allowed font-medium",children:n?"Adding...":"Add Feed"})]})}),l&&h.jsx("div",{className:`mb-4 p-3 rounded-lg ${l.type==="success"?"bg-green-100 text-green-800 border border-green-300":"bg-red-100 text-red-800 border border-red-300"}`,children:l.text}),h.jsxs("div",{children:[h.jsx("h3",{className:"text-sm font-semibold text-gray-700 mb-2",children:"Quick Add Popular Feeds:"}),h.jsx("div",{className:"flex flex-wrap gap-2",children:Am.map((s,a)=>h.jsx("button",{onClick:()=>u(s),className:"px-3 py-1 text-sm bg-gray-100 text-gray-700 rounded hover:bg-gray-200 transition-colors",children:new URL(s).hostname},a))})]}),h.jsx("div",{className:"mt-4 p-3 bg-blue-50 rounded-lg",children:h.jsxs("p",{className:"text-sm text-blue-800",children:[h.jsx("strong",{children:"Note:"})," The system will fetch the latest items from the RSS feed and analyze them for sentiment and topics. Processing may take a few moments."]})})]})}function $m(){const[e,t]=U.useState("dashboard"),n=[{id:"dashboard",label:"Dashboard",icon:"📊"},{id:"mentions",label:"Mentions",icon:"💬"},{id:"alerts",label:"Alerts",icon:"🚨"},{id:"feeds",label:"RSS Feeds",icon:"📡"}];return h.jsxs("div",{className:"min-h-screen bg-gray-50",children:[h.jsx("header",{className:"bg-white shadow-sm border-b",children:h.jsxs("div",{className:"max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-4",children:[h.jsx("h1",{className:"text-3xl font-bold text-gray-900",children:"Brand Mention & Reputation Tracker"}),h.jsx("p",{className:"text-sm text-gray-600 mt-1",children:"Monitor brand mentions across multiple platforms in real-time"})]})}),h.jsx("div",{className:"bg-white border-b",children:h.jsx("div",{className:"max-w-7xl mx-auto px-4 sm:px-6 lg:px-8",children:h.jsx("nav",{className:"flex space-x-8",children:n.map(r=>h.jsxs("button",{onClick:()=>t(r.id),className:`py-4 px-1 border-b-2 font-medium text-sm transition-colors ${e===r.id?"border-blue-500 text-blue-600":"border-transparent text-gray-500 hover:text-gray-700 hover:border-gray-300"}`,children:[h.jsx("span",{className:"mr-2",children:r.icon}),r.label]},r.id))})})}),h.jsxs("main",{className:"max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-8",children:[e==="dashboard"&&h.jsx(Om,{}),e==="mentions"&&h.jsx(Im,{}),e==="alerts"&&h.jsx(Fm,{}),e==="feeds"&&h.jsx(Um,{})]}),h.jsx("footer",{className:"bg-white border-t mt-12",children:h.jsx("div",{className:"max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-4",children:h.jsx("p",{className:"text-center text-sm text-gray-500",children:"Brand Mention Tracker - Real-time monitoring and sentiment analysis"})})})]})}nf(document.getElementById("root")).render(h.jsx($m,{}));
+ */var Ln=U;function Hp(e,t){return e===t&&(e!==0||1/e===1/t)||e!==e&&t!==t}var Qp=typeof Object.is=="function"?Object.is:Hp,Kp=Ln.useState,Yp=Ln.useEffect,Xp=Ln.useLayoutEffect,Gp=Ln.useDebugValue;function Zp(e,t){var n=t(),r=Kp({inst:{value:n,getSnapshot:t}}),l=r[0].inst,o=r[1];return Xp(function(){l.value=n,l.getSnapshot=t,xo(l)&&o({inst:l})},[e,n,t]),Yp(function(){return xo(l)&&o({inst:l}),e(function(){xo(l)&&o({inst:l})})},[e]),Gp(n),n}function xo(e){var t=e.getSnapshot;e=e.value;try{var n=t();return!Qp(e,n)}catch{return!0}}function Jp(e,t){return t()}var qp=typeof window>"u"||typeof window.document>"u"||typeof window.document.createElement>"u"?Jp:Zp;lf.useSyncExternalStore=Ln.useSyncExternalStore!==void 0?Ln.useSyncExternalStore:qp;rf.exports=lf;var bp=rf.exports;const of=0,uf=1,sf=2,As=3;var Us=Object.prototype.hasOwnProperty;function wi(e,t){var n,r;if(e===t)return!0;if(e&&t&&(n=e.constructor)===t.constructor){if(n===Date)return e.getTime()===t.getTime();if(n===RegExp)return e.toString()===t.toString();if(n===Array){if((r=e.length)===t.length)for(;r--&&wi(e[r],t[r]););return r===-1}if(!n||typeof e=="object"){r=0;for(n in e)if(Us.call(e,n)&&++r&&!Us.call(t,n)||!(n in t)||!wi(e[n],t[n]))return!1;return Object.keys(t).length===r}}return e!==e&&t!==t}const ut=new WeakMap,Nt=()=>{},pe=Nt(),xi=Object,z=e=>e===pe,be=e=>typeof e=="function",It=(e,t)=>({...e,...t}),af=e=>be(e.then),So={},Hr={},ku="undefined",Cr=typeof window!=ku,Si=typeof document!=ku,em=Cr&&"Deno"in window,tm=()=>Cr&&typeof window.requestAnimationFrame!=ku,cf=(e,t)=>{const n=ut.get(e);return[()=>!z(t)&&e.get(t)||So,r=>{if(!z(t)){const l=e.get(t);t in Hr||(Hr[t]=l),n[5](t,It(l,r),l||So)}},n[6],()=>!z(t)&&t in Hr?Hr[t]:!z(t)&&e.get(t)||So]};let ki=!0;const nm=()=>ki,[Ei,Ni]=Cr&&window.addEventListener?[window.addEventListener.bind(window),window.removeEventListener.bind(window)]:[Nt,Nt],rm=()=>{const e=Si&&document.visibilityState;return z(e)||e!=="hidden"},lm=e=>(Si&&document.addEventListener("visibilitychange",e),Ei("focus",e),()=>{Si&&document.removeEventListener("visibilitychange",e),Ni("focus",e)}),om=e=>{const t=()=>{ki=!0,e()},n=()=>{ki=!1};return Ei("online",t),Ei("offline",n),()=>{Ni("online",t),Ni("offline",n)}},im={isOnline:nm,isVisible:rm},um={initFocus:lm,initReconnect:om},$s=!Li.useId,xr=!Cr||em,sm=e=>tm()?window.requestAnimationFrame(e):setTimeout(e,1),ko=xr?U.useEffect:U.useLayoutEffect,Eo=typeof navigator<"u"&&navigator.connection,Vs=!xr&&Eo&&(["slow-2g","2g"].includes(Eo.effectiveType)||Eo.saveData),Qr=new WeakMap,am=e=>xi.prototype.toString.call(e),No=(e,t)=>e===`[object ${t}]`;let cm=0;const _i=e=>{const t=typeof e,n=am(e),r=No(n,"Date"),l=No(n,"RegExp"),o=No(n,"Object");let i,u;if(xi(e)===e&&!r&&!l){if(i=Qr.get(e),i)return i;if(i=++cm+"~",Qr.set(e,i),Array.isArray(e)){for(i="@",u=0;u<e.length;u++)i+=_i(e[u])+",";Qr.set(e,i)}if(o){i="#";const s=xi.keys(e).sort();for(;!z(u=s.pop());)z(e[u])||(i+=u+":"+_i(e[u])+",");Qr.set(e,i)}}else i=r?e.toJSON():t=="symbol"?e.toString():t=="string"?JSON.stringify(e):""+e;return i},Eu=e=>{if(be(e))try{e=e()}catch{e=""}const t=e;return e=typeof e=="string"?e:(Array.isArray(e)?e.length:e)?_i(e):"",[e,t]};let fm=0;const Ci=()=>++fm;async function ff(...e){const[t,n,r,l]=e,o=It({populateCache:!0,throwOnError:!0},typeof l=="boolean"?{revalidate:l}:l||{});let i=o.populateCache;const u=o.rollbackOnError;let s=o.optimisticData;const a=p=>typeof u=="function"?u(p):u!==!1,v=o.throwOnError;if(be(n)){const p=n,y=[],S=t.keys();for(const x of S)!/^\$(inf|sub)\$/.test(x)&&p(t.get(x)._k)&&y.push(x);return Promise.all(y.map(m))}return m(n);async function m(p){const[y]=Eu(p);if(!y)return;const[S,x]=cf(t,y),[M,c,f,d]=ut.get(t),g=()=>{const ne=M[y];return(be(o.revalidate)?o.revalidate(S().data,p):o.revalidate!==!1)&&(delete f[y],delete d[y],ne&&ne[0])?ne[0](sf).then(()=>S().data):S().data};if(e.length<3)return g();let k=r,C,_=!1;const E=Ci();c[y]=[E,0];const F=!z(s),P=S(),te=P.data,Xe=P._c,_e=z(Xe)?te:Xe;if(F&&(s=be(s)?s(_e,te):s,x({data:s,_c:_e})),be(k))try{k=k(_e)}catch(ne){C=ne,_=!0}if(k&&af(k))if(k=await k.catch(ne=>{C=ne,_=!0}),E!==c[y][0]){if(_)throw C;return k}else _&&F&&a(C)&&(i=!0,x({data:_e,_c:pe}));if(i&&!_)if(be(i)){const ne=i(k,_e);x({data:ne,error:pe,_c:pe})}else x({data:k,error:pe,_c:pe});if(c[y][1]=Ci(),Promise.resolve(g()).then(()=>{x({_c:pe})}),_){if(v)throw C;return}return k}}const Ws=(e,t)=>{for(const n in e)e[n][0]&&e[n][0](t)},dm=(e,t)=>{if(!ut.has(e)){const n=It(um,t),r=Object.create(null),l=ff.bind(pe,e);let o=Nt;const i=Object.create(null),u=(v,m)=>{const p=i[v]||[];return i[v]=p,p.push(m),()=>p.splice(p.indexOf(m),1)},s=(v,m,p)=>{e.set(v,m);const y=i[v];if(y)for(const S of y)S(m,p)},a=()=>{if(!ut.has(e)&&(ut.set(e,[r,Object.create(null),Object.create(null),Object.create(null),l,s,u]),!xr)){const v=n.initFocus(setTimeout.bind(pe,Ws.bind(pe,r,of))),m=n.initReconnect(setTimeout.bind(pe,Ws.bind(pe,r,uf)));o=()=>{v&&v(),m&&m(),ut.delete(e)}}};return a(),[e,l,a,o]}return[e,ut.get(e)[4]]},pm=(e,t,n,r,l)=>{const o=n.errorRetryCount,i=l.retryCount,u=~~((Math.random()+.5)*(1<<(i<8?i:8)))*n.errorRetryInterval;!z(o)&&i>o||setTimeout(r,u,l)},mm=wi,[df,hm]=dm(new Map),vm=It({onLoadingSlow:Nt,onSuccess:Nt,onError:Nt,onErrorRetry:pm,onDiscarded:Nt,revalidateOnFocus:!0,revalidateOnReconnect:!0,revalidateIfStale:!0,shouldRetryOnError:!0,errorRetryInterval:Vs?1e4:5e3,focusThrottleInterval:5*1e3,dedupingInterval:2*1e3,loadingTimeout:Vs?5e3:3e3,compare:mm,isPaused:()=>!1,cache:df,mutate:hm,fallback:{}},im),gm=(e,t)=>{const n=It(e,t);if(t){const{use:r,fallback:l}=e,{use:o,fallback:i}=t;r&&o&&(n.use=r.concat(o)),l&&i&&(n.fallback=It(l,i))}return n},ym=U.createContext({}),wm="$inf$",pf=Cr&&window.__SWR_DEVTOOLS_USE__,xm=pf?window.__SWR_DEVTOOLS_USE__:[],Sm=()=>{pf&&(window.__SWR_DEVTOOLS_REACT__=Li)},km=e=>be(e[1])?[e[0],e[1],e[2]||{}]:[e[0],null,(e[1]===null?e[2]:e[1])||{}],Em=()=>{const e=U.useContext(ym);return U.useMemo(()=>It(vm,e),[e])},Nm=e=>(t,n,r)=>e(t,n&&((...o)=>{const[i]=Eu(t),[,,,u]=ut.get(df);if(i.startsWith(wm))return n(...o);const s=u[i];return z(s)?n(...o):(delete u[i],s)}),r),_m=xm.concat(Nm),Cm=e=>function(...n){const r=Em(),[l,o,i]=km(n),u=gm(r,i);let s=e;const{use:a}=u,v=(a||[]).concat(_m);for(let m=v.length;m--;)s=v[m](s);return s(l,o||u.fetcher||null,u)},jm=(e,t,n)=>{const r=t[e]||(t[e]=[]);return r.push(n),()=>{const l=r.indexOf(n);l>=0&&(r[l]=r[r.length-1],r.pop())}};Sm();const _o=Li.use||(e=>{switch(e.status){case"pending":throw e;case"fulfilled":return e.value;case"rejected":throw e.reason;default:throw e.status="pending",e.then(t=>{e.status="fulfilled",e.value=t},t=>{e.status="rejected",e.reason=t}),e}}),Co={dedupe:!0},Bs=Promise.resolve(pe),Pm=(e,t,n)=>{const{cache:r,compare:l,suspense:o,fallbackData:i,revalidateOnMount:u,revalidateIfStale:s,refreshInterval:a,refreshWhenHidden:v,refreshWhenOffline:m,keepPreviousData:p}=n,[y,S,x,M]=ut.get(r),[c,f]=Eu(e),d=U.useRef(!1),g=U.useRef(!1),k=U.useRef(c),C=U.useRef(t),_=U.useRef(n),E=()=>_.current,F=()=>E().isVisible()&&E().isOnline(),[P,te,Xe,_e]=cf(r,c),ne=U.useRef({}).current,Ut=z(i)?z(n.fallback)?pe:n.fallback[c]:i,tn=(D,K)=>{for(const re in ne){const W=re;if(W==="data"){if(!l(D[W],K[W])&&(!z(D[W])||!l(vt,K[W])))return!1}else if(K[W]!==D[W])return!1}return!0},nn=U.useMemo(()=>{const D=!c||!t?!1:z(u)?E().isPaused()||o?!1:s!==!1:u,K=he=>{const rt=It(he);return delete rt._k,D?{isValidating:!0,isLoading:!0,...rt}:rt},re=P(),W=_e(),$e=K(re),rn=re===W?$e:K(W);let ie=$e;return[()=>{const he=K(P());return tn(he,ie)?(ie.data=he.data,ie.isLoading=he.isLoading,ie.isValidating=he.isValidating,ie.error=he.error,ie):(ie=he,he)},()=>rn]},[r,c]),N=bp.useSyncExternalStore(U.useCallback(D=>Xe(c,(K,re)=>{tn(re,K)||D()}),[r,c]),nn[0],nn[1]),R=!d.current,T=y[c]&&y[c].length>0,A=N.data,$=z(A)?Ut&&af(Ut)?_o(Ut):Ut:A,nt=N.error,Ue=U.useRef($),vt=p?z(A)?z(Ue.current)?$:Ue.current:A:$,Ge=T&&!z(nt)?!1:R&&!z(u)?u:E().isPaused()?!1:o?z($)?!1:s:z($)||s,$t=!!(c&&t&&R&&Ge),mf=z(N.isValidating)?$t:N.isValidating,hf=z(N.isLoading)?$t:N.isLoading,In=U.useCallback(async D=>{const K=C.current;if(!c||!K||g.current||E().isPaused())return!1;let re,W,$e=!0;const rn=D||{},ie=!x[c]||!rn.dedupe,he=()=>$s?!g.current&&c===k.current&&d.current:c===k.current,rt={isValidating:!1,isLoading:!1},Cu=()=>{te(rt)},ju=()=>{const ze=x[c];ze&&ze[1]===W&&delete x[c]},Pu={isValidating:!0};z(P().data)&&(Pu.isLoading=!0);try{if(ie&&(te(Pu),n.loadingTimeout&&z(P().data)&&setTimeout(()=>{$e&&he()&&E().onLoadingSlow(c,n)},n.loadingTimeout),x[c]=[K(f),Ci()]),[re,W]=x[c],re=await re,ie&&setTimeout(ju,n.dedupingInterval),!x[c]||x[c][1]!==W)return ie&&he()&&E().onDiscarded(c),!1;rt.error=pe;const ze=S[c];if(!z(ze)&&(W<=ze[0]||W<=ze[1]||ze[1]===0))return Cu(),ie&&he()&&E().onDiscarded(c),!1;const lt=P().data;rt.data=l(lt,re)?lt:re,ie&&he()&&E().onSuccess(re,c,n)}catch(ze){ju();const lt=E(),{shouldRetryOnError:Ql}=lt;lt.isPaused()||(rt.error=ze,ie&&he()&&(lt.onError(ze,c,lt),(Ql===!0||be(Ql)&&Ql(ze))&&(!E().revalidateOnFocus||!E().revalidateOnReconnect||F())&&lt.onErrorRetry(ze,c,lt,vf=>{const Kl=y[c];Kl&&Kl[0]&&Kl[0](As,vf)},{retryCount:(rn.retryCount||0)+1,dedupe:!0})))}return $e=!1,Cu(),!0},[c,r]),_u=U.useCallback((...D)=>ff(r,k.current,...D),[]);if(ko(()=>{C.current=t,_.current=n,z(A)||(Ue.current=A)}),ko(()=>{if(!c)return;const D=In.bind(pe,Co);let K=0;E().revalidateOnFocus&&(K=Date.now()+E().focusThrottleInterval);const W=jm(c,y,($e,rn={})=>{if($e==of){const ie=Date.now();E().revalidateOnFocus&&ie>K&&F()&&(K=ie+E().focusThrottleInterval,D())}else if($e==uf)E().revalidateOnReconnect&&F()&&D();else{if($e==sf)return In();if($e==As)return In(rn)}});return g.current=!1,k.current=c,d.current=!0,te({_k:f}),Ge&&(x[c]||(z($)||xr?D():sm(D))),()=>{g.current=!0,W()}},[c]),ko(()=>{let D;function K(){const W=be(a)?a(P().data):a;W&&D!==-1&&(D=setTimeout(re,W))}function re(){!P().error&&(v||E().isVisible())&&(m||E().isOnline())?In(Co).then(K):K()}return K(),()=>{D&&(clearTimeout(D),D=-1)}},[a,v,m,c]),U.useDebugValue(vt),o){const D=c&&z($);if(!$s&&xr&&D)throw new Error("Fallback data is required when using Suspense in SSR.");D&&(C.current=t,_.current=n,g.current=!1);const K=M[c],re=!z(K)&&D?_u(K):Bs;if(_o(re),!z(nt)&&D)throw nt;const W=D?In(Co):Bs;!z(vt)&&D&&(W.status="fulfilled",W.value=!0),_o(W)}return{mutate:_u,get data(){return ne.data=!0,vt},get error(){return ne.error=!0,nt},get isValidating(){return ne.isValidating=!0,mf},get isLoading(){return ne.isLoading=!0,hf}}},Nu=Cm(Pm),Rm=()=>"http://localhost:8000/api",Tm=()=>{const e=window.location.protocol==="https:"?"wss":"ws",n="http://localhost:8000".replace(/^https?:\/\//,"").replace(/\/api$/,"");return`${e}://${n}/ws`},Hl=Rm(),Lm=Tm(),zm=e=>fetch(e).then(t=>t.json());const Bm=(e,t)=>{const n=(s,a)=>{const c={...s};return Object.entries(a||{}).forEach(([f,p])=>{c[f]=(c[f]||0)+p}),c},r=(s,a,c,f)=>{const p=s.map(y=>({...y}));return Object.entries(c||{}).forEach(([y,v])=>{const m=p.find(g=>g[a]===y);m?m.count+=v:p.push({[a]:y,count:v})}),p.sort((y,v)=>v.count-y.count),f?p.slice(0,f):p};let l=e.hourly_mentions.map(s=>({...s}));return Object.entries(t.hourly||{}).forEach(([s,a])=>{let c=l.find(f=>f.time===s);if(!c){const f=new Date(s);if(l.length&&f<new Date(l[l.length-1].time))return;c={hour:f.getUTCHours(),time:s,count:0},l=[...l.slice(1),c]}c.count+=a}),{...e,mentions:n(e.mentions,t.mentions),stories:n(e.stories,t.stories),sentiment:n(e.sentiment,t.sentiment),alerts:n(e.alerts,t.alerts),topics:r(e.topics,"topic",t.topics,10),sources:r(e.sources,"source",t.sources),hourly_mentions:l}};function Om(){const[c,f]=U.useState(!1),{data:e,error:t,mutate:n}=Nu(`${Hl}/dashboard-stats/`,zm,{refreshInterval:c?0:3e4});if(U.useEffect(()=>{let s,a,p=!1;const y=()=>{s=new WebSocket(`${Lm}/dashboard/`),s.onopen=()=>f(!0),s.onmessage=v=>{try{const m=JSON.parse(v.data);m.type==="snapshot"?n(m.data,!1):m.type==="delta"&&n(g=>g&&Bm(g,m.data),!1)}catch(m){console.error("Error parsing dashboard update:",m)}},s.onclose=()=>{f(!1),p||(a=setTimeout(y,5e3))}};return y(),()=>{p=!0,clearTimeout(a),s.close()}},[n]),t)return h.jsxs("div",{className:"text-red-500",children:["Error loading dashboard: ",t.message]});if(!e)return h.jsx("div",{className:"text-gray-500",children:"Loading dashboard..."});const r=e.sentiment.positive+e.sentiment.negative+e.sentiment.neutral,l=r>0?(e.sentiment.positive/r*100).toFixed(1):0,o=r>0?(e.sentiment.negative/r*100).toFixed(1):0,i=r>0?(e.sentiment.neutral/r*100).toFixed(1):0,u=Math.max(...e.hourly_mentions.map(s=>s.count),1);return h.jsxs("div",{className:"space-y-6",children:[h.jsxs("div",{className:"grid grid-cols-1 md:grid-cols-4 gap-4",children:[h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md border-l-4 border-blue-500",children:[h.jsx("h3",{className:"text-sm font-medium text-gray-500",children:"Total Mentions"}),h.jsx("p",{className:"text-3xl font-bold text-gray-900 mt-2",children:e.mentions.total}),h.jsxs("p",{className:"text-xs text-gray-500 mt-1",children:[e.mentions.last_24h," in last 24h"]})]}),h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md border-l-4 border-green-500",children:[h.jsx("h3",{className:"text-sm font-medium text-gray-500",children:"Positive"}),h.jsx("p",{className:"text-3xl font-bold text-green-600 mt-2",children:e.sentiment.positive}),h.jsxs("p",{className:"text-xs text-gray-500 mt-1",children:[l,"% of total"]})]}),h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md border-l-4 border-red-500",children:[h.jsx("h3",{className:"text-sm font-medium text-gray-500",children:"Negative"}),h.jsx("p",{className:"text-3xl font-bold text-red-600 mt-2",children:e.sentiment.negative}),h.jsxs("p",{className:"text-xs text-gray-500 mt-1",children:[o,"% of total"]})]}),h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md border-l-4 border-yellow-500",children:[h.jsx("h3",{className:"text-sm font-medium text-gray-500",children:"Active Alerts"}),h.jsx("p",{className:"text-3xl font-bold text-yellow-600 mt-2",children:e.alerts.unresolved}),h.jsxs("p",{className:"text-xs text-gray-500 mt-1",children:[e.alerts.recent_24h," in last 24h"]})]})]}),h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md",children:[h.jsx("h2",{className:"text-xl font-bold mb-4",children:"Sentiment Breakdown"}),h.jsxs("div",{className:"space-y-3",children:[h.jsxs("div",{children:[h.jsxs("div",{className:"flex justify-between text-sm mb-1",children:[h.jsx("span",{className:"text-green-600 font-medium",children:"Positive"}),h.jsxs("span",{children:[e.sentiment.positive," (",l,"%)"]})]}),h.jsx("div",{className:"w-full bg-gray-200 rounded-full h-3",children:h.jsx("div",{className:"bg-green-500 h-3 rounded-full transition-all",style:{width:`${l}%`}})})]}),h.jsxs("div",{children:[h.jsxs("div",{className:"flex justify-between text-sm mb-1",children:[h.jsx("span",{className:"text-gray-600 font-medium",children:"Neutral"}),h.jsxs("span",{children:[e.sentiment.neutral," (",i,"%)"]})]}),h.jsx("div",{className:"w-full bg-gray-200 rounded-full h-3",children:h.jsx("div",{className:"bg-gray-400 h-3 rounded-full transition-all",style:{width:`${i}%`}})})]}),h.jsxs("div",{children:[h.jsxs("div",{className:"flex justify-between text-sm mb-1",children:[h.jsx("span",{className:"text-red-600 font-medium",children:"Negative"}),h.jsxs("span",{children:[e.sentiment.negative," (",o,"%)"]})]}),h.jsx("div",{className:"w-full bg-gray-200 rounded-full h-3",children:h.jsx("div",{className:"bg-red-500 h-3 rounded-full transition-all",style:{width:`${o}%`}})})]})]})]}),h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md",children:[h.jsx("h2",{className:"text-xl font-bold mb-4",children:"Mentions Over Last 24 Hours"}),h.jsx("div",{className:"flex items-end justify-between h-48 space-x-1",children:e.hourly_mentions.map((s,a)=>h.jsxs("div",{className:"flex-1 flex flex-col items-center",children:[h.jsx("div",{className:"w-full bg-blue-500 rounded-t transition-all hover:bg-blue-600",style:{height:`${s.count/u*100}%`},title:`${s.count} mentions at ${s.hour}:00`}),h.jsxs("span",{className:"text-xs text-gray-500 mt-1",children:[s.hour,":00"]})]},a))})]}),e.topics&&e.topics.length>0&&h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md",children:[h.jsx("h2",{className:"text-xl font-bold mb-4",children:"Top Topics"}),h.jsx("div",{className:"space-y-2",children:e.topics.slice(0,10).map((s,a)=>h.jsxs("div",{className:"flex items-center justify-between p-3 bg-gray-50 rounded",children:[h.jsx("span",{className:"text-sm font-medium text-gray-700",children:s.topic||"Unknown"}),h.jsxs("span",{className:"text-sm text-gray-500 bg-white px-3 py-1 rounded-full",children:[s.count," mentions"]})]},a))})]}),e.sources&&e.sources.length>0&&h.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-md",children:[h.jsx("h2",{className:"text-xl font-bold mb-4",children:"Sources"}),h.jsx("div",{className:"flex flex-wrap gap-2",children:e.sources.map((s,a)=>h.jsxs("span",{className:"px-4 py-2 bg-blue-100 text-blue-800 rounded-full text-sm font-medium",children:[s.source,": ",s.count]},a))})]})]})}const Dm=e=>fetch(e).then(t=>t.json());function Im(){const[e,t]=U.useState("all"),{data:n,error:r,mutate:l}=Nu(`${Hl}/mentions/recent/?limit=100`,Dm,{refreshInterval:15e3});if(r)return h.jsxs("div",{className:"text-red-500",children:["Error loading mentions: ",r.message]});if(!n)return h.jsx("div",{className:"text-gray-500",children:"Loading mentions..."});const o=Array.isArray(n)?n:n.results||[],i=e==="all"?o:o.filter(a=>a.sentiment===e),u=a=>{switch(a==null?void 0:a.toLowerCase()){case"positive":return"bg-green-100 text-green-800 border-green-300";case"negative":return"bg-red-100 text-red-800 border-red-300";case"neutral":return"bg-gray-100 text-gray-800 border-gray-300";default:return"bg-gray-100 text-gray-800 border-gray-300"}},s=a=>a?new Date(a).toLocaleString():"Unknown";return h.jsxs("div",{className:"bg-white rounded-lg shadow-md p-6",children:[h.jsxs("div",{className:"flex justify-between items-center mb-4",children:[h.jsx("h2",{className:"text-xl font-bold",children:"Recent Mentions"}),h.jsxs("div",{className:"flex gap-2",children:[h.jsx("button",{onClick:()=>t("all"),className:`px-4 py-2 rounded text-sm font-medium ${e==="all"?"bg-blue-500 text-white":"bg-gray-200 text-gray-700 hover:bg-gray-300"}`,children:"All"}),h.jsx("button",{onClick:()=>t("positive"),className:`px-4 py-2 rounded text-sm font-medium ${e==="positive"?"bg-green-500 text-white":"bg-gray-200 text-gray-700 hover:bg-gray-300"}`,children:"Positive"}),h.jsx("button",{onClick:()=>t("neutral"),className:`px-4 py-2 rounded text-sm font-medium ${e==="neutral"?"bg-gray-500 text-white":"bg-gray-200 text-gray-700 hover:bg-gray-300"}`,children:"Neutral"}),h.jsx("button",{onClick:()=>t("negative"),className:`px-4 py-2 rounded text-sm font-medium ${e==="negative"?"bg-red-500 text-white":"bg-gray-200 text-gray-700 hover:bg-gray-300"}`,children:"Negative"})]})]}),h.jsx("div",{className:"space-y-3 max-h-96 overflow-y-auto",children:i.length===0?h.jsxs("div",{className:"text-center py-8 text-gray-500",children:["No mentions found ",e!=="all"&&`with ${e} sentiment`]}):i.map(a=>h.jsxs("div",{className:"border rounded-lg p-4 hover:shadow-md transition-shadow",children:[h.jsxs("div",{className:"flex items-start justify-between mb-2",children:[h.jsxs("div",{className:"flex items-center gap-2",children:[h.jsx("span",{className:`px-2 py-1 rounded text-xs font-semibold border ${u(a.sentiment)}`,children:a.sentiment||"Processing..."}),a.sentiment_score&&h.jsxs("span",{className:"text-xs text-gray-500",children:[(a.sentiment_score*100).toFixed(0),"%"]}),h.jsx("span",{className:"text-xs text-gray-500 bg-gray-100 px-2 py-1 rounded",children:a.source})]}),h.jsx("span",{className:"text-xs text-gray-500",children:s(a.created_at)})]}),h.jsx("p",{className:"text-sm text-gray-700 mb-2 line-clamp-3",children:a.text}),a.topic&&h.jsxs("div",{className:"flex items-center gap-2",children:[h.jsx("span",{className:"text-xs text-gray-500",children:"Topic:"}),h.jsx("span",{className:"text-xs bg-blue-100 text-blue-800 px-2 py-1 rounded",children:a.topic})]})]},a.id))})]})}const Mm=e=>fetch(e).then(t=>t.json());function Fm(){const[e,t]=U.useState([]),{data:n,error:r}=Nu(`${Hl}/alerts/?ordering=-created_at`,Mm,{refreshInterval:1e4});U.useEffect(()=>{const u=`${Lm}/mentions/`,s=new WebSocket(u);return s.onmessage=a=>{try{const v=JSON.parse(a.data);t(m=>[v,...m].slice(0,50))}catch(v){console.error("Error parsing WebSocket message:",v)}},s.onopen=()=>console.log("WebSocket connected"),s.onerror=a=>console.error("WebSocket error:",a),s.onclose=()=>console.log("WebSocket closed"),()=>s.close()},[]);const l=[...e.map(u=>({...u,source:"realtime"})),...((n==null?void 0:n.results)||n||[]).map(u=>({...u,source:"api"}))].slice(0,50),o=u=>{if(!u)return"Just now";const s=new Date(u),v=new Date-s,m=Math.floor(v/6e4);if(m<1)return"Just now";if(m<60)return`${m} minute${m>1?"s":""} ago`;const p=Math.floor(m/60);return p<24?`${p} hour${p>1?"s":""} ago`:s.toLocaleString()},i=u=>u!=null&&u.includes("negative")||u!=null&&u.includes("spike")?"border-red-500 bg-red-50":"border-yellow-500 bg-yellow-50";return r?h.jsx("div",{className:"bg-white rounded-lg shadow-md p-6",children:h.jsxs("div",{className:"text-red-500",children:["Error loading alerts: ",r.message]})}):h.jsxs("div",{className:"bg-white rounded-lg shadow-md p-6",children:[h.jsxs("div",{className:"mb-4",children:[h.jsx("h2",{className:"text-xl font-bold",children:"Real-time Alerts"}),h.jsx("p",{className:"text-sm text-gray-600",children:"Live alerts for negative spikes and unusual activity"})]}),h.jsx("div",{className:"space-y-3 max-h-96 overflow-y-auto",children:l.length===0?h.jsx("div",{className:"text-center py-8 text-gray-500",children:h.jsx("p",{children:"No alerts yet. Alerts will appear here when negative sentiment spikes are detected."})}):l.map((u,s)=>h.jsxs("div",{className:`p-4 border-l-4 rounded-lg shadow-sm ${i(u.alert_type)}`,children:[h.jsxs("div",{className:"flex items-start justify-between mb-2",children:[h.jsxs("div",{className:"flex items-center gap-2",children:[h.jsx("span",{className:"text-sm font-semibold text-red-700 uppercase",children:u.alert_type||"Alert"}),u.source==="realtime"&&h.jsx("span",{className:"px-2 py-1 text-xs bg-green-500 text-white rounded-full animate-pulse",children:"LIVE"})]}),h.jsx("span",{className:"text-xs text-gray-600",children:o(u.created_at)})]}),h.jsx("div",{className:"text-sm text-gray-700 mb-2",children:u.description}),u.mention_text&&h.jsxs("div",{className:"mt-2 p-2 bg-white rounded border border-gray-200",children:[h.jsx("p",{className:"text-xs text-gray-500 mb-1",children:"Related Mention:"}),h.jsx("p",{className:"text-xs text-gray-700 line-clamp-2",children:u.mention_text})]})]},u.id||s))})]})}const Am=["https://rss.nytimes.com/services/xml/rss/nyt/Technology.xml","https://feeds.bbci.co.uk/news/technology/rss.xml","https://www.theguardian.com/technology/rss"];function Um(){const[e,t]=U.useState(""),[n,r]=U.useState(!1),[l,o]=U.useState(null),i=async s=>{if(s.preventDefault(),!e.trim()){o({type:"error",text:"Please enter a valid RSS feed URL"});return}r(!0),o(null);try{const a=await fetch(`${Hl}/start-fetch/`,{method:"POST",headers:{"Content-Type":"application/json"},body:JSON.stringify({url:e.trim()})}),v=await a.json();a.ok?(o({type:"success",text:`Fetch started for: ${v.url}`}),t("")):o({type:"error",text:v.error||"Failed to start fetch"})}catch(a){o({type:"error",text:`Error: ${a.message}`})}finally{r(!1)}},u=s=>{t(s)};return h.jsxs("div",{className:"bg-white rounded-lg shadow-md p-6",children:[h.jsx("h2",{className:"text-xl font-bold mb-4",children:"RSS Feed Manager"}),h.jsx("form",{onSubmit:i,className:"mb-4",children:h.jsxs("div",{className:"flex gap-2",children:[h.jsx("input",{type:"url",value:e,onChange:s=>t(s.target.value),placeholder:"Enter RSS feed URL (e.g., https://rss.nytimes.com/services/xml/rss/nyt/Technology.xml)",className:"flex-1 px-4 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500",disabled:n}),h.jsx("button",{type:"submit",disabled:n,className:"px-6 py-2 bg-blue-500 text-white rounded-lg hover:bg-blue-600 disabled:bg-gray-400 disabled:cursor-not-allowed font-medium",children:n?"Adding...":"Add Feed"})]})}),l&&h.jsx("div",{className:`mb-4 p-3 rounded-lg ${l.type==="success"?"bg-green-100 text-green-800 border border-green-300":"bg-red-100 text-red-800 border border-red-300"}`,children:l.text}),h.jsxs("div",{children:[h.jsx("h3",{className:"text-sm font-semibold text-gray-700 mb-2",children:"Quick Add Popular Feeds:"}),h.jsx("div",{className:"flex flex-wrap gap-2",children:Am.map((s,a)=>h.jsx("button",{onClick:()=>u(s),className:"px-3 py-1 text-sm bg-gray-100 text-gray-700 rounded hover:bg-gray-200 transition-colors",children:new URL(s).hostname},a))})]}),h.jsx("div",{className:"mt-4 p-3 bg-blue-50 rounded-lg",children:h.jsxs("p",{className:"text-sm text-blue-800",children:[h.jsx("strong",{children:"Note:"})," The system will fetch the latest items from the RSS feed and analyze them for sentiment and topics. Processing may take a few moments."]})})]})}function $m(){const[e,t]=U.useState("dashboard"),n=[{id:"dashboard",label:"Dashboard",icon:"📊"},{id:"mentions",label:"Mentions",icon:"💬"},{id:"alerts",label:"Alerts",icon:"🚨"},{id:"feeds",label:"RSS Feeds",icon:"📡"}];return h.jsxs("div",{className:"min-h-screen bg-gray-50",children:[h.jsx("header",{className:"bg-white shadow-sm border-b",children:h.jsxs("div",{className:"max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-4",children:[h.jsx("h1",{className:"text-3xl font-bold text-gray-900",children:"Brand Mention & Reputation Tracker"}),h.jsx("p",{className:"text-sm text-gray-600 mt-1",children:"Monitor brand mentions across multiple platforms in real-time"})]})}),h.jsx("div",{className:"bg-white border-b",children:h.jsx("div",{className:"max-w-7xl mx-auto px-4 sm:px-6 lg:px-8",children:h.jsx("nav",{className:"flex space-x-8",children:n.map(r=>h.jsxs("button",{onClick:()=>t(r.id),className:`py-4 px-1 border-b-2 font-medium text-sm transition-colors ${e===r.id?"border-blue-500 text-blue-600":"border-transparent text-gray-500 hover:text-gray-700 hover:border-gray-300"}`,children:[h.jsx("span",{className:"mr-2",children:r.icon}),r.label]},r.id))})})}),h.jsxs("main",{className:"max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-8",children:[e==="dashboard"&&h.jsx(Om,{}),e==="mentions"&&h.jsx(Im,{}),e==="alerts"&&h.jsx(Fm,{}),e==="feeds"&&h.jsx(Um,{})]}),h.jsx("footer",{className:"bg-white border-t mt-12",children:h.jsx("div",{className:"max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-4",children:h.jsx("p",{className:"text-center text-sm text-gray-500",children:"Brand Mention Tracker - Real-time monitoring and sentiment analysis"})})})]})}nf(document.getElementById("root")).render(h.jsx($m,{}));
@@ -0,0 +1,160 @@
+# tracker/stats.py - dashboard statistics shared by the API and the template view
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from .models import Mention, Alert
+from . import rollups
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'tracker:dashboard-stats'
+# Last good value, kept much longer than the TTL and served while one worker recomputes
+STALE_KEY = 'tracker:dashboard-stats:stale'
+LOCK_KEY = 'tracker:dashboard-stats:lock'
+INVALIDATE_KEY = 'tracker:dashboard-stats:invalidated'
+
+def _cache():
+    return caches[getattr(settings, 'STATS_CACHE_ALIAS', 'default')]
+
+def compute_dashboard_stats(now=None):
+    """Aggregate the dashboard numbers from the rollup and alert tables"""
+    now = now or timezone.now()
+    last_24h = now - timedelta(hours=24)
+    last_7d = now - timedelta(days=7)
+
+    # STATS_COUNT = 'stories' counts each story cluster once in the breakdowns
+    measure = _measure()
+    # Mentions still waiting for analysis are only reflected in the total
+    pending = Mention.objects.filter(processed=False).count()
+    sentiment_dict = {s['sentiment']: s['count'] for s in rollups.counts_by('sentiment', measure=measure)}
+
+    return {
+        'mentions': {
+            'total': rollups.total() + pending,
+            'last_24h': rollups.total(since=last_24h),
+            'last_7d': rollups.total(since=last_7d),
+        },
+        'sentiment': {
+            'positive': sentiment_dict.get('positive', 0),
+            'negative': sentiment_dict.get('negative', 0),
+            'neutral': sentiment_dict.get('neutral', 0),
+        },
+        'stories': {
+            'total': rollups.total(measure='story_count'),
+            'last_24h': rollups.total(since=last_24h, measure='story_count'),
+            'last_7d': rollups.total(since=last_7d, measure='story_count'),
+        },
+        'counting': 'stories' if measure == 'story_count' else 'mentions',
+        'topics': rollups.counts_by('topic', limit=10, measure=measure),
+        'alerts': {
+            'total': Alert.objects.count(),
+            'unresolved': Alert.objects.filter(resolved=False).count(),
+            'recent_24h': Alert.objects.filter(created_at__gte=last_24h).count(),
+        },
+        'hourly_mentions': rollups.hourly(hours=24, now=now, measure=measure),
+        'sources': rollups.counts_by('source', measure=measure),
+    }
+
+def _measure():
+    return 'story_count' if getattr(settings, 'STATS_COUNT', 'mentions') == 'stories' else 'count'
+
+def dashboard_delta(added=(), removed=(), added_stories=(), removed_stories=(),
+                    pending=0, alerts=0, now=None):
+    """Change to compute_dashboard_stats() caused by rollup bucket moves (see
+    rollups.update), a change in pending mentions and new unresolved alerts.
+
+    Counters map to increments, e.g. {'sentiment': {'negative': 2}}; zero
+    changes are left out and an empty dict means nothing changed.
+    """
+    now = now or timezone.now()
+    last_24h = rollups.floor_hour(now - timedelta(hours=24))
+    last_7d = rollups.floor_hour(now - timedelta(days=7))
+    first_hour = rollups.floor_hour(now) - timedelta(hours=23)
+    delta = {}
+
+    def bump(section, key, n):
+        if n:
+            counters = delta.setdefault(section, {})
+            counters[key] = counters.get(key, 0) + n
+
+    def windows(section, keys, sign):
+        for hour, *_ in keys:
+            bump(section, 'total', sign)
+            if hour >= last_24h:
+                bump(section, 'last_24h', sign)
+            if hour >= last_7d:
+                bump(section, 'last_7d', sign)
+
+    windows('mentions', added, 1)
+    windows('mentions', removed, -1)
+    bump('mentions', 'total', pending)
+    windows('stories', added_stories, 1)
+    windows('stories', removed_stories, -1)
+
+    if _measure() == 'story_count':
+        added, removed = added_stories, removed_stories
+    for keys, sign in ((added, 1), (removed, -1)):
+        for hour, source, sentiment, topic in keys:
+            bump('sentiment', sentiment, sign)
+            bump('sources', source, sign)
+            if topic:
+                bump('topics', topic, sign)
+            if hour >= first_hour:
+                bump('hourly', hour.isoformat(), sign)
+    if alerts:
+        delta['alerts'] = {'total': alerts, 'unresolved': alerts, 'recent_24h': alerts}
+    # Increments that cancelled out
+    for section in list(delta):
+        delta[section] = {k: v for k, v in delta[section].items() if v}
+        if not delta[section]:
+            del delta[section]
+    return delta
+
+def _store(cache, data):
+    ttl = getattr(settings, 'STATS_CACHE_TTL', 15)
+    cache.set(CACHE_KEY, data, timeout=ttl)
+    cache.set(STALE_KEY, data, timeout=ttl * 40)
+
+def get_dashboard_stats():
+    """Cached dashboard stats; at most one worker recomputes them at a time"""
+    cache = _cache()
+    lock_timeout = getattr(settings, 'STATS_LOCK_TIMEOUT', 30)
+    deadline = time.monotonic() + lock_timeout
+    while True:
+        data = cache.get(CACHE_KEY)
+        if data is not None:
+            return data
+
+        if cache.add(LOCK_KEY, 1, timeout=lock_timeout):
+            try:
+                data = compute_dashboard_stats()
+                _store(cache, data)
+                return data
+            finally:
+                cache.delete(LOCK_KEY)
+
+        # Someone else is recomputing: serve the previous value if there is one
+        data = cache.get(STALE_KEY)
+        if data is not None:
+            return data
+        if time.monotonic() > deadline:
+            # The cache keeps refusing the lock; don't leave the dashboard empty
+            return compute_dashboard_stats()
+        # Cold cache: wait for the other worker's value, or take over if it gives up
+        time.sleep(0.05)
+
+def invalidate_dashboard_stats():
+    """Drop the fresh value after new mentions were processed.
+
+    Invalidations are coalesced to one per STATS_MIN_REFRESH seconds so a
+    steady stream of mentions doesn't force a recompute on every request;
+    the stale copy keeps serving readers until the next recompute lands.
+    """
+    cache = _cache()
+    if cache.add(INVALIDATE_KEY, 1, timeout=getattr(settings, 'STATS_MIN_REFRESH', 2)):
+        cache.delete(CACHE_KEY)
@@ -6,14 +6,24 @@ except ImportError:
     def shared_task(func):
         return func
 from .models import Mention, Alert
-from django.utils.dateparse import parse_datetime
 from django.utils import timezone
 import requests
-from bs4 import BeautifulSoup
-from .nlp import analyze_text
+from django.conf import settings
+from django.db import connections
+from .nlp import analyze_text, analyze_texts, EMBED_MODEL_NAME
+from .embeddings import save_embeddings
+from .ingest import build_mention, insert_new_mentions
+from . import feeds
+from .feedparse import FeedStreamParser
+from .spikes import get_detector
+from . import rollups
+from .stats import invalidate_dashboard_stats, dashboard_delta
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
+import hashlib
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -38,100 +48,264 @@ def is_celery_available():
         _celery_available = False
         return False
 
+def dispatch_mentions_batch(mention_ids):
+    """Send a batch of mention ids to Celery, or process it inline without a broker"""
+    mention_ids = list(mention_ids)
+    if not mention_ids:
+        return
+    if is_celery_available():
+        try:
+            process_mentions_batch.delay(mention_ids)
+            return
+        except Exception as celery_error:
+            # Fallback if Celery fails at runtime
+            logger.debug(f"Celery batch task failed for {len(mention_ids)} mentions, processing synchronously: {celery_error}")
+    try:
+        process_mentions_batch(mention_ids)
+    except Exception as e:
+        # The batch task already marked the mentions as errored
+        logger.warning(f"Synchronous batch processing failed for {len(mention_ids)} mentions: {e}")
+
+class MentionBatcher:
+    """Collects mention ids and flushes them as one batch by size or age.
+
+    A timer flushes a partial batch once its oldest id has waited `timeout`
+    seconds, without waiting for another add(); leaving a ``with`` block
+    flushes what is left.
+    """
+
+    def __init__(self, batch_size=None, timeout=None):
+        self.batch_size = batch_size or getattr(settings, 'MENTION_BATCH_SIZE', 32)
+        self.timeout = timeout if timeout is not None else getattr(settings, 'MENTION_BATCH_TIMEOUT', 2.0)
+        self._ids = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def add(self, mention_id):
+        with self._lock:
+            self._ids.append(mention_id)
+            full = len(self._ids) >= self.batch_size
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.timeout, self._flush_due)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            ids, self._ids = self._ids, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if ids:
+            dispatch_mentions_batch(ids)
+
+    def _flush_due(self):
+        try:
+            self.flush()
+        finally:
+            # Without Celery the batch was processed inline on the timer thread
+            connections.close_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
 @shared_task
 def fetch_rss_feed(url):
     import logging
     logger = logging.getLogger(__name__)
     
+    feed = feeds.get_feed(url)
+    started = time.monotonic()
     try:
         logger.info(f"Fetching RSS feed: {url}")
-        resp = requests.get(url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'})
-        resp.raise_for_status()
-        # Try different XML parsers in order of preference
-        soup = None
-        parser_errors = []
-        
-        # Try lxml-xml (best for XML)
-        try:
-            soup = BeautifulSoup(resp.content, 'lxml-xml')
-        except Exception as e:
-            parser_errors.append(f"lxml-xml: {str(e)}")
-        
-        # Try xml parser (requires lxml)
-        if soup is None:
-            try:
-                soup = BeautifulSoup(resp.content, 'xml')
-            except Exception as e:
-                parser_errors.append(f"xml: {str(e)}")
-        
-        # Fallback to html.parser (may not work perfectly for XML)
-        if soup is None:
-            try:
-                soup = BeautifulSoup(resp.content, 'html.parser')
-                logger.warning("Using html.parser for XML - may cause issues. Install lxml for better XML support.")
-            except Exception as e:
-                parser_errors.append(f"html.parser: {str(e)}")
-                raise Exception(f"Could not parse XML. Parser errors: {parser_errors}. Please install lxml: pip install lxml")
-        items = soup.find_all('item')
-        
-        created_count = 0
-        for item in items[:30]:
-            try:
-                title = item.title.text if item.title else ''
-                desc = item.description.text if item.description else ''
-                pub = item.pubDate.text if item.pubDate else None
-                
-                # Parse date with proper fallback - parse_datetime can return None
-                dt = None
-                if pub:
-                    try:
-                        dt = parse_datetime(pub)
-                    except (ValueError, TypeError):
-                        dt = None
-                
-                # Ensure we always have a valid datetime
-                if dt is None:
-                    dt = timezone.now()
-                
-                text = f"{title}\n\n{desc}".strip()
-                
-                if not text:
-                    continue
-                    
-                # Check for duplicates using the date
-                mention_date = dt.date()
-                
-                if not Mention.objects.filter(text__icontains=text[:120], created_at__date=mention_date).exists():
-                    m = Mention.objects.create(source='rss', text=text, created_at=dt)
-                    
-                    # Check Celery availability and process accordingly
-                    if is_celery_available():
-                        try:
-                            process_mention.delay(m.id)
-                        except Exception as celery_error:
-                            # Fallback if Celery fails at runtime
-                            logger.debug(f"Celery task failed for mention {m.id}, processing synchronously: {celery_error}")
-                            process_mention(m.id)
-                    else:
-                        # Celery not available, process synchronously (only log once)
-                        if _celery_available is False and created_count == 0:
-                            logger.info("Celery/Redis not available - processing mentions synchronously. Start Redis for better performance.")
-                        process_mention(m.id)
-                    
-                    created_count += 1
-            except Exception as item_error:
-                logger.warning(f"Error processing RSS item: {item_error}")
-                continue
-        
-        logger.info(f"Created {created_count} new mentions from {url}")
-        return {'status': 'success', 'created': created_count}
+        # Streamed so the parser consumes the body as it arrives and can stop early
+        with feeds.get_session().get(url, timeout=10, headers=feeds.request_headers(feed), stream=True) as resp:
+            resp.raise_for_status()
+            result = handle_feed_response(
+                feed, resp.status_code, resp.headers, resp.iter_content(chunk_size=64 * 1024), started
+            )
+        logger.info(f"Feed {url}: {result['status']}, created {result['created']} new mentions")
+        return result
     except requests.RequestException as e:
+        status = e.response.status_code if e.response is not None else None
+        feeds.record_error(feed, e, time.monotonic() - started, status)
         logger.error(f"RSS fetch error for {url}: {e}")
         raise
     except Exception as e:
+        feeds.record_error(feed, e, time.monotonic() - started)
         logger.error(f"Unexpected error fetching RSS feed {url}: {e}")
         raise
 
+@shared_task
+def poll_feeds():
+    """Poll all due feeds; scheduled by Celery beat (see CELERY_BEAT_SCHEDULE)"""
+    from .poller import poller_available, poll_due_feeds
+    if poller_available():
+        results = poll_due_feeds()
+    else:
+        # Without aiohttp fall back to fetching due feeds one after another
+        logger.warning("aiohttp not installed - polling feeds sequentially")
+        results = []
+        for feed in feeds.claim_due_feeds():
+            try:
+                results.append({'url': feed.url, **fetch_rss_feed(feed.url)})
+            except Exception:
+                results.append({'url': feed.url, 'status': 'error', 'created': 0})
+            finally:
+                feeds.schedule_next_poll(feeds.get_feed(feed.url))
+    return {
+        'status': 'success',
+        'polled': len(results),
+        'created': sum(r['created'] for r in results),
+    }
+
+def handle_feed_response(feed, status, headers, chunks, started):
+    """Apply a successful (2xx/304) response body, given as byte chunks, to a feed.
+
+    Parsing stops at the newest item seen on the previous fetch, so an
+    unchanged feed costs one item's worth of parsing and no DB work. Feeds
+    read to the end (their items have no guid or link, or the known item is
+    gone) are hashed in the same pass and skipped when the body is identical
+    to the last one.
+    """
+    # Unchanged feeds cost one conditional round-trip and never reach the parser
+    if status == 304:
+        feeds.record_not_modified(feed, status, time.monotonic() - started)
+        return {'status': 'not_modified', 'created': 0}
+
+    hasher = hashlib.sha256()
+    parser = FeedStreamParser(limit=getattr(settings, 'FEED_MAX_ITEMS', 30), stop_at=feed.last_item_id)
+    items = []
+    read_all = True
+    for chunk in chunks:
+        hasher.update(chunk)
+        items.extend(parser.feed(chunk))
+        if parser.done:
+            read_all = False
+            break
+    if read_all:
+        items.extend(parser.close())
+    # The body hash is only known when the whole body was read
+    content_hash = hasher.hexdigest() if read_all else ''
+
+    if not items or (content_hash and content_hash == feed.content_hash):
+        feeds.record_not_modified(feed, status, time.monotonic() - started, headers)
+        return {'status': 'unchanged', 'created': 0}
+
+    created_count = ingest_feed_items(items)
+    last_item_id = items[0].guid or items[0].link or ''
+    feeds.record_success(feed, status, headers, content_hash, time.monotonic() - started, last_item_id)
+    return {'status': 'success', 'created': created_count}
+
+def ingest_feed_items(items, source='rss'):
+    """Store the new items of a parsed feed and queue them for analysis"""
+    candidates = []
+    for item in items:
+        text = f"{item.title}\n\n{item.description}".strip()
+        if not text:
+            continue
+        # Items without a parseable date are stamped with the fetch time
+        dt = item.published or timezone.now()
+        external_id = (item.guid or item.link or '').strip()[:255] or None
+        candidates.append(build_mention(text, dt, source=source, external_id=external_id))
+
+    return len(ingest_mentions(candidates))
+
+def ingest_mentions(candidates, use_copy=False, ids_only=False):
+    """Store the new ones of a batch of unsaved mentions and queue them for analysis in batches"""
+    # One IN query for the whole batch, then a single bulk insert
+    new_ids = insert_new_mentions(candidates, use_copy=use_copy, ids_only=ids_only)
+    publish_dashboard(dashboard_delta(pending=len(new_ids)))
+    if new_ids and not is_celery_available():
+        logger.info("Celery/Redis not available - processing mentions synchronously. Start Redis for better performance.")
+    with MentionBatcher() as batcher:
+        for mention_id in new_ids:
+            batcher.add(mention_id)
+    return new_ids
+
+def _apply_analysis(m, result):
+    # analyze_text returns (sentiment, score, topic_label, emb_bytes)
+    sentiment, score, topic = result[:3]
+    m.sentiment = sentiment
+    m.sentiment_score = score
+    m.topic = topic or 'general'
+    m.processed = True
+
+def _story_results(mentions):
+    """{mention_id: result} copied from an analyzed mention of the same story.
+
+    Only with CLUSTER_REUSE_ANALYSIS; the first mention of a story always
+    goes through the models, later near-duplicates reuse its result.
+    """
+    if not getattr(settings, 'CLUSTER_REUSE_ANALYSIS', False):
+        return {}
+    members = {m.id: m.cluster_id for m in mentions if m.cluster_id and m.cluster_id != m.id}
+    if not members:
+        return {}
+    analyzed = {}
+    rows = (
+        Mention.objects.filter(cluster_id__in=set(members.values()), processed=True)
+        .exclude(sentiment='error').exclude(id__in=list(members))
+        .order_by('id').values_list('cluster_id', 'sentiment', 'sentiment_score', 'topic')
+    )
+    for cluster_id, sentiment, score, topic in rows:
+        analyzed.setdefault(cluster_id, (sentiment, score, topic, None))
+    return {mention_id: analyzed[c] for mention_id, c in members.items() if c in analyzed}
+
+def _snapshot(m):
+    # The fields rollup buckets are built from, before analysis overwrites them
+    return Mention(id=m.id, cluster_id=m.cluster_id, created_at=m.created_at, source=m.source,
+                   sentiment=m.sentiment, topic=m.topic)
+
+def _update_rollups(mentions, previous=()):
+    """Move mentions into their rollup buckets, out of the buckets of their previous state,
+    and push the resulting change to live dashboards"""
+    keys = dict(
+        added=[rollups.bucket(m) for m in mentions],
+        removed=[rollups.bucket(m) for m in previous],
+        added_stories=rollups.story_buckets(mentions),
+        removed_stories=rollups.story_buckets(previous),
+    )
+    rollups.update(**keys)
+    # Mentions analyzed for the first time leave the pending count
+    publish_dashboard(dashboard_delta(pending=len(previous) - len(mentions), **keys))
+
+def _mark_failed(mention_ids):
+    """Put mentions whose analysis failed into the 'error' state, rollups included"""
+    with rollups.updating():
+        failed = list(Mention.objects.filter(id__in=mention_ids).order_by('id'))
+        # Whatever state the failure left them in is what the rollups counted
+        previous = [_snapshot(m) for m in failed if m.processed]
+        for m in failed:
+            m.processed = True
+            m.sentiment = 'error'
+        Mention.objects.filter(id__in=[m.id for m in failed]).update(processed=True, sentiment='error')
+        _update_rollups(failed, previous)
+    invalidate_dashboard_stats()
+
+def _check_negative_spikes(mentions):
+    """Feed negative mentions to the spike detector and alert once per new episode"""
+    negatives = [m for m in mentions if m.sentiment == 'negative']
+    if not negatives:
+        return []
+    window = getattr(settings, 'SPIKE_WINDOW_MINUTES', 10)
+    alerts = []
+    for spike in get_detector().record(negatives):
+        alert = Alert.objects.create(
+            mention=spike.mention,
+            alert_type='negative_spike',
+            description=f'{spike.count} negative mentions in last {window} minutes ({spike.scope})'
+        )
+        alerts.append((alert, spike.mention))
+    broadcast_alerts(alerts)
+    publish_dashboard(dashboard_delta(alerts=len(alerts)))
+    return [alert for alert, _ in alerts]
+
 @shared_task
 def process_mention(mention_id):
     import logging
@@ -139,37 +313,22 @@ def process_mention(mention_id):
     
     try:
         m = Mention.objects.get(id=mention_id)
-        result = analyze_text(m.text)
-        # analyze_text returns (sentiment, score, topic_label, emb_bytes)
-        if len(result) == 4:
-            sentiment, score, topic, emb_bytes = result
-        else:
-            # Fallback for old signature
-            sentiment, score, topic = result[:3]
-        
-        m.sentiment = sentiment
-        m.sentiment_score = score
-        m.topic = topic or 'general'
-        m.processed = True
-        m.save()
+        # Re-analysis moves the mention out of its old rollup bucket
+        previous = [_snapshot(m)] if m.processed else []
+        result = _story_results([m]).get(m.id) or analyze_text(m.text)
+        _apply_analysis(m, result)
+        with rollups.updating():
+            m.save()
+            _update_rollups([m], previous)
+        invalidate_dashboard_stats()
+        save_embeddings([(m.id, result[3])], EMBED_MODEL_NAME)
 
+        publish_mentions([m])
         # Check for negative sentiment spikes
-        if sentiment == 'negative':
-            window = timezone.now() - timezone.timedelta(minutes=10)
-            neg_count = Mention.objects.filter(created_at__gte=window, sentiment='negative').count()
-            if neg_count > 8:
-                alert = Alert.objects.create(
-                    mention=m, 
-                    alert_type='negative_spike', 
-                    description=f'{neg_count} negative mentions in last 10 minutes'
-                )
-                try:
-                    broadcast_alert(alert)
-                except Exception as alert_error:
-                    logger.warning(f"Error broadcasting alert: {alert_error}")
+        _check_negative_spikes([m])
         
-        logger.debug(f"Processed mention {mention_id}: {sentiment} ({score:.2f})")
-        return {'status': 'success', 'mention_id': mention_id, 'sentiment': sentiment}
+        logger.debug(f"Processed mention {mention_id}: {m.sentiment} ({m.sentiment_score:.2f})")
+        return {'status': 'success', 'mention_id': mention_id, 'sentiment': m.sentiment}
     except Mention.DoesNotExist:
         logger.error(f"Mention {mention_id} not found")
         return {'status': 'error', 'message': 'Mention not found'}
@@ -177,38 +336,143 @@ def process_mention(mention_id):
         logger.error(f"Error processing mention {mention_id}: {e}", exc_info=True)
         # Mark as processed to avoid infinite retries, but with error state
         try:
-            m = Mention.objects.get(id=mention_id)
-            m.processed = True
-            m.sentiment = 'error'
-            m.save()
+            _mark_failed([mention_id])
         except:
             pass
         raise
 
-def broadcast_alert(alert):
-    import logging
-    logger = logging.getLogger(__name__)
-    
+@shared_task
+def process_mentions_batch(mention_ids):
+    """Analyze a batch of mentions with one model call each and write them back in bulk"""
+    mentions = list(Mention.objects.filter(id__in=mention_ids).order_by('id'))
+    if not mentions:
+        return {'status': 'success', 'processed': 0}
+
+    # Re-analysis moves mentions out of their old rollup buckets
+    previous = [_snapshot(m) for m in mentions if m.processed]
+    try:
+        reused = _story_results(mentions)
+        todo = [m for m in mentions if m.id not in reused]
+        results = dict(zip([m.id for m in todo], analyze_texts([m.text for m in todo])))
+        results.update(reused)
+        results = [results[m.id] for m in mentions]
+        for m, result in zip(mentions, results):
+            _apply_analysis(m, result)
+        with rollups.updating():
+            Mention.objects.bulk_update(mentions, ['sentiment', 'sentiment_score', 'topic', 'processed'])
+            _update_rollups(mentions, previous)
+        invalidate_dashboard_stats()
+        save_embeddings([(m.id, result[3]) for m, result in zip(mentions, results)], EMBED_MODEL_NAME)
+    except Exception as e:
+        logger.error(f"Error processing batch of {len(mentions)} mentions: {e}", exc_info=True)
+        # Mark as processed to avoid infinite retries, but with error state
+        _mark_failed([m.id for m in mentions])
+        raise
+
+    publish_mentions(mentions)
+    alerts = _check_negative_spikes(mentions)
+
+    logger.debug(f"Processed batch of {len(mentions)} mentions ({len(alerts)} alerts)")
+    return {'status': 'success', 'processed': len(mentions), 'alerts': len(alerts)}
+
+@shared_task
+def process_pending_mentions(limit=1000):
+    """Dispatch unprocessed mentions in micro-batches, oldest first"""
+    ids = list(
+        Mention.objects.filter(processed=False).order_by('id').values_list('id', flat=True)[:limit]
+    )
+    with MentionBatcher() as batcher:
+        for mention_id in ids:
+            batcher.add(mention_id)
+    return {'status': 'success', 'dispatched': len(ids)}
+
+@shared_task
+def refit_topics(days=None):
+    """Refit the topic model on recent stored embeddings; scheduled by Celery beat"""
+    from .topics import refit
+    from django.core.cache import cache
+    lock = 'tracker:topic-refit:lock'
+    if not cache.add(lock, 1, timeout=getattr(settings, 'TOPIC_REFIT_LOCK_TIMEOUT', 3600)):
+        return {'status': 'skipped', 'reason': 'refit already running'}
+    try:
+        return {'status': 'success', **refit(days=days)}
+    finally:
+        cache.delete(lock)
+
+@shared_task
+def apply_retention():
+    """Archive mentions older than RETENTION_DAYS and freeze old archive months; scheduled by Celery beat"""
+    from .retention import apply_retention as run
+    from django.core.cache import cache
+    lock = 'tracker:retention:lock'
+    if not cache.add(lock, 1, timeout=getattr(settings, 'RETENTION_LOCK_TIMEOUT', 6 * 3600)):
+        return {'status': 'skipped', 'reason': 'retention already running'}
+    try:
+        return {'status': 'success', **run()}
+    finally:
+        cache.delete(lock)
+
+@shared_task
+def nlp_readiness():
+    """Report which models this worker process has loaded (see tracker.nlp.warmup)"""
+    from .nlp import readiness
+    return readiness()
+
+def _group_send(payload, group='mentions'):
+    """One group_send to a live group; failures are logged, never raised"""
     try:
         layer = get_channel_layer()
         if layer is None:
-            logger.warning("Channel layer not available, skipping alert broadcast")
+            logger.warning("Channel layer not available, skipping broadcast")
             return
-        
-        payload = {
-            'type': 'mention_alert',
-            'data': {
-                'id': alert.id,
-                'alert_type': alert.alert_type,
-                'description': alert.description,
-                'mention_text': alert.mention.text[:200],
-                'created_at': alert.created_at.isoformat(),
-            }
-        }
-        async_to_sync(layer.group_send)('mentions', payload)
+        async_to_sync(layer.group_send)(group, payload)
     except AttributeError as e:
         # Handle case where channel layer methods don't exist
-        logger.warning(f"Channel layer method error, skipping alert broadcast: {e}")
+        logger.warning(f"Channel layer method error, skipping broadcast: {e}")
     except Exception as e:
-        logger.warning(f"Error broadcasting alert: {e}")
-        # Don't raise - alerts can still be viewed via API even if WebSocket fails
+        logger.warning(f"Error broadcasting {payload['type']}: {e}")
+        # Don't raise - alerts and mentions can still be viewed via API even if WebSocket fails
+
+def _alert_payload(alert, mention=None):
+    mention = mention or alert.mention
+    return {
+        'id': alert.id,
+        'alert_type': alert.alert_type,
+        'description': alert.description,
+        'mention_text': mention.text[:200],
+        'created_at': alert.created_at.isoformat(),
+    }
+
+def broadcast_alerts(alerts):
+    """Send a list of (alert, mention) pairs to live clients in one message"""
+    if alerts:
+        _group_send({'type': 'mention_alerts', 'data': [_alert_payload(a, m) for a, m in alerts]})
+
+def broadcast_alert(alert):
+    broadcast_alerts([(alert, alert.mention)])
+
+def publish_mentions(mentions):
+    """Stream freshly processed mentions to subscribed clients, one message per batch"""
+    if not mentions or not getattr(settings, 'STREAM_MENTIONS', True):
+        return
+    _group_send({
+        'type': 'mention_batch',
+        'data': [
+            {
+                'id': m.id,
+                'source': m.source,
+                'sentiment': m.sentiment,
+                'sentiment_score': m.sentiment_score,
+                'topic': m.topic,
+                'cluster_id': m.cluster_id,
+                'text': m.text[:200],
+                'created_at': m.created_at.isoformat(),
+            }
+            for m in mentions
+        ],
+    })
+
+def publish_dashboard(delta):
+    """Push a dashboard_delta() to connected dashboards (see DashboardConsumer)"""
+    if delta and getattr(settings, 'DASHBOARD_PUSH', True):
+        _group_send({'type': 'dashboard_delta', 'data': delta}, group='dashboard')
@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from tracker import analysis_cache, nlp
+from tracker.analysis_cache import AnalysisCache
+
+RESULT = ('positive', 0.8, 'general', None)
+
+class AnalysisCacheTests(SimpleTestCase):
+    def test_lru_and_counters(self):
+        cache = AnalysisCache(size=2)
+        cache.set_many({'a': 1, 'b': 2})
+        self.assertEqual(cache.get_many(['a', 'x']), {'a': 1})
+        # 'b' is the least recently used entry now
+        cache.set_many({'c': 3})
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), {'a': 1, 'c': 3})
+        stats = cache.stats()['process']
+        self.assertEqual((stats['hits_local'], stats['misses'], stats['entries']), (3, 2, 2))
+        self.assertEqual(stats['hit_rate'], 0.6)
+
+    def test_shared_tier(self):
+        shared = caches['default']
+        shared.clear()
+        self.addCleanup(shared.clear)
+        AnalysisCache(size=10, shared_alias='default').set_many({'k': RESULT})
+        other = AnalysisCache(size=10, shared_alias='default')
+        self.assertEqual(other.get_many(['k']), {'k': RESULT})
+        other.get_many(['k'])
+        stats = other.stats()
+        self.assertEqual((stats['process']['hits_shared'], stats['process']['hits_local']), (1, 1))
+        self.assertEqual(stats['shared']['hits_shared'], 1)
+
+    def test_keys_follow_normalized_text_and_version(self):
+        cache = AnalysisCache()
+        self.assertEqual(cache.key('Big NEWS!', 'v1'), cache.key('big news', 'v1'))
+        self.assertNotEqual(cache.key('big news', 'v1'), cache.key('big news', 'v2'))
+
+class AnalyzeTextsCacheTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(analysis_cache, '_cache', AnalysisCache(size=100))
+        self.cache = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(nlp, '_analyze_uncached',
+                                    side_effect=lambda texts, *args: [RESULT for _ in texts])
+        self.analyze = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_hits_skip_the_models(self):
+        self.assertEqual(nlp.analyze_texts(['Recall!', 'recall', 'Launch']), [RESULT] * 3)
+        # Copies within a batch are analyzed once
+        self.assertEqual(self.analyze.call_args.args[0], ['Recall!', 'Launch'])
+        nlp.analyze_texts(['RECALL', 'Launch', 'new'])
+        self.assertEqual(self.analyze.call_args.args[0], ['new'])
+        self.assertEqual(self.cache.stats()['process']['misses'], 3)
+
+    def test_model_change_is_a_miss(self):
+        nlp.analyze_texts(['text'])
+        with mock.patch.object(nlp, 'model_version', return_value='other-model'):
+            nlp.analyze_texts(['text'])
+        self.assertEqual(self.analyze.call_count, 2)
+
+    def test_results_from_other_models_are_not_cached(self):
+        versions = iter(['v1', 'fallback', 'v1', 'v1'])
+        with mock.patch.object(nlp, 'model_version', side_effect=lambda *a: next(versions)):
+            nlp.analyze_texts(['text'])
+            nlp.analyze_texts(['text'])
+        self.assertEqual(self.analyze.call_count, 2)
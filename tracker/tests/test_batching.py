@@ -0,0 +1,62 @@
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from tracker import tasks
+from tracker.ingest import build_mention
+from tracker.models import Mention
+
+class MentionBatcherTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(tasks, 'dispatch_mentions_batch')
+        self.dispatch = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def batches(self):
+        return [c.args[0] for c in self.dispatch.call_args_list]
+
+    def test_flushes_full_batches_and_the_rest_on_exit(self):
+        with tasks.MentionBatcher(batch_size=3, timeout=60) as batcher:
+            for i in range(1, 8):
+                batcher.add(i)
+            self.assertEqual(self.batches(), [[1, 2, 3], [4, 5, 6]])
+        self.assertEqual(self.batches(), [[1, 2, 3], [4, 5, 6], [7]])
+
+    def test_partial_batch_flushes_after_timeout(self):
+        batcher = tasks.MentionBatcher(batch_size=10, timeout=0.05)
+        batcher.add(1)
+        batcher.add(2)
+        deadline = time.monotonic() + 5
+        while not self.dispatch.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.batches(), [[1, 2]])
+        batcher.flush()
+        self.assertEqual(self.dispatch.call_count, 1)
+
+@override_settings(MENTION_BATCH_SIZE=4, CLUSTER_BACKEND='off')
+class ProcessMentionsBatchTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(tasks, '_celery_available', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_one_model_call_per_batch(self):
+        now = timezone.now()
+        candidates = [build_mention(f'Great product number {i}', now, external_id=str(i)) for i in range(10)]
+        with mock.patch.object(tasks, 'analyze_texts', wraps=tasks.analyze_texts) as analyze:
+            ids = tasks.ingest_mentions(candidates)
+        self.assertEqual(len(ids), 10)
+        self.assertEqual([len(c.args[0]) for c in analyze.call_args_list], [4, 4, 2])
+        self.assertEqual(Mention.objects.filter(processed=True).count(), 10)
+        self.assertFalse(Mention.objects.exclude(sentiment__in=['positive', 'negative', 'neutral']).exists())
+
+    def test_failed_batch_is_marked(self):
+        mention = Mention.objects.create(text='text', created_at=timezone.now())
+        with mock.patch.object(tasks, 'analyze_texts', side_effect=RuntimeError('model crashed')):
+            with self.assertRaises(RuntimeError), self.assertLogs('tracker.tasks', 'ERROR'):
+                tasks.process_mentions_batch([mention.id])
+        mention.refresh_from_db()
+        self.assertTrue(mention.processed)
+        self.assertEqual(mention.sentiment, 'error')
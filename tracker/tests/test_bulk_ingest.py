@@ -0,0 +1,115 @@
+import gzip
+import io
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from tracker import bulk_ingest, tasks
+from tracker.bulk_ingest import IngestError, iter_records
+from tracker.models import Mention
+
+def records(body, compressed=False):
+    return [(n, r if not isinstance(r, ValueError) else 'invalid')
+            for n, r in iter_records(io.BytesIO(body), compressed)]
+
+class IterRecordsTests(SimpleTestCase):
+    def test_ndjson(self):
+        body = b'{"text": "a"}\n\n{"text": "b"}\r\nnot json\n{"text": "c"}'
+        self.assertEqual(records(body), [(1, {'text': 'a'}), (3, {'text': 'b'}), (4, 'invalid'), (5, {'text': 'c'})])
+
+    def test_json_array(self):
+        body = b' [ {"text": "a"}, {"text": "b, ]"} ,{"text":"c"}] '
+        self.assertEqual([r for _, r in records(body)], [{'text': 'a'}, {'text': 'b, ]'}, {'text': 'c'}])
+
+    def test_empty_bodies(self):
+        self.assertEqual(records(b''), [])
+        self.assertEqual(records(b'  \n'), [])
+        self.assertEqual(records(b'[]'), [])
+
+    def test_tiny_chunks(self):
+        # Every record and multi-byte character straddles chunk boundaries
+        ndjson = '{"text": "café ☕"}\n{"text": "naïve"}\n'.encode()
+        array = '[{"text": "café ☕"}, {"text": "naïve"}]'.encode()
+        with mock.patch.object(bulk_ingest, 'CHUNK_SIZE', 3):
+            for body in (ndjson, array):
+                self.assertEqual([r['text'] for _, r in records(body)], ['café ☕', 'naïve'])
+
+    def test_gzip(self):
+        body = gzip.compress(b'{"text": "a"}\n{"text": "b"}\n')
+        self.assertEqual(len(records(body, compressed=True)), 2)
+
+    def test_unterminated_array(self):
+        with self.assertRaisesMessage(IngestError, 'unterminated JSON array'):
+            records(b'[{"text": "a"}, {"text": "b"}')
+
+    def test_missing_comma(self):
+        with self.assertRaisesMessage(IngestError, 'expected "," or "]" after item 1'):
+            records(b'[{"text": "a"} {"text": "b"}]')
+
+    def test_oversized_line(self):
+        with mock.patch.object(bulk_ingest, 'MAX_ITEM_SIZE', 10):
+            with self.assertRaises(IngestError) as cm:
+                records(b'{"text": "a"}\n' + b'x' * 100)
+        self.assertTrue(cm.exception.too_large)
+
+@override_settings(INGEST_TOKENS=['secret'], INGEST_BATCH_SIZE=2, INGEST_MAX_RECORDS=5)
+class BulkIngestViewTests(TestCase):
+    url = '/api/ingest/'
+
+    def setUp(self):
+        # No broker here: new mentions are analyzed inline
+        patcher = mock.patch.object(tasks, '_celery_available', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, body, token='secret', **extra):
+        if token:
+            extra['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        return self.client.post(self.url, body, content_type='application/x-ndjson', **extra)
+
+    def ndjson(self, *rows):
+        return '\n'.join(json.dumps(r) for r in rows)
+
+    def test_requires_token(self):
+        self.assertEqual(self.post('{"text": "a"}', token=None).status_code, 403)
+        self.assertEqual(self.post('{"text": "a"}', token='wrong').status_code, 403)
+        self.assertFalse(Mention.objects.exists())
+
+    def test_ingest_and_duplicates(self):
+        body = self.ndjson({'text': 'One', 'external_id': '1'}, {'text': 'Two', 'external_id': '2'},
+                           {'text': ''}, {'text': 'Three', 'created_at': 'yesterday'})
+        response = self.post(body + '\n', QUERY_STRING='source=hook')
+        self.assertEqual(response.status_code, 202)
+        summary = response.json()
+        self.assertEqual((summary['received'], summary['created'], summary['invalid']), (4, 2, 2))
+        self.assertEqual([e['item'] for e in summary['errors']], [3, 4])
+        self.assertEqual(set(Mention.objects.values_list('source', flat=True)), {'hook'})
+        self.assertTrue(all(Mention.objects.values_list('processed', flat=True)))
+
+        again = self.post(body, QUERY_STRING='source=hook').json()
+        self.assertEqual((again['created'], again['duplicates']), (0, 2))
+
+    def test_external_id_decides_over_text(self):
+        body = self.ndjson({'text': 'Same', 'external_id': 'a'}, {'text': 'Same', 'external_id': 'b'},
+                           {'text': 'Same'})
+        summary = self.post(body).json()
+        self.assertEqual((summary['created'], summary['duplicates']), (2, 1))
+
+    def test_gzip_body(self):
+        body = gzip.compress(self.ndjson({'text': 'Zipped'}).encode())
+        response = self.post(body, HTTP_CONTENT_ENCODING='gzip')
+        self.assertEqual(response.json()['created'], 1)
+        corrupt = self.post(b'not gzip', HTTP_CONTENT_ENCODING='gzip')
+        self.assertEqual(corrupt.status_code, 400)
+
+    def test_bad_framing_keeps_earlier_batches(self):
+        response = self.post('[{"text": "a"}, {"text": "b"}, {"text": "c"}')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['created'], 3)
+        self.assertEqual(Mention.objects.count(), 3)
+
+    def test_too_many_records(self):
+        response = self.post(self.ndjson(*({'text': f'item {i}'} for i in range(6))))
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.json()['created'], 5)
@@ -0,0 +1,45 @@
+from django.test import SimpleTestCase
+
+from tracker.clusters import MemoryIndex, MinHasher, StoryClusterer, is_story, similarity
+from tracker.models import Mention
+
+STORY = 'Acme recalls 10,000 electric scooters across Europe after battery fires'
+REWORDED = 'Acme recalls 10000 electric scooters in Europe after battery fires'
+OTHER = 'Quarterly results: Globex beats analyst expectations on strong cloud sales'
+
+class MinHasherTests(SimpleTestCase):
+    def test_signatures_are_stable(self):
+        a, b = MinHasher(num_perm=32), MinHasher(num_perm=32)
+        self.assertEqual(a.signature(STORY), b.signature(STORY))
+        self.assertEqual(len(a.signature(STORY)), 32)
+        # Normalization: case and punctuation don't matter
+        self.assertEqual(a.signature(STORY), a.signature(STORY.upper() + '!!'))
+        self.assertIsNone(a.signature(' ... '))
+
+    def test_similarity_tracks_overlap(self):
+        hasher = MinHasher(num_perm=128)
+        near = similarity(hasher.signature(STORY), hasher.signature(REWORDED))
+        far = similarity(hasher.signature(STORY), hasher.signature(OTHER))
+        self.assertGreater(near, 0.5)
+        self.assertLess(far, 0.2)
+
+class StoryClustererTests(SimpleTestCase):
+    def setUp(self):
+        self.clusterer = StoryClusterer(MemoryIndex(ttl=3600), MinHasher(num_perm=64), bands=16, threshold=0.5)
+
+    def test_rewordings_join_the_first_story(self):
+        clusters = self.clusterer.assign_many([(1, STORY), (2, OTHER), (3, REWORDED), (4, STORY)])
+        self.assertEqual(clusters, {1: 1, 2: 2, 3: 1, 4: 1})
+
+    def test_bands_must_divide_permutations(self):
+        with self.assertRaises(ValueError):
+            StoryClusterer(MemoryIndex(ttl=60), MinHasher(num_perm=64), bands=10)
+
+    def test_expired_stories_are_forgotten(self):
+        clusterer = StoryClusterer(MemoryIndex(ttl=-1), MinHasher(num_perm=64), bands=16)
+        self.assertEqual(clusterer.assign_many([(1, STORY), (2, STORY)]), {1: 1, 2: 2})
+
+    def test_is_story(self):
+        self.assertTrue(is_story(Mention(id=5, cluster_id=None)))
+        self.assertTrue(is_story(Mention(id=5, cluster_id=5)))
+        self.assertFalse(is_story(Mention(id=6, cluster_id=5)))
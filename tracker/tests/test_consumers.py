@@ -0,0 +1,98 @@
+import json
+from unittest import mock
+
+from asgiref.testing import ApplicationCommunicator
+from channels.layers import get_channel_layer
+from django.test import SimpleTestCase, override_settings
+
+from tracker import stats
+from tracker.consumers import DashboardConsumer, TrackerConsumer, merge_delta
+
+class WebsocketClient(ApplicationCommunicator):
+    """Minimal WebSocket test client (channels.testing needs daphne, which is optional here)"""
+
+    def __init__(self, consumer, path):
+        super().__init__(consumer.as_asgi(), {'type': 'websocket', 'path': path, 'headers': [],
+                                              'subprotocols': []})
+
+    async def connect(self):
+        await self.send_input({'type': 'websocket.connect'})
+        return (await self.receive_output(1))['type'] == 'websocket.accept'
+
+    async def send_json_to(self, data):
+        await self.send_input({'type': 'websocket.receive', 'text': json.dumps(data)})
+
+    async def receive_json_from(self, timeout=1):
+        return json.loads((await self.receive_output(timeout))['text'])
+
+    async def disconnect(self):
+        await self.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await self.wait(1)
+
+def mention(pk, sentiment='negative', source='rss'):
+    return {'id': pk, 'sentiment': sentiment, 'source': source, 'topic': 'recall'}
+
+@override_settings(STREAM_FLUSH_MS=50, STREAM_MAX_PENDING=3)
+class TrackerConsumerTests(SimpleTestCase):
+    async def connect(self, subscribe=None):
+        communicator = WebsocketClient(TrackerConsumer, '/ws/mentions/')
+        self.assertTrue(await communicator.connect())
+        if subscribe is not None:
+            await communicator.send_json_to({'action': 'subscribe', **subscribe})
+            self.assertEqual((await communicator.receive_json_from())['type'], 'subscribed')
+        return communicator
+
+    async def publish(self, kind, data):
+        await get_channel_layer().group_send('mentions', {'type': kind, 'data': data})
+
+    async def test_plain_clients_get_bare_alerts_only(self):
+        communicator = await self.connect()
+        await self.publish('mention_batch', [mention(1)])
+        await self.publish('mention_alert', {'id': 7, 'alert_type': 'negative_spike'})
+        self.assertEqual(await communicator.receive_json_from(), {'id': 7, 'alert_type': 'negative_spike'})
+        self.assertTrue(await communicator.receive_nothing(0.2))
+        await communicator.disconnect()
+
+    async def test_filtered_batches_are_coalesced(self):
+        communicator = await self.connect({'filters': {'sentiment': ['negative'], 'source': ['rss', 'api']}})
+        await self.publish('mention_batch', [mention(1), mention(2, sentiment='positive')])
+        await self.publish('mention_batch', [mention(3, source='api'), mention(4, source='web')])
+        await self.publish('mention_alerts', [{'id': 9}])
+        frame = await communicator.receive_json_from()
+        self.assertEqual(frame['type'], 'batch')
+        self.assertEqual([m['id'] for m in frame['mentions']], [1, 3])
+        self.assertEqual(frame['alerts'], [{'id': 9}])
+        self.assertTrue(await communicator.receive_nothing(0.2))
+        await communicator.disconnect()
+
+    async def test_slow_clients_drop_the_oldest(self):
+        communicator = await self.connect({'alerts': False})
+        await self.publish('mention_batch', [mention(i, sentiment=s) for i, s in
+                                             enumerate(['positive', 'negative', 'neutral', 'negative', 'negative'])])
+        frame = await communicator.receive_json_from()
+        self.assertEqual([m['id'] for m in frame['mentions']], [2, 3, 4])
+        self.assertEqual(frame['dropped'], {'positive': 1, 'negative': 1})
+        await communicator.disconnect()
+
+@override_settings(DASHBOARD_FLUSH_MS=50, DASHBOARD_RESYNC=0)
+class DashboardConsumerTests(SimpleTestCase):
+    async def test_snapshot_then_merged_deltas(self):
+        snapshot = {'mentions': {'total': 5}}
+        with mock.patch.object(stats, 'get_dashboard_stats', return_value=snapshot):
+            communicator = WebsocketClient(DashboardConsumer, '/ws/dashboard/')
+            self.assertTrue(await communicator.connect())
+            self.assertEqual(await communicator.receive_json_from(), {'type': 'snapshot', 'data': snapshot})
+
+            layer = get_channel_layer()
+            for delta in ({'mentions': {'total': 1}}, {'mentions': {'total': 2}, 'sentiment': {'negative': 1}}):
+                await layer.group_send('dashboard', {'type': 'dashboard_delta', 'data': delta})
+            self.assertEqual(await communicator.receive_json_from(), {
+                'type': 'delta', 'data': {'mentions': {'total': 3}, 'sentiment': {'negative': 1}},
+            })
+            await communicator.send_json_to({'action': 'snapshot'})
+            self.assertEqual((await communicator.receive_json_from())['type'], 'snapshot')
+            await communicator.disconnect()
+
+    def test_merge_delta(self):
+        merged = merge_delta({'sentiment': {'negative': 1}}, {'sentiment': {'negative': -1, 'positive': 2}})
+        self.assertEqual(merged, {'sentiment': {'negative': 0, 'positive': 2}})
@@ -0,0 +1,41 @@
+from unittest import skipUnless
+
+from django.test import TestCase
+from django.utils import timezone
+
+from tracker.embeddings import _numpy_available, load_matrix, save_embeddings
+from tracker.models import Mention, MentionEmbedding
+
+if _numpy_available:
+    import numpy as np
+
+    from tracker.embeddings import from_bytes, to_bytes
+
+@skipUnless(_numpy_available, 'numpy is not installed')
+class EmbeddingStorageTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.ids = [Mention.objects.create(text=f'mention {i}', created_at=now).id for i in range(3)]
+
+    def test_bytes_round_trip(self):
+        vector = np.array([1.5, -2, 0.25], dtype=np.float64)
+        data = to_bytes(vector)
+        self.assertEqual(len(data), 12)
+        self.assertEqual(from_bytes(data).dtype, np.dtype('<f4'))
+        self.assertEqual(list(from_bytes(data)), [1.5, -2, 0.25])
+
+    def test_save_upserts_and_skips_empty(self):
+        self.assertEqual(save_embeddings([(self.ids[0], to_bytes([1, 2])), (self.ids[1], None)], 'model-a'), 1)
+        save_embeddings([(self.ids[0], to_bytes([3, 4, 5]))], 'model-b')
+        row = MentionEmbedding.objects.get()
+        self.assertEqual((row.mention_id, row.model_name, row.dim), (self.ids[0], 'model-b', 3))
+        self.assertEqual(list(from_bytes(row.vector)), [3, 4, 5])
+
+    def test_load_matrix(self):
+        save_embeddings([(self.ids[2], to_bytes([5, 6])), (self.ids[0], to_bytes([1, 2]))], 'model')
+        ids, matrix = load_matrix(Mention.objects.all(), model_name='model', chunk_size=1)
+        self.assertEqual(ids, [self.ids[0], self.ids[2]])
+        self.assertEqual(matrix.tolist(), [[1, 2], [5, 6]])
+
+        ids, matrix = load_matrix(Mention.objects.filter(id=self.ids[1]), model_name='model')
+        self.assertEqual((ids, matrix.shape), ([], (0, 0)))
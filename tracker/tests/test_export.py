@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tracker import export
+from tracker.models import Alert, Mention
+
+@override_settings(INGEST_TOKENS=['secret'])
+class ExportViewTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.old = Mention.objects.create(text='old, "quoted"', created_at=now - timedelta(days=10),
+                                          source='rss', sentiment='negative', processed=True)
+        self.new = Mention.objects.create(text='new', created_at=now, source='api', sentiment='positive',
+                                          processed=True)
+        Alert.objects.create(mention=self.old, alert_type='negative_spike', description='spike')
+        self.auth = {'HTTP_AUTHORIZATION': 'Bearer secret'}
+
+    def get(self, kind='mentions', **params):
+        response = self.client.get(f'/api/export/{kind}/', params, **self.auth)
+        return response, b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_requires_staff_or_token(self):
+        self.assertEqual(self.client.get('/api/export/mentions/').status_code, 403)
+        self.assertEqual(self.client.get('/api/export/mentions/', HTTP_AUTHORIZATION='Bearer nope').status_code, 403)
+        self.client.force_login(User.objects.create_user('viewer'))
+        self.assertEqual(self.client.get('/api/export/mentions/').status_code, 403)
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+        self.assertEqual(self.client.get('/api/export/mentions/').status_code, 200)
+
+    def test_ndjson(self):
+        response, body = self.get(fields='id,text,source')
+        self.assertEqual(response['Content-Type'], export.FORMATS['ndjson'])
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(rows, [{'id': self.old.id, 'text': 'old, "quoted"', 'source': 'rss'},
+                                {'id': self.new.id, 'text': 'new', 'source': 'api'}])
+
+    def test_csv_with_filters(self):
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        _, body = self.get(format='csv', fields='id,sentiment', since=since)
+        self.assertEqual(list(csv.reader(io.StringIO(body.decode()))),
+                         [['id', 'sentiment'], [str(self.new.id), 'positive']])
+        _, body = self.get(format='csv', fields='id,text', source='rss')
+        self.assertEqual(list(csv.reader(io.StringIO(body.decode())))[1], [str(self.old.id), 'old, "quoted"'])
+
+    def test_alerts(self):
+        _, body = self.get('alerts', fields='mention_id,resolved', resolved='false')
+        self.assertEqual(json.loads(body), {'mention_id': self.old.id, 'resolved': False})
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.get('users')[0].status_code, 400)
+        self.assertEqual(self.get(fields='id,password')[0].status_code, 400)
+        self.assertEqual(self.get(format='xml')[0].status_code, 400)
+        self.assertEqual(self.get(since='yesterday')[0].status_code, 400)
+        self.assertEqual(self.get(processed='maybe')[0].status_code, 400)
+
+    @skipUnless(export._pyarrow_available, 'pyarrow is not installed')
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+        _, body = self.get(format='parquet', fields='id,created_at,processed')
+        table = pq.read_table(io.BytesIO(body))
+        self.assertEqual(table.column('id').to_pylist(), [self.old.id, self.new.id])
+        self.assertEqual(table.column('processed').to_pylist(), [True, True])
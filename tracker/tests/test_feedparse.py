@@ -0,0 +1,75 @@
+from django.test import SimpleTestCase
+
+from tracker.feedparse import FeedStreamParser, iter_feed_items, parse_feed_date
+
+RSS = b'''<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0"><channel><title>Feed</title>
+<item><guid>g3</guid><title>Third</title><description>Newest &amp; best</description>
+<pubDate>Sat, 17 Oct 2026 10:00:00 +0000</pubDate></item>
+<item><guid>g2</guid><title>Second</title><link>https://example.com/2</link></item>
+<item><guid>g1</guid><title>First</title></item>
+</channel></rss>'''
+
+ATOM = b'''<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+<entry><id>urn:1</id><title>Atom entry</title><summary>Body</summary>
+<link rel="self" href="https://example.com/self"/><link href="https://example.com/1"/>
+<updated>2026-10-17T08:30:00Z</updated></entry>
+</feed>'''
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+class FeedStreamParserTests(SimpleTestCase):
+    def parse(self, data, size=7, **kwargs):
+        parser = FeedStreamParser(**kwargs)
+        items = []
+        for chunk in chunked(data, size):
+            items.extend(parser.feed(chunk))
+        return items + parser.close()
+
+    def test_items_split_across_chunks(self):
+        items = self.parse(RSS)
+        self.assertEqual([i.guid for i in items], ['g3', 'g2', 'g1'])
+        self.assertEqual(items[0].description, 'Newest & best')
+        self.assertEqual(items[0].published.isoformat(), '2026-10-17T10:00:00+00:00')
+        self.assertEqual(items[1].link, 'https://example.com/2')
+
+    def test_stops_at_known_item(self):
+        items = self.parse(RSS, stop_at='g2')
+        self.assertEqual([i.guid for i in items], ['g3'])
+
+    def test_limit(self):
+        parser = FeedStreamParser(limit=2)
+        items = parser.feed(RSS)
+        self.assertTrue(parser.done)
+        self.assertEqual(len(items), 2)
+        self.assertEqual(parser.feed(b'<item><guid>more</guid></item>'), [])
+
+    def test_atom(self):
+        (item,) = self.parse(ATOM)
+        self.assertEqual(item.guid, 'urn:1')
+        self.assertEqual(item.link, 'https://example.com/1')
+        self.assertEqual(item.description, 'Body')
+        self.assertEqual(item.published.isoformat(), '2026-10-17T08:30:00+00:00')
+
+    def test_stops_reading_chunks(self):
+        pulled = []
+
+        def chunks():
+            for chunk in chunked(RSS, 16):
+                pulled.append(chunk)
+                yield chunk
+
+        items = list(iter_feed_items(chunks(), stop_at='g2'))
+        self.assertEqual([i.guid for i in items], ['g3'])
+        self.assertLess(sum(map(len, pulled)), len(RSS))
+
+    def test_malformed_tail_keeps_items(self):
+        items = self.parse(RSS[:RSS.index(b'<item><guid>g1')] + b'<item><guid>broken')
+        self.assertEqual([i.guid for i in items][:2], ['g3', 'g2'])
+
+    def test_parse_feed_date(self):
+        self.assertEqual(parse_feed_date('2026-10-17T08:30:00').isoformat(), '2026-10-17T08:30:00+00:00')
+        self.assertIsNone(parse_feed_date('not a date'))
+        self.assertIsNone(parse_feed_date(''))
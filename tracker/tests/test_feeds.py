@@ -0,0 +1,43 @@
+import time
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from tracker import feeds, tasks
+from tracker.models import Feed, Mention
+
+# Items without guid or link: the parser can't stop early on these
+BODY = (b'<?xml version="1.0"?><rss><channel>'
+        b'<item><title>First story</title></item><item><title>Second story</title></item>'
+        b'</channel></rss>')
+
+@override_settings(CLUSTER_BACKEND='off')
+class HandleFeedResponseTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(tasks, '_celery_available', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.feed = Feed.objects.create(url='http://example.com/feed')
+
+    def handle(self, status=200, body=BODY, headers=None):
+        chunks = [body[i:i + 16] for i in range(0, len(body), 16)]
+        return tasks.handle_feed_response(self.feed, status, headers or {}, chunks, time.monotonic())
+
+    def test_validators_are_sent_back(self):
+        self.handle(headers={'ETag': '"abc"', 'Last-Modified': 'Sat, 17 Oct 2026 10:00:00 GMT'})
+        self.feed.refresh_from_db()
+        headers = feeds.request_headers(self.feed)
+        self.assertEqual(headers['If-None-Match'], '"abc"')
+        self.assertEqual(headers['If-Modified-Since'], 'Sat, 17 Oct 2026 10:00:00 GMT')
+
+    def test_not_modified(self):
+        self.assertEqual(self.handle(status=304)['status'], 'not_modified')
+        self.feed.refresh_from_db()
+        self.assertEqual((self.feed.not_modified_count, self.feed.fetch_count), (1, 1))
+
+    def test_identical_body_is_skipped(self):
+        self.assertEqual(self.handle(), {'status': 'success', 'created': 2})
+        self.feed.refresh_from_db()
+        self.assertEqual(len(self.feed.content_hash), 64)
+        self.assertEqual(self.handle(), {'status': 'unchanged', 'created': 0})
+        self.assertEqual(Mention.objects.count(), 2)
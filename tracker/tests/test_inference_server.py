@@ -0,0 +1,66 @@
+import asyncio
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from tracker import inference_server
+from tracker.inference_server import _HEADER, InferenceClient, InferenceServer
+
+def fake_analyze(texts, use_topic):
+    return [('positive', 0.9, 'general' if use_topic else None, None) for _ in texts]
+
+class InferenceServerTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'nlp.sock')
+
+    def run_with_server(self, client, **kwargs):
+        async def main():
+            server = InferenceServer(self.path, max_wait_ms=1, **kwargs)
+            task = asyncio.create_task(server.serve_forever())
+            while not os.path.exists(self.path):
+                await asyncio.sleep(0.01)
+            try:
+                return await client()
+            finally:
+                task.cancel()
+        with mock.patch.object(inference_server, '_analyze', fake_analyze):
+            return asyncio.run(main())
+
+    def test_requests_and_ping(self):
+        def requests():
+            remote = InferenceClient(self.path, timeout=5)
+            try:
+                return remote.analyze(['a', 'b'], use_topic=False), remote.ping()
+            finally:
+                remote.close()
+
+        async def client():
+            # The blocking client runs in a thread next to the server's loop
+            return await asyncio.get_running_loop().run_in_executor(None, requests)
+        results, stats = self.run_with_server(client)
+        self.assertEqual(results, [('positive', 0.9, None, None)] * 2)
+        self.assertEqual(stats['texts'], 2)
+
+    def test_truncated_body_closes_connection(self):
+        async def client():
+            reader, writer = await asyncio.open_unix_connection(self.path)
+            payload = json.dumps({'texts': ['a']}).encode()
+            writer.write(_HEADER.pack(len(payload) + 10) + payload)
+            writer.write_eof()
+            data = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return data
+        with self.assertNoLogs('asyncio', 'ERROR'):
+            self.assertEqual(self.run_with_server(client), b'')
+
+    def test_refuses_remote_tcp_binds(self):
+        self.assertTrue(inference_server.is_loopback('127.0.0.1'))
+        self.assertTrue(inference_server.is_loopback('localhost'))
+        self.assertFalse(inference_server.is_loopback('0.0.0.0'))
+        with self.assertRaises(ValueError):
+            asyncio.run(InferenceServer('0.0.0.0:0').serve_forever())
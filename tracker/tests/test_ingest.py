@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tracker.ingest import build_mention, insert_mentions, insert_new_mentions
+from tracker.models import Mention
+
+@override_settings(INGEST_DEDUP_HOURS=24, CLUSTER_BACKEND='off')
+class InsertNewMentionsTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+
+    def mention(self, text, source='rss', external_id=None, hours=0):
+        return build_mention(text, self.now + timedelta(hours=hours), source=source, external_id=external_id)
+
+    def test_returns_ids_of_inserted_rows(self):
+        ids = insert_new_mentions([self.mention('One', external_id='1'), self.mention('Two', external_id='2')])
+        self.assertEqual(ids, list(Mention.objects.order_by('id').values_list('id', flat=True)))
+        self.assertEqual(insert_new_mentions([]), [])
+
+    def test_external_id_per_source(self):
+        insert_new_mentions([self.mention('One', external_id='1')])
+        ids = insert_new_mentions([self.mention('Changed text', external_id='1'),
+                                   self.mention('Other feed', source='api', external_id='1')])
+        self.assertEqual(list(Mention.objects.filter(id__in=ids).values_list('source', flat=True)), ['api'])
+
+    def test_text_within_window_and_source(self):
+        insert_new_mentions([self.mention('Breaking: Product recall!', external_id='a')])
+        ids = insert_new_mentions([
+            # Same normalized text, same source, an hour later
+            self.mention('breaking product RECALL', external_id='b', hours=1),
+            # Same text from another source
+            self.mention('Breaking: Product recall!', source='api', external_id='c'),
+            # Same text two days later
+            self.mention('Breaking: Product recall!', external_id='d', hours=48),
+        ])
+        self.assertEqual(sorted(Mention.objects.filter(id__in=ids).values_list('external_id', flat=True)), ['c', 'd'])
+
+    def test_duplicates_within_batch(self):
+        ids = insert_new_mentions([self.mention('Same'), self.mention('same!'), self.mention('Same', hours=30),
+                                   self.mention('x', external_id='1'), self.mention('y', external_id='1')])
+        self.assertEqual(len(ids), 3)
+
+    def test_ids_only(self):
+        insert_new_mentions([self.mention('Same', external_id='1')])
+        ids = insert_new_mentions([self.mention('Same', external_id='2'), self.mention('Same')], ids_only=True)
+        self.assertEqual(list(Mention.objects.filter(id__in=ids).values_list('external_id', flat=True)), ['2'])
+
+    def test_old_unprocessed_copy_is_not_returned(self):
+        # An unprocessed row with the same text outside the window is a different mention
+        old = insert_new_mentions([self.mention('Repeat', external_id='old', hours=-72)])
+        new = insert_new_mentions([self.mention('Repeat', external_id='new')])
+        self.assertEqual(len(new), 1)
+        self.assertNotIn(old[0], new)
+
+    def test_insert_skips_conflicts(self):
+        insert_mentions([self.mention('One', external_id='1')])
+        rows = insert_mentions([self.mention('Again', external_id='1'), self.mention('Two', external_id='2')])
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(Mention.objects.get(pk=rows[0][0]).text, 'Two')
+        self.assertIsNotNone(Mention.objects.get(pk=rows[0][0]).fetched_at)
@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from tracker import retention
+from tracker.models import Mention, MentionArchive
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        retention._archived_until = (0.0, None)
+        self.addCleanup(setattr, retention, '_archived_until', (0.0, None))
+        self.now = timezone.now().replace(microsecond=0)
+        # The router is mounted under api/ of tracker.urls, itself included at api/
+        self.url = '/api/api/mentions/'
+
+    def make(self, model, ids, hours):
+        for pk, h in zip(ids, hours):
+            model.objects.create(id=pk, text=f'mention {pk}', created_at=self.now - timedelta(hours=h),
+                                 fetched_at=self.now, processed=True, external_id=str(pk))
+
+    def walk(self, **params):
+        pages = []
+        url = self.url
+        params = dict(params)
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            pages.append([m['id'] for m in data['results']])
+            url, params = data['next'], {}
+        return pages
+
+    def test_pages_follow_created_at_then_id(self):
+        # Ties on created_at are broken by id
+        self.make(Mention, range(1, 8), [0, 1, 1, 1, 2, 3, 3])
+        pages = self.walk(page_size=3)
+        self.assertEqual(pages, [[1, 4, 3], [2, 5, 7], [6]])
+
+    def test_archive_is_merged(self):
+        self.make(Mention, [10, 11, 12], [0, 1, 50])
+        # Archived rows are older than the hot ones, apart from those an alert kept hot
+        self.make(MentionArchive, [1, 2, 3, 4], [24, 30, 60, 70])
+        pages = self.walk(page_size=2)
+        self.assertEqual(pages, [[10, 11], [1, 2], [12, 3], [4]])
+
+    def test_archive_respects_time_range(self):
+        self.make(Mention, [10], [0])
+        self.make(MentionArchive, [1, 2], [24, 72])
+        since = (self.now - timedelta(hours=48)).isoformat()
+        self.assertEqual(self.walk(since=since), [[10, 1]])
+
+    def test_archived_detail(self):
+        self.make(MentionArchive, [5], [24])
+        self.assertEqual(self.client.get(f'{self.url}5/').json()['id'], 5)
+        self.assertEqual(self.client.get(f'{self.url}6/').status_code, 404)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'garbage'}).status_code, 404)
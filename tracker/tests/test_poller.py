@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipUnless
+
+from django.test import TransactionTestCase, override_settings
+
+from tracker import poller, tasks
+from tracker.models import Feed, Mention
+
+def rss(guids):
+    items = ''.join(f'<item><guid>{g}</guid><title>Story {g}</title>'
+                    f'<description>{"Details " * 200}{g}</description></item>' for g in guids)
+    return f'<?xml version="1.0"?><rss><channel>{items}</channel></rss>'.encode()
+
+class FeedServer(ThreadingHTTPServer):
+    """Local stand-in for feed hosts: serves self.body in small, slow chunks"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FeedHandler)
+        self.body = b''
+        self.sent = 0
+        self.requests = []
+
+    def url(self, path='/feed'):
+        return f'http://127.0.0.1:{self.server_port}{path}'
+
+class FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, dict(self.headers)))
+        if self.path == '/missing':
+            self.send_error(404)
+            return
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Length', str(len(server.body)))
+        self.send_header('ETag', '"v1"')
+        self.end_headers()
+        try:
+            for i in range(0, len(server.body), 4096):
+                self.wfile.write(server.body[i:i + 4096])
+                self.wfile.flush()
+                server.sent += 4096
+                time.sleep(0.002)
+        except OSError:
+            # The poller hung up after the items it needed
+            pass
+
+    def log_message(self, *args):
+        pass
+
+@skipUnless(poller.poller_available(), 'aiohttp is not installed')
+@override_settings(FEED_MAX_ITEMS=30, CLUSTER_BACKEND='off')
+class PollerTests(TransactionTestCase):
+    def setUp(self):
+        self.server = FeedServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        patcher = mock.patch.object(tasks, '_celery_available', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def poll(self, *feeds):
+        return asyncio.run(poller.poll_feeds_async(list(feeds)))
+
+    def test_new_items_and_conditional_requests(self):
+        self.server.body = rss(['g3', 'g2', 'g1'])
+        feed = Feed.objects.create(url=self.server.url())
+        (result,) = self.poll(feed)
+        self.assertEqual((result['status'], result['created']), ('success', 3))
+        feed.refresh_from_db()
+        self.assertEqual((feed.last_item_id, feed.etag), ('g3', '"v1"'))
+        self.assertEqual(Mention.objects.filter(processed=True).count(), 3)
+
+        (result,) = self.poll(feed)
+        self.assertEqual(result['status'], 'not_modified')
+        self.assertEqual(self.server.requests[-1][1].get('If-None-Match'), '"v1"')
+
+    def test_stops_reading_at_known_items(self):
+        self.server.body = rss([f'g{i}' for i in range(1000, 0, -1)])
+        feed = Feed.objects.create(url=self.server.url(), last_item_id='g998')
+        (result,) = self.poll(feed)
+        self.assertEqual(result['created'], 2)
+        # Only the start of the body was downloaded
+        self.assertLess(self.server.sent, len(self.server.body) / 2)
+
+    def test_errors_are_recorded(self):
+        feeds = [Feed.objects.create(url=self.server.url('/missing')),
+                 Feed.objects.create(url='http://127.0.0.1:9/unreachable')]
+        results = self.poll(*feeds)
+        self.assertEqual([r['status'] for r in results], ['error', 'error'])
+        for feed in feeds:
+            feed.refresh_from_db()
+            self.assertEqual(feed.consecutive_errors, 1)
+            self.assertIsNotNone(feed.next_poll_at)
+        self.assertEqual(feeds[0].last_status, 404)
@@ -0,0 +1,110 @@
+import gzip
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tracker import retention, rollups
+from tracker.models import Alert, Mention, MentionArchive, MentionRollup
+
+def rollup_rows():
+    return sorted(MentionRollup.objects.values_list('hour', 'source', 'sentiment', 'topic', 'count'))
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(RETENTION_ARCHIVE_DIR=directory.name, RETENTION_ARCHIVE_FORMAT='ndjson')
+        settings.enable()
+        self.addCleanup(settings.disable)
+        retention._archived_until = (0.0, None)
+        self.addCleanup(setattr, retention, '_archived_until', (0.0, None))
+        self.dir = directory.name
+        self.now = timezone.now()
+
+    def make(self, days, processed=True, n=1):
+        created = []
+        for _ in range(n):
+            created.append(Mention.objects.create(
+                text=f'mention {Mention.objects.count()}', created_at=self.now - timedelta(days=days),
+                processed=processed, sentiment='positive' if processed else None, topic='general',
+            ))
+        return created
+
+    def frozen(self):
+        rows = []
+        for name in sorted(os.listdir(self.dir)):
+            with gzip.open(os.path.join(self.dir, name), 'rt') as f:
+                rows.append((name, [json.loads(line)['id'] for line in f]))
+        return rows
+
+    def test_archive_moves_old_processed_mentions(self):
+        old = self.make(40, n=3)
+        pending = self.make(40, processed=False)
+        alerted = self.make(40)
+        recent = self.make(1)
+        Alert.objects.create(mention=alerted[0], alert_type='negative_spike', description='spike')
+        rollups.rebuild()
+        before = rollup_rows()
+
+        self.assertEqual(retention.archive_mentions(days=30, batch_size=2), 3)
+        self.assertEqual(sorted(MentionArchive.objects.values_list('id', flat=True)), [m.id for m in old])
+        self.assertEqual(set(Mention.objects.values_list('id', flat=True)),
+                         {pending[0].id, alerted[0].id, recent[0].id})
+        # Counts still include archived mentions, also after a rebuild
+        self.assertEqual(rollup_rows(), before)
+        rollups.rebuild()
+        self.assertEqual(rollup_rows(), before)
+        self.assertIsNotNone(retention.hot_since())
+
+    def test_archive_limit_and_disabled(self):
+        self.make(40, n=3)
+        self.assertEqual(retention.archive_mentions(days=0), 0)
+        self.assertEqual(retention.archive_mentions(days=30, limit=2), 2)
+        self.assertEqual(retention.archive_mentions(days=30), 1)
+
+    def test_freeze_writes_months_and_never_overwrites(self):
+        first = self.make(200, n=2)
+        retention.archive_mentions(days=30)
+        written = retention.freeze_archive(days=90)
+        self.assertEqual(len(written), 1)
+        self.assertFalse(MentionArchive.objects.exists())
+        self.assertEqual(self.frozen()[0][1], [m.id for m in first])
+
+        # A late arrival in the same month gets a part file of its own
+        late = Mention.objects.create(text='late', created_at=first[0].created_at, processed=True)
+        retention.archive_mentions(days=30)
+        retention.freeze_archive(days=90)
+        files = self.frozen()
+        self.assertEqual([ids for _, ids in files], [[m.id for m in first], [late.id]])
+        self.assertIn('.part2.', files[1][0])
+
+    def test_rows_archived_while_freezing_are_kept(self):
+        first = self.make(200, n=2)
+        retention.archive_mentions(days=30)
+        late = self.make(200)[0]
+        write_file = retention._write_file
+
+        def write_then_archive(path, qs, fmt):
+            write_file(path, qs, fmt)
+            # archive_mentions() commits into the month between the write and the drop
+            retention.archive_mentions(days=30)
+
+        with mock.patch.object(retention, '_write_file', write_then_archive):
+            self.assertEqual(retention.freeze_archive(days=90), [])
+        self.assertEqual(self.frozen(), [])
+        self.assertEqual(MentionArchive.objects.count(), 3)
+
+        retention.freeze_archive(days=90)
+        self.assertEqual(self.frozen()[0][1], [m.id for m in first] + [late.id])
+
+    def test_apply_retention(self):
+        self.make(200)
+        with override_settings(RETENTION_DAYS=30, RETENTION_COLD_DAYS=90):
+            result = retention.apply_retention()
+        self.assertEqual(result['archived'], 1)
+        self.assertEqual(len(result['frozen']), 1)
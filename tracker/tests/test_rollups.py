@@ -0,0 +1,77 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tracker import retention, rollups, tasks
+from tracker.models import Mention, MentionRollup
+
+def rows():
+    return sorted(MentionRollup.objects.exclude(count=0, story_count=0)
+                  .values_list('hour', 'source', 'sentiment', 'topic', 'count', 'story_count'))
+
+@override_settings(CLUSTER_BACKEND='off')
+class RollupTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(tasks, '_celery_available', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        retention._archived_until = (0.0, None)
+        self.addCleanup(setattr, retention, '_archived_until', (0.0, None))
+        self.now = timezone.now()
+
+    def mention(self, text, hours=0, source='rss'):
+        return Mention.objects.create(text=text, source=source, created_at=self.now - timedelta(hours=hours))
+
+    def analyze(self, *results):
+        return mock.patch.object(tasks, 'analyze_texts', return_value=[(*r, None) for r in results])
+
+    def test_update_and_read_helpers(self):
+        hour = rollups.floor_hour(self.now)
+        key = (hour, 'rss', 'negative', 'recall')
+        rollups.update(added=[key, key, (hour, 'api', 'positive', '')], removed=[key], added_stories=[key])
+        self.assertEqual(rows(), [(hour, 'api', 'positive', '', 1, 0), (hour, 'rss', 'negative', 'recall', 1, 1)])
+        self.assertEqual(rollups.total(), 2)
+        self.assertEqual(rollups.total(measure='story_count'), 1)
+        self.assertEqual(rollups.counts_by('topic'), [{'topic': 'recall', 'count': 1}])
+        series = rollups.hourly(hours=3, now=self.now)
+        self.assertEqual([h['count'] for h in series], [0, 0, 2])
+
+    def test_processing_matches_rebuild(self):
+        mentions = [self.mention('a'), self.mention('b', hours=5), self.mention('c', hours=5, source='api')]
+        with self.analyze(('positive', 0.9, 'launch'), ('negative', -0.8, 'recall'), ('negative', -0.5, 'recall')):
+            tasks.process_mentions_batch([m.id for m in mentions])
+        incremental = rows()
+        self.assertEqual(sum(r[4] for r in incremental), 3)
+        rollups.rebuild()
+        self.assertEqual(rows(), incremental)
+
+    def test_reanalysis_moves_buckets(self):
+        mention = self.mention('a')
+        with self.analyze(('positive', 0.9, 'launch')):
+            tasks.process_mentions_batch([mention.id])
+        with self.analyze(('negative', -0.9, 'recall')):
+            tasks.process_mentions_batch([mention.id])
+        hour = rollups.floor_hour(self.now)
+        self.assertEqual(rows(), [(hour, 'rss', 'negative', 'recall', 1, 1)])
+        rollups.rebuild()
+        self.assertEqual(rows(), [(hour, 'rss', 'negative', 'recall', 1, 1)])
+
+    def test_failed_analysis_is_counted(self):
+        mention = self.mention('a')
+        with mock.patch.object(tasks, 'analyze_texts', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError), self.assertLogs('tracker.tasks', 'ERROR'):
+                tasks.process_mentions_batch([mention.id])
+        incremental = rows()
+        self.assertEqual([r[2] for r in incremental], ['error'])
+        rollups.rebuild()
+        self.assertEqual(rows(), incremental)
+
+    def test_rebuild_since(self):
+        old, new = self.mention('old', hours=48), self.mention('new')
+        with self.analyze(('neutral', 0.0, 'general'), ('neutral', 0.0, 'general')):
+            tasks.process_mentions_batch([old.id, new.id])
+        MentionRollup.objects.all().update(count=99)
+        rollups.rebuild(since=self.now - timedelta(hours=1))
+        self.assertEqual(sorted(r[4] for r in rows()), [1, 99])
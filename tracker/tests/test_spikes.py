@@ -0,0 +1,70 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from tracker.models import Mention
+from tracker.spikes import CacheCounter, MemoryCounter, SpikeDetector
+
+def negative(minutes_ago=0, source='rss', topic=None):
+    created = datetime.fromtimestamp(time.time() - minutes_ago * 60, tz=dt_timezone.utc)
+    return Mention(id=None, source=source, topic=topic, sentiment='negative', created_at=created)
+
+class MemoryCounterTests(SimpleTestCase):
+    def test_ring_buffer_window(self):
+        counter = MemoryCounter(window=5)
+        counter.add('all', 100, 2)
+        counter.add('all', 102)
+        counter.add('all', 104)
+        self.assertEqual(counter.total('all', 104), 4)
+        # Minute 100 falls out of the window at 105; its bucket is reused for 105
+        counter.add('all', 105)
+        self.assertEqual(counter.total('all', 105), 3)
+        self.assertEqual(counter.total('all', 110), 0)
+        self.assertEqual(counter.total('missing', 105), 0)
+
+    def test_cooldown(self):
+        counter = MemoryCounter(window=5)
+        self.assertTrue(counter.acquire('all', 60))
+        self.assertFalse(counter.acquire('all', 60))
+        self.assertTrue(counter.acquire('source:rss', 60))
+        self.assertTrue(counter.acquire('topic:x', -1))
+        self.assertTrue(counter.acquire('topic:x', 60))
+
+    def test_shared_cooldown(self):
+        cache = caches['default']
+        cache.delete('spike-cooldown:shared')
+        self.addCleanup(cache.delete, 'spike-cooldown:shared')
+        workers = [MemoryCounter(window=5, cooldown_cache=cache) for _ in range(2)]
+        self.assertTrue(workers[0].acquire('shared', 60))
+        self.assertFalse(workers[1].acquire('shared', 60))
+
+class SpikeDetectorTests(SimpleTestCase):
+    def detector(self, counter=None, **thresholds):
+        return SpikeDetector(counter or MemoryCounter(window=10), thresholds or {'all': 3},
+                             window=10, cooldown=30)
+
+    def test_one_alert_per_episode(self):
+        detector = self.detector()
+        self.assertEqual(detector.record([negative() for _ in range(3)]), [])
+        (spike,) = detector.record([negative()])
+        self.assertEqual((spike.scope, spike.count, spike.threshold), ('all', 4, 3))
+        self.assertEqual(detector.record([negative() for _ in range(5)]), [])
+
+    def test_old_mentions_are_ignored(self):
+        detector = self.detector()
+        self.assertEqual(detector.record([negative(minutes_ago=30) for _ in range(10)]), [])
+
+    def test_wildcard_scopes(self):
+        detector = self.detector(**{'source:*': 1})
+        spikes = detector.record([negative(source='a'), negative(source='a'), negative(source='b')])
+        self.assertEqual([s.scope for s in spikes], ['source:a'])
+
+    def test_cache_counter(self):
+        cache = caches['default']
+        cache.clear()
+        self.addCleanup(cache.clear)
+        detector = self.detector(counter=CacheCounter(window=10))
+        self.assertEqual(detector.record([negative() for _ in range(3)]), [])
+        self.assertEqual(len(detector.record([negative()])), 1)
@@ -0,0 +1,91 @@
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tracker import stats
+
+@override_settings(STATS_CACHE_TTL=60, STATS_MIN_REFRESH=60)
+class DashboardStatsCacheTests(TestCase):
+    def setUp(self):
+        self.cache = stats._cache()
+        self.cache.clear()
+        self.addCleanup(self.cache.clear)
+
+    def compute(self, value=None):
+        return mock.patch.object(stats, 'compute_dashboard_stats', side_effect=lambda: value or {'n': 1})
+
+    def test_cached_until_invalidated(self):
+        with self.compute() as compute:
+            stats.get_dashboard_stats()
+            stats.get_dashboard_stats()
+            self.assertEqual(compute.call_count, 1)
+            stats.invalidate_dashboard_stats()
+            stats.get_dashboard_stats()
+            self.assertEqual(compute.call_count, 2)
+            # Coalesced: a second invalidation within STATS_MIN_REFRESH is ignored
+            stats.invalidate_dashboard_stats()
+            stats.get_dashboard_stats()
+            self.assertEqual(compute.call_count, 2)
+
+    def test_stale_value_served_while_locked(self):
+        self.cache.set(stats.STALE_KEY, {'n': 'stale'})
+        self.cache.add(stats.LOCK_KEY, 1)
+        with self.compute() as compute:
+            self.assertEqual(stats.get_dashboard_stats(), {'n': 'stale'})
+        compute.assert_not_called()
+
+    def test_cold_cache_waiters_wait_for_the_lock_holder(self):
+        self.cache.add(stats.LOCK_KEY, 1)
+        results = []
+        with self.compute() as compute:
+            waiters = [threading.Thread(target=lambda: results.append(stats.get_dashboard_stats()))
+                       for _ in range(3)]
+            for waiter in waiters:
+                waiter.start()
+            # Longer than a waiter used to wait before computing itself
+            time.sleep(1.5)
+            stats._store(self.cache, {'n': 'fresh'})
+            for waiter in waiters:
+                waiter.join(5)
+        self.assertEqual(results, [{'n': 'fresh'}] * 3)
+        compute.assert_not_called()
+
+    def test_waiter_takes_over_an_abandoned_lock(self):
+        self.cache.add(stats.LOCK_KEY, 1)
+        threading.Timer(0.1, self.cache.delete, [stats.LOCK_KEY]).start()
+        with self.compute() as compute:
+            self.assertEqual(stats.get_dashboard_stats(), {'n': 1})
+        self.assertEqual(compute.call_count, 1)
+
+class DashboardDeltaTests(TestCase):
+    def test_bucket_moves(self):
+        now = timezone.now()
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        old = hour - timedelta(days=3)
+        delta = stats.dashboard_delta(
+            added=[(hour, 'rss', 'negative', 'recall'), (old, 'api', 'negative', None)],
+            # Re-analysis of a mention from neutral to negative
+            removed=[(hour, 'rss', 'neutral', 'recall')],
+            pending=-1, alerts=1, now=now,
+        )
+        self.assertEqual(delta, {
+            'mentions': {'last_7d': 1},
+            'sentiment': {'negative': 2, 'neutral': -1},
+            'sources': {'api': 1},
+            'alerts': {'total': 1, 'unresolved': 1, 'recent_24h': 1},
+        })
+
+    def test_new_mention(self):
+        now = timezone.now()
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        delta = stats.dashboard_delta(added=[(hour, 'rss', 'positive', 'launch')],
+                                      added_stories=[(hour, 'rss', 'positive', 'launch')], now=now)
+        self.assertEqual(delta['mentions'], {'total': 1, 'last_24h': 1, 'last_7d': 1})
+        self.assertEqual(delta['stories'], {'total': 1, 'last_24h': 1, 'last_7d': 1})
+        self.assertEqual(delta['topics'], {'launch': 1})
+        self.assertEqual(delta['hourly'], {hour.isoformat(): 1})
+        self.assertEqual(stats.dashboard_delta(), {})
@@ -0,0 +1,84 @@
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from django.test import TestCase
+from django.utils import timezone
+
+from tracker import nlp, vector_index
+from tracker.embeddings import _numpy_available, save_embeddings
+from tracker.models import Mention, MentionEmbedding
+
+if _numpy_available:
+    import numpy as np
+
+    from tracker.embeddings import to_bytes
+
+MODEL = nlp.EMBED_MODEL_NAME
+
+def vector(*values):
+    return to_bytes(np.array(values, dtype=np.float32))
+
+@skipUnless(_numpy_available, 'numpy is not installed')
+class VectorIndexTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.ids = [Mention.objects.create(text=f'mention {i}', created_at=now, processed=True).id
+                    for i in range(4)]
+        vector_index._indexes.clear()
+        self.addCleanup(vector_index._indexes.clear)
+
+    def index(self):
+        index = vector_index.VectorIndex(MODEL, backend='numpy', lag=60, chunk_size=2)
+        index.sync(force=True)
+        return index
+
+    def test_search_ranks_by_cosine(self):
+        save_embeddings([(self.ids[0], vector(1, 0)), (self.ids[1], vector(0, 1)),
+                         (self.ids[2], vector(3, 1))], MODEL)
+        hits = self.index().search(np.array([1, 0.1]), k=2)
+        self.assertEqual([i for i, _ in hits], [self.ids[0], self.ids[2]])
+        self.assertAlmostEqual(hits[0][1], 0.995, places=3)
+
+    def test_out_of_order_commits(self):
+        # Mentions with higher ids are stored first, as happens with parallel workers
+        save_embeddings([(self.ids[2], vector(0, 1)), (self.ids[3], vector(0, 1))], MODEL)
+        index = self.index()
+        save_embeddings([(self.ids[0], vector(1, 0)), (self.ids[1], vector(1, 0))], MODEL)
+        index.sync(force=True)
+        self.assertEqual(index.stats()['size'], 4)
+        self.assertEqual(sorted(i for i, _ in index.search(np.array([1, 0]), k=2)), self.ids[:2])
+
+    def test_late_commit_within_lag(self):
+        save_embeddings([(self.ids[0], vector(0, 1))], MODEL)
+        index = self.index()
+        # Timestamped before the last sync, but only committed after it
+        save_embeddings([(self.ids[1], vector(1, 0))], MODEL)
+        MentionEmbedding.objects.filter(mention_id=self.ids[1]).update(
+            updated_at=timezone.now() - timedelta(seconds=30))
+        index.sync(force=True)
+        self.assertEqual(index.search(np.array([1, 0]), k=1)[0][0], self.ids[1])
+
+    def test_reanalyzed_vectors_are_replaced(self):
+        save_embeddings([(self.ids[0], vector(1, 0)), (self.ids[1], vector(0, 1))], MODEL)
+        index = self.index()
+        save_embeddings([(self.ids[0], vector(0, 1))], MODEL)
+        index.sync(force=True)
+        self.assertEqual(index.stats()['size'], 2)
+        self.assertEqual(index.search(np.array([1, 0]), k=1)[0][1], 0)
+
+    def test_similar_and_search_endpoints(self):
+        save_embeddings([(self.ids[0], vector(1, 0)), (self.ids[1], vector(0.9, 0.1)),
+                         (self.ids[2], vector(0, 1))], MODEL)
+        url = '/api/api/mentions/'
+        data = self.client.get(f'{url}{self.ids[0]}/similar/', {'k': 1}).json()
+        self.assertEqual([m['id'] for m in data['results']], [self.ids[1]])
+        self.assertEqual(data['index']['size'], 3)
+
+        self.assertEqual(self.client.get(f'{url}{self.ids[3]}/similar/').status_code, 409)
+        self.assertEqual(self.client.get(f'{url}999999/similar/').status_code, 404)
+        self.assertEqual(self.client.get(f'{url}abc/similar/').status_code, 404)
+
+        with mock.patch.object(nlp, 'encode_text', return_value=np.array([0, 1], dtype=np.float32)):
+            data = self.client.get(f'{url}search/', {'q': 'anything', 'k': 1}).json()
+        self.assertEqual([m['id'] for m in data['results']], [self.ids[2]])
+        self.assertEqual(self.client.get(f'{url}search/').status_code, 400)
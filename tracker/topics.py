@@ -0,0 +1,141 @@
+# tracker/topics.py - scheduled topic model refits and hot-swapping in workers
+#
+# A refit reads the stored embeddings of a rolling window of mentions, so
+# nothing is re-encoded, fits BERTopic on them and saves the model as a new
+# version under TOPIC_MODEL_DIR. The CURRENT file names the live version and
+# is replaced atomically; every process polls it and swaps models in place.
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import nlp, rollups
+from .embeddings import load_matrix
+from .models import Mention
+
+logger = logging.getLogger(__name__)
+
+POINTER = 'CURRENT'
+
+def model_dir():
+    return str(getattr(settings, 'TOPIC_MODEL_DIR', os.path.join(settings.BASE_DIR, 'topic_models')))
+
+def current_version():
+    """Name of the live topic model version, or None before the first refit"""
+    try:
+        with open(os.path.join(model_dir(), POINTER)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def _publish(version):
+    directory = model_dir()
+    tmp = os.path.join(directory, f'.{POINTER}.{os.getpid()}')
+    with open(tmp, 'w') as f:
+        f.write(version)
+    # os.replace is atomic: readers see the old or the new version, never a partial file
+    os.replace(tmp, os.path.join(directory, POINTER))
+
+def _prune(keep):
+    directory = model_dir()
+    versions = sorted(v for v in os.listdir(directory) if v.startswith('topics-'))
+    live = current_version()
+    for version in versions[:-keep] if keep else []:
+        if version != live:
+            shutil.rmtree(os.path.join(directory, version), ignore_errors=True)
+            try:
+                os.remove(os.path.join(directory, version))
+            except OSError:
+                pass
+
+def refit(days=None, max_docs=None, min_docs=None):
+    """Fit a new topic model on the stored embeddings of the last ``days`` of mentions.
+
+    The window's mentions are relabelled with the new topics and their rollups
+    rebuilt. Returns a summary dict, with version None if nothing was fitted.
+    """
+    days = days or getattr(settings, 'TOPIC_REFIT_DAYS', 7)
+    max_docs = max_docs or getattr(settings, 'TOPIC_REFIT_MAX_DOCS', 20000)
+    min_docs = min_docs or getattr(settings, 'TOPIC_MIN_DOCS', 200)
+    since = timezone.now() - timedelta(days=days)
+    started = time.monotonic()
+
+    window = Mention.objects.filter(processed=True, created_at__gte=since).order_by('-created_at')
+    latest_ids = list(window.values_list('id', flat=True)[:max_docs])
+    ids, matrix = load_matrix(Mention.objects.filter(id__in=latest_ids))
+    if len(ids) < min_docs:
+        logger.info(f"Topic refit skipped: {len(ids)} embedded mentions since {since:%Y-%m-%d}, need {min_docs}")
+        return {'version': None, 'documents': len(ids)}
+
+    texts_by_id = dict(Mention.objects.filter(id__in=ids).values_list('id', 'text'))
+    texts = [texts_by_id.get(i) or '' for i in ids]
+    model = nlp.fit_topic_model(texts, embeddings=matrix, install=False)
+    if model is None:
+        return {'version': None, 'documents': len(ids)}
+
+    version = f'topics-{timezone.now():%Y%m%d%H%M%S}'
+    os.makedirs(model_dir(), exist_ok=True)
+    path = os.path.join(model_dir(), version)
+    nlp.save_topic_model(path, model=model)
+    _publish(version)
+    nlp.set_topic_model(model, version)
+    _prune(getattr(settings, 'TOPIC_KEEP_VERSIONS', 3))
+
+    relabelled = _relabel(ids, model.topics_)
+    rollups.rebuild(since=since)
+    summary = {
+        'version': version,
+        'documents': len(ids),
+        'topics': len(set(model.topics_)),
+        'relabelled': relabelled,
+        'seconds': round(time.monotonic() - started, 1),
+    }
+    logger.info(f"Topic model refitted: {summary}")
+    return summary
+
+def _relabel(ids, topic_ids, batch_size=1000):
+    """Store the fitted topics on the window's mentions, which the fit already assigned"""
+    labels = {}
+    changed = []
+    current = dict(Mention.objects.filter(id__in=ids).values_list('id', 'topic'))
+    for mention_id, topic_id in zip(ids, topic_ids):
+        if topic_id not in labels:
+            labels[topic_id] = nlp.topic_label(topic_id)
+        if current.get(mention_id) != labels[topic_id]:
+            changed.append(Mention(id=mention_id, topic=labels[topic_id]))
+    Mention.objects.bulk_update(changed, ['topic'], batch_size=batch_size)
+    return len(changed)
+
+_checked_at = 0.0
+_check_lock = threading.Lock()
+
+def ensure_current(force=False):
+    """Hot-swap to the published topic model if it changed; stat()s at most once per TOPIC_CHECK_INTERVAL"""
+    global _checked_at
+    now = time.monotonic()
+    if not force and now - _checked_at < getattr(settings, 'TOPIC_CHECK_INTERVAL', 30):
+        return nlp.topic_version()
+    if not _check_lock.acquire(blocking=False):
+        # Another thread is already checking or loading
+        return nlp.topic_version()
+    try:
+        _checked_at = now
+        version = current_version()
+        if version is None or version == nlp.topic_version():
+            return nlp.topic_version()
+        try:
+            # Loaded into a local first; requests keep using the old model meanwhile
+            model = nlp.read_topic_model(os.path.join(model_dir(), version))
+        except Exception as e:
+            logger.warning(f"Could not load topic model {version}: {e}")
+            return nlp.topic_version()
+        nlp.set_topic_model(model, version)
+        logger.info(f"Switched to topic model {version}")
+        return version
+    finally:
+        _check_lock.release()
@@ -1,8 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
-    MentionViewSet, AlertViewSet, index, StartFetch, DashboardStats,
-    dashboard_view, mentions_view, alerts_view, feeds_view
+    MentionViewSet, AlertViewSet, index, StartFetch, DashboardStats, AnalysisCacheStats, BulkIngest,
+    dashboard_view, mentions_view, alerts_view, feeds_view, export_view
 )
 
 router = DefaultRouter()
@@ -19,4 +19,7 @@ urlpatterns = [
     path('api/', include(router.urls)),
     path('api/start-fetch/', StartFetch.as_view(), name='start-fetch'),
     path('api/dashboard-stats/', DashboardStats.as_view(), name='dashboard-stats'),
+    path('api/analysis-cache-stats/', AnalysisCacheStats.as_view(), name='analysis-cache-stats'),
+    path('api/ingest/', BulkIngest.as_view(), name='bulk-ingest'),
+    path('api/export/<str:kind>/', export_view, name='export'),
 ]
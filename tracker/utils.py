@@ -1,7 +1,12 @@
+import hashlib
 import os
+import re
+import unicodedata
 from pathlib import Path
 from django.conf import settings
 
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+
 def get_built_assets():
     """Find the latest built React assets"""
     static_dir = Path(settings.BASE_DIR) / 'tracker' / 'static' / 'tracker'
@@ -21,3 +26,12 @@ def get_built_assets():
     
     return css_file, js_file
 
+def normalize_text(text):
+    """Casefold, NFKC-normalize and collapse punctuation/whitespace so trivial
+    reformatting of the same text normalizes to the same string"""
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    return _NON_WORD.sub(' ', text).strip()
+
+def text_fingerprint(text):
+    """SHA-256 hex digest of the normalized text"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
@@ -0,0 +1,262 @@
+# tracker/vector_index.py - nearest-neighbour search over stored mention embeddings
+#
+# The index is built per process from MentionEmbedding and then follows the
+# table by updated_at, so mentions analyzed (or re-analyzed) by other workers
+# become searchable within VECTOR_INDEX_REFRESH seconds. Vectors are
+# L2-normalized and scored by inner product, i.e. cosine similarity.
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+
+from .embeddings import DTYPE, ITEMSIZE, _numpy_available
+from .models import MentionEmbedding
+
+logger = logging.getLogger(__name__)
+
+if _numpy_available:
+    import numpy as np
+
+try:
+    import faiss
+    _faiss_available = True
+except ImportError:
+    _faiss_available = False
+
+def normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.clip(norms, 1e-12, None)
+
+class NumpyIndex:
+    """Exact search: one matrix-vector product over all rows, top-k by argpartition"""
+
+    kind = 'numpy'
+    # Vectors are replaced in place, so the index never needs a rebuild
+    stale = 0
+
+    def __init__(self, dim):
+        self.dim = dim
+        self._ids = np.empty(0, dtype=np.int64)
+        self._matrix = np.empty((0, dim), dtype=np.float32)
+        self._size = 0
+        self._rows = {}
+
+    def __len__(self):
+        return self._size
+
+    def add(self, ids, vectors):
+        for mention_id, vector in zip(ids, vectors):
+            row = self._rows.get(mention_id)
+            if row is not None:
+                # Re-analyzed mention, overwrite in place
+                self._matrix[row] = vector
+                continue
+            if self._size == len(self._ids):
+                # Grow geometrically so appends stay amortized O(1)
+                capacity = max(1024, self._size * 2)
+                self._ids = np.resize(self._ids, capacity)
+                matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+                matrix[:self._size] = self._matrix[:self._size]
+                self._matrix = matrix
+            self._ids[self._size] = mention_id
+            self._matrix[self._size] = vector
+            self._rows[mention_id] = self._size
+            self._size += 1
+
+    def search(self, query, k):
+        if not self._size:
+            return []
+        scores = self._matrix[:self._size] @ query
+        k = min(k, self._size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self._ids[i]), float(scores[i])) for i in top]
+
+class FaissIndex:
+    """Approximate search with a faiss HNSW graph (faiss-cpu)"""
+
+    kind = 'faiss-hnsw'
+
+    def __init__(self, dim, m=32, ef_search=64):
+        self.dim = dim
+        index = faiss.IndexHNSWFlat(dim, m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efSearch = ef_search
+        self._index = faiss.IndexIDMap2(index)
+        # mention id -> hash of its vector, to tell re-analyzed mentions from re-reads
+        self._seen = {}
+        self.stale = 0
+
+    def __len__(self):
+        return self._index.ntotal
+
+    def add(self, ids, vectors):
+        # HNSW can't replace vectors; re-analyzed mentions keep their first vector
+        # until the index is rebuilt (see VECTOR_INDEX_REBUILD)
+        fresh = []
+        for i, v in zip(ids, vectors):
+            digest = hash(v.tobytes())
+            seen = self._seen.get(i)
+            if seen is None:
+                fresh.append((i, v))
+                self._seen[i] = digest
+            elif seen != digest:
+                self.stale += 1
+                self._seen[i] = digest
+        if not fresh:
+            return
+        self._index.add_with_ids(
+            np.ascontiguousarray(np.stack([v for _, v in fresh]), dtype=np.float32),
+            np.array([i for i, _ in fresh], dtype=np.int64),
+        )
+
+    def search(self, query, k):
+        if not len(self):
+            return []
+        scores, ids = self._index.search(query[None, :].astype(np.float32), k)
+        return [(int(i), float(s)) for i, s in zip(ids[0], scores[0]) if i != -1]
+
+class VectorIndex:
+    """Thread-safe index over one embedding model, loaded lazily and kept in sync with the table"""
+
+    def __init__(self, model_name, backend='auto', refresh=5.0, rebuild=3600, lag=60, chunk_size=5000):
+        self.model_name = model_name
+        self.backend = backend
+        self.refresh = refresh
+        self.rebuild_every = rebuild
+        self.lag = timedelta(seconds=lag)
+        self.chunk_size = chunk_size
+        self._index = None
+        self._updated_until = None
+        self._synced_at = 0.0
+        self._built_at = 0.0
+        self._lock = threading.RLock()
+
+    def _new_index(self, dim, expected):
+        backend = self.backend
+        if backend == 'auto':
+            backend = 'faiss' if _faiss_available and expected >= getattr(
+                settings, 'VECTOR_INDEX_FAISS_MIN', 200000) else 'numpy'
+        if backend == 'faiss':
+            if not _faiss_available:
+                logger.warning("faiss not installed, using exact NumPy search")
+            else:
+                return FaissIndex(dim, m=getattr(settings, 'VECTOR_INDEX_HNSW_M', 32),
+                                  ef_search=getattr(settings, 'VECTOR_INDEX_EF_SEARCH', 64))
+        return NumpyIndex(dim)
+
+    def _rows(self, since, after):
+        qs = MentionEmbedding.objects.filter(model_name=self.model_name)
+        if since is not None:
+            qs = qs.filter(updated_at__gte=since)
+        if after is not None:
+            updated_at, mention_id = after
+            qs = qs.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, mention_id__gt=mention_id))
+        return qs.order_by('updated_at', 'mention_id').values_list('mention_id', 'dim', 'vector', 'updated_at')
+
+    def sync(self, force=False):
+        """Load embeddings stored or replaced since the last sync (everything on first use)"""
+        now = time.monotonic()
+        if not force and self._index is not None and now - self._synced_at < self.refresh:
+            return
+        with self._lock:
+            if (self._index is not None and self._index.stale and self.rebuild_every
+                    and now - self._built_at > self.rebuild_every):
+                # An HNSW graph only picks up re-analyzed vectors by being rebuilt
+                self._index = None
+                self._updated_until = None
+            if self._index is None:
+                qs = MentionEmbedding.objects.filter(model_name=self.model_name)
+                first = qs.values_list('dim', flat=True).first()
+                if first is None:
+                    self._synced_at = now
+                    return
+                self._index = self._new_index(first, qs.count())
+                self._built_at = now
+            # A row's updated_at is taken before its transaction commits, so rows
+            # from the last `lag` are read again in case one committed late
+            since = self._updated_until - self.lag if self._updated_until is not None else None
+            after = None
+            started = time.monotonic()
+            added = 0
+            while True:
+                # Keyset batches over the (model_name, updated_at, mention) index
+                rows = list(self._rows(since, after)[:self.chunk_size])
+                if not rows:
+                    break
+                ids = [r[0] for r in rows if r[1] == self._index.dim]
+                if ids:
+                    buf = b''.join(r[2] for r in rows if r[1] == self._index.dim)
+                    vectors = np.frombuffer(buf, dtype=DTYPE).reshape(len(ids), self._index.dim)
+                    self._index.add(ids, normalize(vectors))
+                    added += len(ids)
+                after = (rows[-1][3], rows[-1][0])
+            if after is not None:
+                self._updated_until = after[0]
+            self._synced_at = time.monotonic()
+            if added > self.chunk_size:
+                logger.info(f"Vector index ({self._index.kind}) loaded {added} embeddings "
+                            f"in {self._synced_at - started:.1f}s, {len(self._index)} total")
+
+    def add(self, pairs):
+        """Add (mention_id, emb_bytes) pairs just written by this process, if the index is loaded"""
+        if self._index is None:
+            return
+        pairs = [(i, b) for i, b in pairs if b and len(b) == self._index.dim * ITEMSIZE]
+        if not pairs:
+            return
+        with self._lock:
+            vectors = np.frombuffer(b''.join(b for _, b in pairs), dtype=DTYPE).reshape(len(pairs), -1)
+            self._index.add([i for i, _ in pairs], normalize(vectors))
+
+    def search(self, vector, k=10, exclude=()):
+        """[(mention_id, cosine similarity)] for the k nearest stored mentions"""
+        self.sync()
+        with self._lock:
+            if self._index is None:
+                return []
+            query = normalize(vector)[0]
+            if query.shape[0] != self._index.dim:
+                raise ValueError(f'query has {query.shape[0]} dimensions, index has {self._index.dim}')
+            hits = self._index.search(query, k + len(exclude))
+        return [(i, s) for i, s in hits if i not in exclude][:k]
+
+    def stats(self):
+        return {
+            'backend': self._index.kind if self._index is not None else None,
+            'size': len(self._index) if self._index is not None else 0,
+            'model': self.model_name,
+        }
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_vector_index(model_name=None):
+    """Process-wide index for an embedding model (default: the current one)"""
+    if not _numpy_available:
+        raise RuntimeError('numpy is required for similarity search')
+    if model_name is None:
+        from .nlp import EMBED_MODEL_NAME
+        model_name = EMBED_MODEL_NAME
+    with _indexes_lock:
+        index = _indexes.get(model_name)
+        if index is None:
+            index = _indexes[model_name] = VectorIndex(
+                model_name,
+                backend=getattr(settings, 'VECTOR_INDEX_BACKEND', 'auto'),
+                refresh=getattr(settings, 'VECTOR_INDEX_REFRESH', 5.0),
+                rebuild=getattr(settings, 'VECTOR_INDEX_REBUILD', 3600),
+                lag=getattr(settings, 'VECTOR_INDEX_SYNC_LAG', 60),
+            )
+    return index
+
+def index_embeddings(pairs, model_name):
+    """Hook for the processing tasks: make freshly saved embeddings searchable here at once"""
+    index = _indexes.get(model_name)
+    if index is not None:
+        index.add(pairs)
@@ -3,30 +3,155 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from django.db.models import Count, Q
 from django.utils import timezone
 from django.utils.safestring import mark_safe
 import json
-from datetime import timedelta
-from .models import Mention, Alert
-from .serializers import MentionSerializer, AlertSerializer
+from django.http import Http404
+from rest_framework.exceptions import ValidationError
+from .models import Mention, Alert, MentionEmbedding, MentionArchive
+from .embeddings import from_bytes
+from .vector_index import get_vector_index
+from .serializers import MentionSerializer, AlertSerializer, requested_fields
+from .pagination import KeysetPagination, parse_limit
 from .tasks import fetch_rss_feed
 from .forms import RSSFeedForm
+from .stats import get_dashboard_stats
+from .analysis_cache import get_analysis_cache
+from .bulk_ingest import IngestError, ingest_stream, valid_token
+from . import export
+
+def _projected(queryset, request, always=('id', 'created_at')):
+    """Load only the model columns named in ?fields= (plus the pagination keys)"""
+    fields = requested_fields(request)
+    if not fields:
+        return queryset
+    model = queryset.model
+    names = {f.name for f in model._meta.concrete_fields}
+    return queryset.only(*(set(always) | (fields & names)))
+
+def _time_range(queryset, request):
+    """Filter on created_at from ?since= / ?until= (ISO dates or times)"""
+    try:
+        if request.query_params.get('since'):
+            queryset = queryset.filter(created_at__gte=export.parse_time(request.query_params['since']))
+        if request.query_params.get('until'):
+            queryset = queryset.filter(created_at__lte=export.parse_time(request.query_params['until'], end=True))
+    except ValueError as e:
+        raise ValidationError({'detail': str(e)})
+    return queryset
 
 class MentionViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Mention.objects.order_by('-created_at')
     serializer_class = MentionSerializer
+    pagination_class = KeysetPagination
+    
+    def get_queryset(self):
+        return _projected(_time_range(Mention.objects.order_by('-created_at', '-id'), self.request), self.request)
+
+    def get_archive_queryset(self):
+        """Archived mentions (tracker.retention), merged into list pages that reach them"""
+        return _projected(_time_range(MentionArchive.objects.all(), self.request), self.request)
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            pk = str(self.kwargs.get('pk', ''))
+            archived = MentionArchive.objects.filter(pk=pk).first() if pk.isdigit() else None
+            if archived is None:
+                raise
+            return archived
     
     @action(detail=False, methods=['get'])
     def recent(self, request):
-        limit = int(request.query_params.get('limit', 50))
-        mentions = Mention.objects.filter(processed=True).order_by('-created_at')[:limit]
+        limit = parse_limit(request.query_params.get('limit'), 50, KeysetPagination.max_page_size)
+        mentions = self.get_queryset().filter(processed=True)[:limit]
         serializer = self.get_serializer(mentions, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """Mentions nearest to this one in embedding space; ?k= (default 10)"""
+        from .nlp import EMBED_MODEL_NAME
+        if not str(pk).isdigit():
+            return Response({'error': 'mention not found'}, status=404)
+        embedding = MentionEmbedding.objects.filter(
+            mention_id=pk, model_name=EMBED_MODEL_NAME
+        ).values_list('vector', flat=True).first()
+        if embedding is None:
+            if not Mention.objects.filter(pk=pk).exists():
+                return Response({'error': 'mention not found'}, status=404)
+            return Response({'error': 'mention has no embedding yet'}, status=409)
+        return self._neighbours(from_bytes(embedding), exclude={int(pk)})
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Free-text semantic search: ?q=text&k=10"""
+        from .nlp import encode_text
+        query = (request.query_params.get('q') or '').strip()
+        if not query:
+            return Response({'error': 'q required'}, status=400)
+        vector = encode_text(query)
+        if len(vector) == 0:
+            return Response({'error': 'embedding model not available'}, status=503)
+        return self._neighbours(vector)
+
+    def _neighbours(self, vector, exclude=()):
+        k = parse_limit(self.request.query_params.get('k'), 10, 100)
+        try:
+            index = get_vector_index()
+            hits = index.search(vector, k=k, exclude=exclude)
+        except (RuntimeError, ValueError) as e:
+            return Response({'error': str(e)}, status=503)
+        mentions = _projected(Mention.objects.all(), self.request).in_bulk([i for i, _ in hits])
+        results = []
+        for mention_id, score in hits:
+            m = mentions.get(mention_id)
+            if m is None:
+                # Deleted since it was indexed
+                continue
+            data = self.get_serializer(m).data
+            data['similarity'] = round(score, 4)
+            results.append(data)
+        return Response({'index': index.stats(), 'results': results})
+
 class AlertViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Alert.objects.order_by('-created_at')
     serializer_class = AlertSerializer
+    pagination_class = KeysetPagination
+    
+    def get_queryset(self):
+        queryset = Alert.objects.order_by('-created_at', '-id')
+        fields = requested_fields(self.request)
+        if not fields or 'mention' in fields:
+            # One JOIN instead of a query per alert for the nested mention
+            queryset = queryset.select_related('mention')
+        return _projected(queryset, self.request)
+
+def _request_token(request):
+    # X-Ingest-Token, or an Authorization: Bearer header
+    token = request.headers.get('X-Ingest-Token')
+    auth = request.headers.get('Authorization', '')
+    if not token and auth.lower().startswith('bearer '):
+        token = auth[7:].strip()
+    return token
+
+def export_view(request, kind):
+    """Stream a whole table: /api/export/mentions/?format=csv&since=2026-01-01&fields=id,text
+    (format ndjson, csv or parquet; filters as in tracker.export.EXPORTS).
+    Open to staff users and to callers with one of INGEST_TOKENS."""
+    from django.http import JsonResponse
+    if not (request.user.is_staff or valid_token(_request_token(request))):
+        return JsonResponse({'error': 'staff login or ingest token required'}, status=403)
+    if request.method != 'GET':
+        return JsonResponse({'error': 'GET required'}, status=405)
+    fmt = request.GET.get('format', 'ndjson')
+    try:
+        qs, fields = export.build_queryset(kind, request.GET)
+        chunks = export.export_chunks(qs, fields, fmt)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except RuntimeError as e:
+        return JsonResponse({'error': str(e)}, status=501)
+    return export.streaming_response(request, chunks, fmt, f'{kind}-{timezone.now():%Y%m%d%H%M%S}')
 
 def index(request):
     """Main index view - redirects to dashboard"""
@@ -34,75 +159,30 @@ def index(request):
 
 def dashboard_view(request):
     """Dashboard with stats"""
-    now = timezone.now()
-    last_24h = now - timedelta(hours=24)
-    last_7d = now - timedelta(days=7)
-    
-    # Total mentions
-    total_mentions = Mention.objects.count()
-    mentions_24h = Mention.objects.filter(created_at__gte=last_24h).count()
-    mentions_7d = Mention.objects.filter(created_at__gte=last_7d).count()
-    
-    # Sentiment breakdown
-    sentiment_counts = Mention.objects.filter(processed=True).values('sentiment').annotate(
-        count=Count('sentiment')
-    )
-    sentiment_dict = {s['sentiment'] or 'unknown': s['count'] for s in sentiment_counts}
-    
-    # Topic distribution
-    topic_counts = Mention.objects.filter(
-        processed=True, 
-        topic__isnull=False
-    ).exclude(topic='').values('topic').annotate(
-        count=Count('topic')
-    ).order_by('-count')[:10]
-    
-    # Alerts
-    total_alerts = Alert.objects.count()
-    unresolved_alerts = Alert.objects.filter(resolved=False).count()
-    recent_alerts = Alert.objects.filter(created_at__gte=last_24h).count()
-    
-    # Hourly mentions for chart
-    hourly_mentions = []
-    for i in range(24):
-        hour_start = last_24h + timedelta(hours=i)
-        hour_end = hour_start + timedelta(hours=1)
-        count = Mention.objects.filter(created_at__gte=hour_start, created_at__lt=hour_end).count()
-        hourly_mentions.append({
-            'hour': hour_start.hour,
-            'count': count
-        })
-    
-    # Sources breakdown
-    source_counts = Mention.objects.values('source').annotate(
-        count=Count('source')
-    )
-    
-    sentiment_total = sentiment_dict.get('positive', 0) + sentiment_dict.get('negative', 0) + sentiment_dict.get('neutral', 0)
+    stats = get_dashboard_stats()
+    sentiment = stats['sentiment']
     
     context = {
-        'total_mentions': total_mentions,
-        'mentions_24h': mentions_24h,
-        'mentions_7d': mentions_7d,
+        'total_mentions': stats['mentions']['total'],
+        'mentions_24h': stats['mentions']['last_24h'],
+        'mentions_7d': stats['mentions']['last_7d'],
         'sentiment': {
-            'positive': sentiment_dict.get('positive', 0),
-            'negative': sentiment_dict.get('negative', 0),
-            'neutral': sentiment_dict.get('neutral', 0),
-            'total': sentiment_total,
+            **sentiment,
+            'total': sentiment['positive'] + sentiment['negative'] + sentiment['neutral'],
         },
-        'topics': list(topic_counts),
-        'total_alerts': total_alerts,
-        'unresolved_alerts': unresolved_alerts,
-        'recent_alerts': recent_alerts,
-        'hourly_mentions': mark_safe(json.dumps(hourly_mentions)),
-        'sources': list(source_counts),
+        'topics': stats['topics'],
+        'total_alerts': stats['alerts']['total'],
+        'unresolved_alerts': stats['alerts']['unresolved'],
+        'recent_alerts': stats['alerts']['recent_24h'],
+        'hourly_mentions': mark_safe(json.dumps(stats['hourly_mentions'])),
+        'sources': stats['sources'],
     }
     return render(request, 'tracker/dashboard.html', context)
 
 def mentions_view(request):
     """Mentions list view with filtering"""
     filter_sentiment = request.GET.get('filter', 'all')
-    limit = int(request.GET.get('limit', 100))
+    limit = parse_limit(request.GET.get('limit'), 100, 500)
     
     mentions = Mention.objects.filter(processed=True).order_by('-created_at')
     
@@ -119,7 +199,7 @@ def mentions_view(request):
 
 def alerts_view(request):
     """Alerts view"""
-    alerts = Alert.objects.order_by('-created_at')[:50]
+    alerts = Alert.objects.select_related('mention').order_by('-created_at')[:50]
     context = {
         'alerts': alerts,
     }
@@ -201,67 +281,43 @@ class StartFetch(APIView):
 
 class DashboardStats(APIView):
     def get(self, request):
-        now = timezone.now()
-        last_24h = now - timedelta(hours=24)
-        last_7d = now - timedelta(days=7)
-        
-        # Total mentions
-        total_mentions = Mention.objects.count()
-        mentions_24h = Mention.objects.filter(created_at__gte=last_24h).count()
-        mentions_7d = Mention.objects.filter(created_at__gte=last_7d).count()
-        
-        # Sentiment breakdown
-        sentiment_counts = Mention.objects.filter(processed=True).values('sentiment').annotate(
-            count=Count('sentiment')
-        )
-        sentiment_dict = {s['sentiment'] or 'unknown': s['count'] for s in sentiment_counts}
-        
-        # Topic distribution
-        topic_counts = Mention.objects.filter(
-            processed=True, 
-            topic__isnull=False
-        ).exclude(topic='').values('topic').annotate(
-            count=Count('topic')
-        ).order_by('-count')[:10]
-        
-        # Alerts
-        total_alerts = Alert.objects.count()
-        unresolved_alerts = Alert.objects.filter(resolved=False).count()
-        recent_alerts = Alert.objects.filter(created_at__gte=last_24h).count()
-        
-        # Spikes detection (mentions per hour in last 24h)
-        hourly_mentions = []
-        for i in range(24):
-            hour_start = last_24h + timedelta(hours=i)
-            hour_end = hour_start + timedelta(hours=1)
-            count = Mention.objects.filter(created_at__gte=hour_start, created_at__lt=hour_end).count()
-            hourly_mentions.append({
-                'hour': hour_start.hour,
-                'count': count
-            })
-        
-        # Sources breakdown
-        source_counts = Mention.objects.values('source').annotate(
-            count=Count('source')
-        )
-        
-        return Response({
-            'mentions': {
-                'total': total_mentions,
-                'last_24h': mentions_24h,
-                'last_7d': mentions_7d,
-            },
-            'sentiment': {
-                'positive': sentiment_dict.get('positive', 0),
-                'negative': sentiment_dict.get('negative', 0),
-                'neutral': sentiment_dict.get('neutral', 0),
-            },
-            'topics': list(topic_counts),
-            'alerts': {
-                'total': total_alerts,
-                'unresolved': unresolved_alerts,
-                'recent_24h': recent_alerts,
-            },
-            'hourly_mentions': hourly_mentions,
-            'sources': list(source_counts),
-        })
+        return Response(get_dashboard_stats())
+
+class AnalysisCacheStats(APIView):
+    def get(self, request):
+        cache = get_analysis_cache()
+        if cache is None:
+            return Response({'enabled': False})
+        return Response(dict(cache.stats(), enabled=True))
+
+from rest_framework.permissions import BasePermission
+class HasIngestToken(BasePermission):
+    """Bearer token (or X-Ingest-Token header) listed in INGEST_TOKENS"""
+
+    def has_permission(self, request, view):
+        return valid_token(_request_token(request))
+
+class BulkIngest(APIView):
+    """POST NDJSON or a JSON array of mentions, e.g. {"text": ..., "external_id": ...,
+    "created_at": ..., "author": ..., "source": ...}; ?source= sets the default source.
+
+    The body is read as a stream rather than through request.data, so it is
+    never held in memory as a whole.
+    """
+    authentication_classes = []
+    permission_classes = [HasIngestToken]
+
+    def post(self, request):
+        if request.stream is None:
+            return Response({'error': 'empty body'}, status=400)
+        compressed = request.headers.get('Content-Encoding', '').lower() == 'gzip'
+        try:
+            summary = ingest_stream(request.stream, default_source=request.query_params.get('source') or 'api',
+                                    compressed=compressed)
+        except IngestError as e:
+            status = 413 if e.too_large else 400
+            return Response(dict(e.summary, error=str(e)), status=status)
+        except (OSError, EOFError) as e:
+            # Corrupt gzip stream
+            return Response({'error': f'could not decompress body: {e}'}, status=400)
+        return Response(summary, status=202)